@@ -0,0 +1,129 @@
+"""Benchmark cold start aplikasi Streamlit: waktu impor, first paint, dan memori residen.
+
+Setiap pengukuran dijalankan pada interpreter baru (subprocess) agar modul yang sudah
+termuat tidak ikut terhitung, diulang beberapa kali, lalu diambil median durasinya:
+
+- impor_app   : impor streamlit + modul yang diimpor app.py (tanpa menjalankan skrip)
+- first_paint : proses baru sampai skrip app.py selesai dijalankan sekali (AppTest, halaman awal tanpa hasil)
+- stack_*     : biaya impor setiap stack berat yang ditunda ke tahapnya (dibayar saat tahap pertama kali berjalan)
+
+Setiap hasil mencatat RSS proses dan stack berat yang sudah termuat, sehingga stack yang
+kembali diimpor di halaman pertama terlihat langsung. Hasil JSON memuat metadata run
+(commit, platform, versi library) dan dapat dibandingkan antar commit dengan --banding.
+Catatan: cache halaman OS tidak dikosongkan, jadi angka ini batas bawah cold start container.
+
+Contoh:
+    python benchmarks/bench_cold_start.py --output bench_cold_start.json
+    python benchmarks/bench_cold_start.py --ulang 10 --banding bench_cold_start_sebelumnya.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import metadata_run
+
+# Kode yang dijalankan di interpreter baru; {kode} dibungkus pengukuran waktu, RSS, dan stack termuat
+KERANGKA = """
+import time
+mulai = time.perf_counter()
+{kode}
+durasi = time.perf_counter() - mulai
+import json, sys
+from sdi_profiling import rss_mb, rss_puncak_proses_mb
+print(json.dumps({{"durasi_s": durasi, "rss_mb": rss_mb(), "rss_puncak_mb": rss_puncak_proses_mb(),
+                  "stack_termuat": [m for m in {stack!r} if m in sys.modules]}}))
+"""
+
+# Stack berat yang dicatat bila sudah termuat di akhir pengukuran
+STACK_BERAT = ("pandas", "geopandas", "shapely", "pyogrio", "rasterio", "matplotlib", "reportlab", "folium")
+
+KODE_IMPOR_APP = """
+import streamlit
+import sdi_pipeline, sdi_artefak, sdi_riwayat, sdi_antrian
+"""
+
+# Dengan AppTest, skrip dijalankan seperti sesi browser pertama (widget sidebar, uploader, tombol)
+KODE_FIRST_PAINT = """
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=300)
+at.run()
+assert not at.exception, at.exception
+"""
+
+# Stack berat yang dimuat lazy -> kode impor yang mewakili tahap pertama yang memakainya
+STACK_TERTUNDA = {
+    "gis": "import geopandas, pyogrio",
+    "raster": "import rasterio",
+    "plotting": "import matplotlib; matplotlib.use('Agg'); import matplotlib.pyplot",
+    "laporan": "import sdi_laporan",
+    "peta_web": "import folium, streamlit_folium",
+}
+
+def ukur(kode, ulang):
+    """Menjalankan kode pada `ulang` interpreter baru; durasi median, RSS maksimum"""
+    hasil = []
+    for _ in range(ulang):
+        keluaran = subprocess.run(
+            [sys.executable, "-c", KERANGKA.format(kode=kode.strip(), stack=STACK_BERAT)],
+            cwd=ROOT, capture_output=True, text=True, env={**os.environ, "PYTHONPATH": ROOT},
+        )
+        if keluaran.returncode != 0:
+            raise RuntimeError(keluaran.stderr.strip().splitlines()[-1] if keluaran.stderr.strip() else "gagal")
+        hasil.append(json.loads(keluaran.stdout.strip().splitlines()[-1]))
+    return {
+        "durasi_s": round(statistics.median(h["durasi_s"] for h in hasil), 3),
+        "durasi_min_s": round(min(h["durasi_s"] for h in hasil), 3),
+        "rss_mb": round(max(h["rss_mb"] for h in hasil), 1),
+        "rss_puncak_mb": round(max(h["rss_puncak_mb"] for h in hasil), 1),
+        "stack_termuat": hasil[-1]["stack_termuat"],
+        "ulang": ulang,
+    }
+
+def banding(hasil_baru, hasil_lama):
+    """Mencetak rasio durasi dan selisih RSS per skenario (baru vs lama)"""
+    lama = {h["skenario"]: h for h in hasil_lama["hasil"]}
+    print(f"\nPerbandingan terhadap commit {hasil_lama['meta'].get('commit')}:")
+    for h in hasil_baru["hasil"]:
+        if h["skenario"] not in lama or lama[h["skenario"]]["durasi_s"] <= 0:
+            continue
+        l = lama[h["skenario"]]
+        print(f"  {h['skenario']:<18} {l['durasi_s']:>7.3f} s -> {h['durasi_s']:>7.3f} s (x{h['durasi_s'] / l['durasi_s']:.2f})"
+              f"   RSS {l['rss_mb']:>6.0f} -> {h['rss_mb']:>6.0f} MB")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold start aplikasi Streamlit GeoSDI.")
+    parser.add_argument("--ulang", type=int, default=5, help="Jumlah interpreter baru per skenario (default 5)")
+    parser.add_argument("--tanpa-stack", action="store_true", help="Lewati pengukuran biaya impor stack tertunda")
+    parser.add_argument("-o", "--output", default="bench_cold_start.json", help="File JSON hasil benchmark")
+    parser.add_argument("--banding", help="File JSON hasil benchmark sebelumnya untuk dibandingkan")
+    args = parser.parse_args(argv)
+
+    skenario = [("impor_app", KODE_IMPOR_APP), ("first_paint", KODE_FIRST_PAINT)]
+    if not args.tanpa_stack:
+        skenario += [(f"stack_{nama}", kode) for nama, kode in STACK_TERTUNDA.items()]
+
+    hasil = {"meta": metadata_run(), "hasil": []}
+    for nama, kode in skenario:
+        h = {"skenario": nama, **ukur(kode, args.ulang)}
+        hasil["hasil"].append(h)
+        print(f"{nama:<18} {h['durasi_s']:>7.3f} s (min {h['durasi_min_s']:.3f})  RSS {h['rss_mb']:>6.0f} MB  "
+              f"stack: {', '.join(h['stack_termuat']) or '-'}")
+
+    with open(args.output, "w") as f:
+        json.dump(hasil, f, indent=2, default=str)
+    print(f"\nHasil disimpan ke {args.output}")
+
+    if args.banding:
+        with open(args.banding) as f:
+            banding(hasil, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
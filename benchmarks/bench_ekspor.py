@@ -0,0 +1,113 @@
+"""Benchmark ekspor hasil SDI (GPKG, GeoParquet, FlatGeobuf, XLSX) per 100 ribu segmen.
+
+Hasil SDI sintetis (skema sama dengan keluaran hitung_survey) dibangkitkan di setiap proses,
+lalu satu format ditulis per proses baru (spawn) agar RSS puncak tidak tercampur antar format.
+Format `gpkg_lama` mengulang jalur ekspor sebelumnya (cek list/tuple per sel + to_file tanpa Arrow)
+dan `excel_pandas` memaksa pd.ExcelWriter, sebagai pembanding jalur kolumnar dan XLSX streaming.
+
+Contoh:
+    python benchmarks/bench_ekspor.py --segmen 100000 --output bench_ekspor.json
+    python benchmarks/bench_ekspor.py --format gpkg geoparquet fgb --banding bench_ekspor_sebelumnya.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import metadata_run
+
+FORMAT = {
+    "gpkg_lama": "Peta_Hasil_SDI.gpkg",
+    "gpkg": "Peta_Hasil_SDI.gpkg",
+    "geoparquet": "Peta_Hasil_SDI.parquet",
+    "fgb": "Peta_Hasil_SDI.fgb",
+    "excel_pandas": "Data_SDI.xlsx",
+    "excel_streaming": "Data_SDI.xlsx",
+}
+
+def tulis_gpkg_lama(seg_gdf, gpkg_path):
+    """Jalur ekspor GPKG sebelum jalur kolumnar (dipertahankan hanya sebagai pembanding)"""
+    export_gdf = seg_gdf.copy()
+    for col in export_gdf.columns:
+        if export_gdf[col].apply(lambda x: isinstance(x, (list, tuple))).any():
+            export_gdf[col] = export_gdf[col].astype(str)
+    export_gdf.to_file(gpkg_path, driver="GPKG")
+
+def jalankan_format(nama, n_segmen):
+    """Membangkitkan hasil SDI sintetis lalu menulis satu format dengan profiler"""
+    from benchmarks.data_sintetis import buat_hasil_sdi
+    from sdi_pipeline import tulis_excel, tulis_flatgeobuf, tulis_geoparquet, tulis_gpkg
+    from sdi_profiling import ProfilerTahap
+
+    df_sdi, seg_gdf = buat_hasil_sdi(n_segmen)
+    penulis = {
+        "gpkg_lama": lambda path: tulis_gpkg_lama(seg_gdf, path),
+        "gpkg": lambda path: tulis_gpkg(seg_gdf, path),
+        "geoparquet": lambda path: tulis_geoparquet(seg_gdf, path),
+        "fgb": lambda path: tulis_flatgeobuf(seg_gdf, path),
+        "excel_pandas": lambda path: tulis_excel(df_sdi, path, baris_streaming=float("inf")),
+        "excel_streaming": lambda path: tulis_excel(df_sdi, path, baris_streaming=0),
+    }[nama]
+
+    profiler = ProfilerTahap(aktif=True)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, FORMAT[nama])
+        with profiler.tahap(f"ekspor_{nama}", segmen=n_segmen):
+            penulis(path)
+        ukuran_mb = os.path.getsize(path) / 1024 ** 2
+    tahap = profiler.laporan()["tahap"][0]
+    return {
+        "format": nama,
+        "segmen": n_segmen,
+        "durasi_s": tahap["durasi_s"],
+        "s_per_100k_segmen": round(tahap["durasi_s"] / n_segmen * 100_000, 3),
+        "rss_tambahan_mb": round(tahap["rss_puncak_mb"] - tahap["rss_awal_mb"], 1),
+        "rss_puncak_mb": tahap["rss_puncak_mb"],
+        "ukuran_mb": round(ukuran_mb, 2),
+    }
+
+def banding(hasil_baru, hasil_lama):
+    """Mencetak rasio durasi per format (baru / lama)"""
+    lama = {h["format"]: h for h in hasil_lama["hasil"]}
+    print(f"\nPerbandingan terhadap commit {hasil_lama['meta'].get('commit')}:")
+    for h in hasil_baru["hasil"]:
+        if h["format"] in lama and lama[h["format"]]["s_per_100k_segmen"] > 0:
+            l = lama[h["format"]]
+            print(f"  {h['format']:<16} {l['s_per_100k_segmen']:>7.3f} -> {h['s_per_100k_segmen']:>7.3f} s/100k "
+                  f"(x{h['s_per_100k_segmen'] / l['s_per_100k_segmen']:.2f})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ekspor hasil SDI per 100 ribu segmen.")
+    parser.add_argument("--segmen", type=int, default=100_000, help="Jumlah segmen sintetis (default 100000)")
+    parser.add_argument("--format", nargs="*", choices=list(FORMAT), default=None, help="Format yang diukur (default: semua)")
+    parser.add_argument("-o", "--output", default="bench_ekspor.json", help="File JSON hasil benchmark")
+    parser.add_argument("--banding", help="File JSON hasil benchmark sebelumnya untuk dibandingkan")
+    args = parser.parse_args(argv)
+
+    hasil = {"meta": metadata_run(), "hasil": []}
+    konteks = multiprocessing.get_context("spawn")
+    for nama in args.format or list(FORMAT):
+        with ProcessPoolExecutor(max_workers=1, mp_context=konteks) as pool:
+            h = pool.submit(jalankan_format, nama, args.segmen).result()
+        hasil["hasil"].append(h)
+        print(f"{nama:<16} {h['durasi_s']:>8.3f} s  ({h['s_per_100k_segmen']:.3f} s/100k segmen)  "
+              f"+{h['rss_tambahan_mb']:>6.1f} MB RSS  {h['ukuran_mb']:>7.2f} MB file")
+
+    with open(args.output, "w") as f:
+        json.dump(hasil, f, indent=2, default=str)
+    print(f"\nHasil disimpan ke {args.output}")
+
+    if args.banding:
+        with open(args.banding) as f:
+            banding(hasil, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
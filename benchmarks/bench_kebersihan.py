@@ -0,0 +1,153 @@
+"""Benchmark tahap kebersihan geometri pada layer menyerupai keluaran deteksi otomatis.
+
+Layer retak & rutting sintetis (tepi bertangga bervertex rapat, bowtie tidak valid, deteksi ganda yang
+bertampalan, multipart; lihat buat_layer_detektor) dihitung dengan dua jalur:
+
+- mentah : overlay langsung seperti jalur sebelum tahap kebersihan (`kerusakan_lama`, dipertahankan sebagai pembanding)
+- bersih : bersihkan_geometri lalu hitung_kerusakan_segmen (termasuk pelarutan retak yang bertampalan per segmen)
+
+%Retak dan lebar retak kedua jalur dibandingkan dengan nilai acuan dari layer yang sama tanpa pembulatan grid,
+setelah diperbaiki dan di-union per segmen (luas yang tertutup dua deteksi dihitung sekali).
+
+Contoh:
+    python benchmarks/bench_kebersihan.py --panjang-km 2 --fitur 5000 --output bench_kebersihan.json
+    python benchmarks/bench_kebersihan.py --banding bench_kebersihan_sebelumnya.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import metadata_run
+
+def kerusakan_lama(seg_gdf, gdf_retak, gdf_rutting):
+    """Overlay retak & rutting tanpa validasi maupun pelarutan (jalur sebelum tahap kebersihan geometri)"""
+    import geopandas as gpd
+    import pandas as pd
+
+    seg_poly = seg_gdf[["Segmen", "geometry"]]
+    segmen_idx = pd.Index(seg_gdf["Segmen"], name="Segmen")
+    luas_seg = pd.Series(seg_gdf["Luas_Segmen"].values, index=segmen_idx)
+    retak_seg = gpd.overlay(gdf_retak[[gdf_retak.geometry.name]], seg_poly, how="intersection")
+    luas, panjang = retak_seg.geometry.area, retak_seg.geometry.length
+    persen = (luas.groupby(retak_seg["Segmen"]).sum().reindex(segmen_idx, fill_value=0.0) / luas_seg * 100)
+    lebar = ((luas / panjang.where(panjang > 0)).groupby(retak_seg["Segmen"]).mean().reindex(segmen_idx) * 1000).fillna(0.0)
+    gpd.overlay(gdf_rutting[[gdf_rutting.geometry.name]], seg_poly, how="intersection")
+    return persen.to_numpy(), lebar.to_numpy()
+
+def acuan_retak(seg_gdf, gdf_retak):
+    """%Retak & lebar retak acuan: retak diperbaiki, di-union per segmen, lalu dipecah per poligon bersambung"""
+    import geopandas as gpd
+    import shapely
+
+    retak = gdf_retak.set_geometry(shapely.make_valid(gdf_retak.geometry.values, method="structure", keep_collapsed=False))
+    retak_seg = gpd.overlay(retak[[retak.geometry.name]].explode(index_parts=False), seg_gdf[["Segmen", "geometry"]],
+                            how="intersection")
+    larut = retak_seg.dissolve(by="Segmen", as_index=False).explode(index_parts=False)
+    larut = larut[larut.geometry.geom_type == "Polygon"]
+    luas = larut.geometry.area.groupby(larut["Segmen"]).sum().reindex(seg_gdf["Segmen"], fill_value=0.0)
+    lebar = (larut.geometry.area / larut.geometry.length).groupby(larut["Segmen"]).mean().reindex(seg_gdf["Segmen"])
+    return (luas.to_numpy() / seg_gdf["Luas_Segmen"].to_numpy() * 100), (lebar * 1000).fillna(0.0).to_numpy()
+
+def jalankan(panjang_km, n_fitur, interval_segmen=100, lebar_jalan=3.0, seed=0):
+    import geopandas as gpd
+    import shapely
+    from benchmarks.data_sintetis import EPSG_SINTETIS, buat_as_jalan, buat_layer_detektor
+    from sdi_pipeline import TOLERANSI_SIMPLIFY_M, bersihkan_geometri, buat_segmen, hitung_kerusakan_segmen
+
+    as_jalan = buat_as_jalan(panjang_km)
+    seg_gdf = buat_segmen(gpd.GeoDataFrame(geometry=[as_jalan], crs=EPSG_SINTETIS), interval_segmen, lebar_jalan, EPSG_SINTETIS)
+    gdf_retak, gdf_rutting = buat_layer_detektor(as_jalan, n_fitur, n_fitur, lebar_jalan=lebar_jalan, seed=seed)
+    # Layer yang sama tanpa tepi bertangga (tanpa pemadatan vertex & pembulatan grid) sebagai acuan metrik retak
+    retak_halus, _ = buat_layer_detektor(as_jalan, n_fitur, 0, lebar_jalan=lebar_jalan, jarak_vertex=10.0, grid=0, seed=seed)
+    hasil = {
+        "panjang_km": panjang_km, "fitur": n_fitur, "segmen": len(seg_gdf), "toleransi_m": TOLERANSI_SIMPLIFY_M,
+        "vertex_retak_rata": round(float(shapely.get_num_coordinates(gdf_retak.geometry.values).mean()), 1),
+    }
+    persen_acuan, lebar_acuan = acuan_retak(seg_gdf, retak_halus)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        mulai = time.perf_counter()
+        try:
+            persen_lama, lebar_lama = kerusakan_lama(seg_gdf, gdf_retak, gdf_rutting)
+            hasil["mentah"] = {"overlay_s": round(time.perf_counter() - mulai, 3)}
+        except Exception as e:
+            persen_lama = lebar_lama = None
+            hasil["mentah"] = {"overlay_s": None, "error": f"{type(e).__name__}: {e}"}
+
+        mulai = time.perf_counter()
+        retak_bersih, jumlah_retak = bersihkan_geometri(gdf_retak)
+        rutting_bersih, jumlah_rutting = bersihkan_geometri(gdf_rutting)
+        durasi_bersih = time.perf_counter() - mulai
+        kosong = gpd.GeoDataFrame(geometry=[], crs=seg_gdf.crs)
+        catatan = {}
+        mulai = time.perf_counter()
+        kerusakan = hitung_kerusakan_segmen(seg_gdf, retak_bersih, kosong, rutting_bersih.assign(kedalaman_calc=0.0),
+                                            catatan=catatan)
+        hasil["bersih"] = {
+            "kebersihan_s": round(durasi_bersih, 3),
+            "overlay_s": round(time.perf_counter() - mulai, 3),
+            "retak": jumlah_retak, "rutting": jumlah_rutting, "retak_dilarutkan": catatan.get("retak_dilarutkan", 0),
+        }
+
+    def galat(persen, lebar):
+        return {"galat_persen_retak": round(float(np.abs(persen - persen_acuan).mean()), 4),
+                "galat_lebar_retak_mm": round(float(np.abs(lebar - lebar_acuan).mean()), 4)}
+
+    if persen_lama is not None:
+        hasil["mentah"].update(galat(persen_lama, lebar_lama))
+    hasil["bersih"].update(galat(kerusakan["persen_retak"].to_numpy(), kerusakan["lebar_retak"].to_numpy()))
+    hasil["persen_retak_acuan_rata"] = round(float(persen_acuan.mean()), 4)
+    return hasil
+
+def banding(hasil_baru, hasil_lama):
+    print(f"\nPerbandingan terhadap commit {hasil_lama['meta'].get('commit')}:")
+    for jalur, kunci in (("mentah", "overlay_s"), ("bersih", "kebersihan_s"), ("bersih", "overlay_s")):
+        lama, baru = hasil_lama["hasil"][jalur].get(kunci), hasil_baru["hasil"][jalur].get(kunci)
+        if lama and baru:
+            print(f"  {jalur}.{kunci:<13} {lama:>7.3f} -> {baru:>7.3f} s (x{baru / lama:.2f})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark tahap kebersihan geometri layer kerusakan.")
+    parser.add_argument("--panjang-km", type=float, default=2.0, help="Panjang jalan sintetis (km, default 2)")
+    parser.add_argument("--fitur", type=int, default=5000, help="Jumlah retak & rutting (masing-masing, default 5000)")
+    parser.add_argument("-o", "--output", default="bench_kebersihan.json", help="File JSON hasil benchmark")
+    parser.add_argument("--banding", help="File JSON hasil benchmark sebelumnya untuk dibandingkan")
+    args = parser.parse_args(argv)
+
+    h = jalankan(args.panjang_km, args.fitur)
+    hasil = {"meta": metadata_run(), "hasil": h}
+    m, b = h["mentah"], h["bersih"]
+    print(f"{h['segmen']} segmen, {args.fitur} retak & rutting (rata-rata {h['vertex_retak_rata']} vertex per retak), "
+          f"toleransi {h['toleransi_m']} m")
+    if m["overlay_s"] is None:
+        print(f"  mentah : overlay gagal ({m['error']})")
+    else:
+        print(f"  mentah : overlay {m['overlay_s']:.3f} s; galat %Retak {m['galat_persen_retak']}, "
+              f"lebar {m['galat_lebar_retak_mm']} mm")
+    print(f"  bersih : kebersihan {b['kebersihan_s']:.3f} s + overlay {b['overlay_s']:.3f} s; galat %Retak "
+          f"{b['galat_persen_retak']}, lebar {b['galat_lebar_retak_mm']} mm")
+    print(f"  retak  : {b['retak']}")
+    print(f"  rutting: {b['rutting']}")
+    print(f"  {b['retak_dilarutkan']} potongan retak bertampalan dilarutkan; %Retak acuan rata-rata {h['persen_retak_acuan_rata']}")
+
+    with open(args.output, "w") as f:
+        json.dump(hasil, f, indent=2, default=str)
+    print(f"\nHasil disimpan ke {args.output}")
+
+    if args.banding:
+        with open(args.banding) as f:
+            banding(hasil, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,123 @@
+"""Benchmark layanan skor lokal (sdi_layanan): waktu muat koridor dan latensi tambah/hapus fitur.
+
+Koridor sintetis dimuat sekali lewat KlienLokal (serialisasi JSON sama dengan HTTP), lalu setiap
+permintaan menambah beberapa fitur hasil geser dari fitur yang ada atau menghapus fitur acak, bergantian
+antar layer. Di akhir, tabel SDI inkremental dibandingkan dengan hitung ulang penuh dari fitur yang sama.
+Sebagai pembanding, hitung_survey (baca ulang seluruh layer + DSM) diukur sekali pada data yang sama.
+
+Contoh:
+    python benchmarks/bench_layanan.py --skenario sedang --output bench_layanan.json
+    python benchmarks/bench_layanan.py --permintaan 200 --banding bench_layanan_sebelumnya.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import DIREKTORI_DATA_DEFAULT, SKENARIO, metadata_run
+
+KOLOM_ANGKA = ["%Retak", "Lebar Retak (mm)", "Jumlah Lubang", "Rutting (cm)", "SDI1", "SDI2", "SDI3", "SDI4"]
+
+def jalankan(params, direktori_data, permintaan, fitur_per_permintaan, seed=0):
+    from benchmarks.data_sintetis import siapkan_data_sintetis
+    from sdi_layanan import LAYER_KERUSAKAN, KlienLokal
+    from sdi_pipeline import hitung_survey, hitung_tabel_sdi
+
+    folder = os.path.join(direktori_data, f"jalan{params['panjang_km']}km_fitur{params['fitur']}_dsm{params['dsm_mb']}mb")
+    paths, _ = siapkan_data_sintetis(folder, params["panjang_km"], params["fitur"], params["dsm_mb"])
+    layer_path = {nama: paths[nama] for nama in LAYER_KERUSAKAN}
+
+    mulai = time.perf_counter()
+    hitung_survey(paths["jalan"], paths["dsm"], **layer_path)
+    durasi_penuh = time.perf_counter() - mulai
+
+    klien = KlienLokal()
+    mulai = time.perf_counter()
+    klien.muat_koridor("bench", paths["jalan"], paths["dsm"], **layer_path)
+    durasi_muat = time.perf_counter() - mulai
+    koridor = klien.layanan.koridor("bench")
+
+    rng = np.random.default_rng(seed)
+    latensi = {"tambah": [], "hapus": []}
+    segmen_dihitung = []
+    for i in range(permintaan):
+        layer = LAYER_KERUSAKAN[(i // 2) % len(LAYER_KERUSAKAN)]
+        if i % 2 == 0:
+            sumber = koridor.layer_gdf(layer)
+            fitur = sumber.iloc[rng.choice(len(sumber), fitur_per_permintaan, replace=False)][[sumber.geometry.name]]
+            fitur = fitur.set_geometry(fitur.geometry.translate(rng.uniform(-20, 20), rng.uniform(-1, 1)))
+            mulai = time.perf_counter()
+            hasil = klien.tambah_fitur("bench", layer, fitur)
+            latensi["tambah"].append(time.perf_counter() - mulai)
+        else:
+            ids = rng.choice(sorted(koridor.fitur[layer]), fitur_per_permintaan, replace=False).tolist()
+            mulai = time.perf_counter()
+            hasil = klien.hapus_fitur("bench", layer, ids)
+            latensi["hapus"].append(time.perf_counter() - mulai)
+        segmen_dihitung.append(len(hasil["segmen"]))
+
+    penuh, _ = hitung_tabel_sdi(koridor._seg, *(koridor.layer_gdf(nama) for nama in LAYER_KERUSAKAN))
+    inkremental = klien.layanan.skor("bench")
+    selisih = float((inkremental[KOLOM_ANGKA].astype(float) - penuh[KOLOM_ANGKA].astype(float)).abs().max().max())
+
+    def ringkas(nilai):
+        ms = np.array(nilai) * 1000
+        return {"p50_ms": round(float(np.percentile(ms, 50)), 1), "p95_ms": round(float(np.percentile(ms, 95)), 1),
+                "maks_ms": round(float(ms.max()), 1)}
+
+    return {
+        **params,
+        "segmen": len(koridor.seg_gdf),
+        "hitung_survey_s": round(durasi_penuh, 3),
+        "muat_koridor_s": round(durasi_muat, 3),
+        "permintaan": permintaan,
+        "fitur_per_permintaan": fitur_per_permintaan,
+        "segmen_per_permintaan": round(float(np.mean(segmen_dihitung)), 1),
+        "tambah": ringkas(latensi["tambah"]),
+        "hapus": ringkas(latensi["hapus"]),
+        "selisih_maks_vs_penuh": selisih,
+        "kondisi_sama": bool((inkremental["Kondisi"] == penuh["Kondisi"]).all()),
+    }
+
+def banding(hasil_baru, hasil_lama):
+    print(f"\nPerbandingan terhadap commit {hasil_lama['meta'].get('commit')}:")
+    for operasi in ("tambah", "hapus"):
+        lama, baru = hasil_lama["hasil"][operasi]["p50_ms"], hasil_baru["hasil"][operasi]["p50_ms"]
+        print(f"  {operasi:<7} p50 {lama:>7.1f} -> {baru:>7.1f} ms (x{baru / lama:.2f})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark latensi layanan skor SDI lokal.")
+    parser.add_argument("--skenario", choices=sorted(SKENARIO), default="kecil", help="Skala data sintetis (default kecil)")
+    parser.add_argument("--permintaan", type=int, default=60, help="Jumlah permintaan tambah/hapus (default 60)")
+    parser.add_argument("--fitur-per-permintaan", type=int, default=5, help="Fitur per permintaan (default 5)")
+    parser.add_argument("--data-dir", default=DIREKTORI_DATA_DEFAULT, help="Folder cache data sintetis")
+    parser.add_argument("-o", "--output", default="bench_layanan.json", help="File JSON hasil benchmark")
+    parser.add_argument("--banding", help="File JSON hasil benchmark sebelumnya untuk dibandingkan")
+    args = parser.parse_args(argv)
+
+    h = jalankan(SKENARIO[args.skenario], args.data_dir, args.permintaan, args.fitur_per_permintaan)
+    hasil = {"meta": metadata_run(), "skenario": args.skenario, "hasil": h}
+    print(f"{args.skenario}: {h['segmen']} segmen, hitung_survey {h['hitung_survey_s']:.2f} s, muat koridor {h['muat_koridor_s']:.2f} s")
+    for operasi in ("tambah", "hapus"):
+        print(f"  {operasi:<7} p50 {h[operasi]['p50_ms']:>7.1f} ms  p95 {h[operasi]['p95_ms']:>7.1f} ms  maks {h[operasi]['maks_ms']:>7.1f} ms")
+    print(f"  {h['segmen_per_permintaan']} segmen dihitung ulang per permintaan; selisih maks vs hitung ulang penuh: "
+          f"{h['selisih_maks_vs_penuh']} (kondisi sama: {h['kondisi_sama']})")
+
+    with open(args.output, "w") as f:
+        json.dump(hasil, f, indent=2, default=str)
+    print(f"\nHasil disimpan ke {args.output}")
+
+    if args.banding:
+        with open(args.banding) as f:
+            banding(hasil, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+"""Benchmark pipeline SDI dengan data sintetis pada beberapa skala.
+
+Setiap skenario dijalankan pada proses baru (spawn) agar RSS puncak tidak tercampur
+antar skenario. Hasil berupa JSON yang memuat metadata run (commit, platform, versi
+library) serta durasi, throughput, dan memori per tahap, sehingga dua run dari commit
+berbeda dapat dibandingkan dengan --banding.
+
+Contoh:
+    python benchmarks/bench_pipeline.py --skenario kecil sedang --output bench_hasil.json
+    python benchmarks/bench_pipeline.py --panjang-km 25 --fitur 50000 --dsm-mb 500
+    python benchmarks/bench_pipeline.py --skenario kecil --banding bench_sebelumnya.json
+    python benchmarks/bench_pipeline.py --skenario besar --shard 8
+    python benchmarks/bench_pipeline.py --skenario sangat_besar --batch-kerusakan 100000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+SKENARIO = {
+    "kecil": {"panjang_km": 1, "fitur": 100, "dsm_mb": 10},
+    "sedang": {"panjang_km": 10, "fitur": 10_000, "dsm_mb": 200},
+    "besar": {"panjang_km": 100, "fitur": 100_000, "dsm_mb": 1024},
+    "sangat_besar": {"panjang_km": 500, "fitur": 1_000_000, "dsm_mb": 4096},
+}
+
+DIREKTORI_DATA_DEFAULT = os.path.join(os.path.expanduser("~"), ".cache", "geosdi", "bench")
+
+def metadata_run():
+    """Metadata lingkungan run agar hasil dapat dibandingkan antar commit/mesin"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    versi = {}
+    for modul in ("numpy", "pandas", "geopandas", "shapely", "rasterio", "matplotlib", "reportlab"):
+        try:
+            versi[modul] = __import__(modul).__version__
+        except (ImportError, AttributeError):
+            versi[modul] = None
+    return {
+        "commit": commit,
+        "waktu": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versi": versi,
+    }
+
+def jalankan_skenario(nama, params, direktori_data, interval_segmen=100, max_workers_shard=1, batch_kerusakan=None):
+    """Membangkitkan data (bila belum ada), menjalankan pipeline dengan profiler, dan merangkum hasil"""
+    from benchmarks.data_sintetis import siapkan_data_sintetis
+    from sdi_pipeline import jalankan_pipeline
+    from sdi_profiling import ProfilerTahap
+
+    folder = os.path.join(direktori_data, f"jalan{params['panjang_km']}km_fitur{params['fitur']}_dsm{params['dsm_mb']}mb")
+    mulai = time.perf_counter()
+    paths, meta_dsm = siapkan_data_sintetis(folder, params["panjang_km"], params["fitur"], params["dsm_mb"])
+    durasi_data = time.perf_counter() - mulai
+
+    profiler = ProfilerTahap(aktif=True)
+    with tempfile.TemporaryDirectory() as output_dir:
+        hasil = jalankan_pipeline(
+            paths["jalan"], paths["dsm"], output_dir,
+            retak=paths["retak"], pothole=paths["pothole"], rutting=paths["rutting"],
+            interval_segmen=interval_segmen, epsg_code=32749, profiler=profiler, max_workers_shard=max_workers_shard,
+            batch_kerusakan=batch_kerusakan,
+        )
+        jumlah_segmen = len(hasil["df_sdi"])
+    laporan = profiler.laporan()
+
+    for tahap in laporan["tahap"]:
+        durasi = tahap["durasi_s"]
+        for kunci in [k for k, v in tahap.items() if k in ("fitur", "segmen") or k.startswith("fitur_")]:
+            tahap[f"{kunci}_per_s"] = round(tahap[kunci] / durasi, 1) if durasi > 0 else None
+        if tahap["tahap"] == "kedalaman_dsm":
+            tahap["dsm_mb"] = round(meta_dsm["ukuran_mb"], 1)
+
+    return {
+        "skenario": nama,
+        "params": params,
+        "dsm": {k: round(v, 4) if isinstance(v, float) else v for k, v in meta_dsm.items()},
+        "jumlah_segmen": jumlah_segmen,
+        "durasi_siapkan_data_s": round(durasi_data, 3),
+        "durasi_pipeline_s": laporan["total_tahap_s"],
+        "km_per_menit": round(params["panjang_km"] / laporan["total_tahap_s"] * 60, 3) if laporan["total_tahap_s"] > 0 else None,
+        "rss_puncak_mb": laporan["rss_puncak_proses_mb"],
+        "tahap": laporan["tahap"],
+    }
+
+def banding(hasil_baru, hasil_lama):
+    """Mencetak rasio durasi per tahap (baru / lama) untuk skenario yang sama"""
+    lama = {h["skenario"]: h for h in hasil_lama["hasil"]}
+    print(f"\nPerbandingan terhadap commit {hasil_lama['meta'].get('commit')}:")
+    for h in hasil_baru["hasil"]:
+        if h["skenario"] not in lama:
+            continue
+        durasi_lama = {t["tahap"]: t["durasi_s"] for t in lama[h["skenario"]]["tahap"]}
+        print(f"  [{h['skenario']}]")
+        for t in h["tahap"]:
+            if t["tahap"] in durasi_lama and durasi_lama[t["tahap"]] > 0:
+                rasio = t["durasi_s"] / durasi_lama[t["tahap"]]
+                print(f"    {t['tahap']:<16} {durasi_lama[t['tahap']]:>9.3f} s -> {t['durasi_s']:>9.3f} s  (x{rasio:.2f})")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark pipeline SDI dengan data sintetis.")
+    parser.add_argument("--skenario", nargs="*", choices=sorted(SKENARIO), default=None,
+                        help="Skenario bawaan yang dijalankan (default: kecil)")
+    parser.add_argument("--panjang-km", type=float, help="Skenario kustom: panjang jalan (km)")
+    parser.add_argument("--fitur", type=int, help="Skenario kustom: jumlah fitur per layer kerusakan")
+    parser.add_argument("--dsm-mb", type=float, help="Skenario kustom: ukuran DSM (MB)")
+    parser.add_argument("--interval-segmen", type=float, default=100, help="Interval segmen (m)")
+    parser.add_argument("--shard", type=int, default=1,
+                        help="Jumlah proses untuk mode shard koridor (default 1 = serial, 0 = jumlah core)")
+    parser.add_argument("--batch-kerusakan", type=int, default=None,
+                        help="Mode streaming: layer kerusakan dibaca per N fitur (default: dibaca utuh)")
+    parser.add_argument("--data-dir", default=DIREKTORI_DATA_DEFAULT, help="Folder cache data sintetis")
+    parser.add_argument("-o", "--output", default="bench_hasil.json", help="File JSON hasil benchmark")
+    parser.add_argument("--banding", help="File JSON hasil benchmark sebelumnya untuk dibandingkan")
+    args = parser.parse_args(argv)
+
+    daftar = [(nama, SKENARIO[nama]) for nama in (args.skenario or [])]
+    if args.panjang_km or args.fitur or args.dsm_mb:
+        daftar.append(("kustom", {"panjang_km": args.panjang_km or 1, "fitur": args.fitur or 100, "dsm_mb": args.dsm_mb or 10}))
+    if not daftar:
+        daftar = [("kecil", SKENARIO["kecil"])]
+
+    hasil = {"meta": metadata_run(), "hasil": []}
+    konteks = multiprocessing.get_context("spawn")
+    for nama, params in daftar:
+        print(f"Menjalankan skenario {nama}: {params}")
+        with ProcessPoolExecutor(max_workers=1, mp_context=konteks) as pool:
+            h = pool.submit(jalankan_skenario, nama, params, args.data_dir, args.interval_segmen,
+                            args.shard or None, args.batch_kerusakan).result()
+        hasil["hasil"].append(h)
+        print(f"  {h['jumlah_segmen']} segmen, pipeline {h['durasi_pipeline_s']:.2f} s, "
+              f"{h['km_per_menit']} km/menit, RSS puncak {h['rss_puncak_mb']:.0f} MB")
+        for t in h["tahap"]:
+            print(f"    {t['tahap']:<16} {t['durasi_s']:>9.3f} s  puncak {t['rss_puncak_mb']:>8.1f} MB")
+
+    with open(args.output, "w") as f:
+        json.dump(hasil, f, indent=2, default=str)
+    print(f"\nHasil disimpan ke {args.output}")
+
+    if args.banding:
+        with open(args.banding) as f:
+            banding(hasil, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
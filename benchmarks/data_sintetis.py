@@ -0,0 +1,198 @@
+"""Generator data sintetis untuk benchmark pipeline SDI.
+
+Menghasilkan as jalan berkelok (sinusoidal) di zona UTM 49S, layer retak/lubang/rutting
+di sepanjang badan jalan, dan DSM float32 yang menutup koridor jalan dengan ukuran file
+mendekati target. Semua geometri dibuat dengan operasi array shapely agar 10^6 fitur
+tetap dapat dibangkitkan dalam hitungan detik.
+"""
+import os
+import math
+import zipfile
+import tempfile
+
+import numpy as np
+import geopandas as gpd
+import shapely
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+EPSG_SINTETIS = 32749
+ORIGIN_X, ORIGIN_Y = 440000.0, 9200000.0
+
+def buat_as_jalan(panjang_km, amplitudo=50.0, panjang_gelombang=1000.0, jarak_vertex=10.0):
+    """As jalan sinusoidal dengan panjang lintasan mendekati panjang_km"""
+    # Faktor lengkung sinus: panjang lintasan sedikit lebih besar dari jarak horizontal
+    faktor = np.mean(np.hypot(1, 2 * np.pi * amplitudo / panjang_gelombang * np.cos(np.linspace(0, 2 * np.pi, 1000))))
+    panjang_x = panjang_km * 1000 / faktor
+    x = np.arange(0, panjang_x + jarak_vertex, jarak_vertex)
+    y = amplitudo * np.sin(2 * np.pi * x / panjang_gelombang)
+    return shapely.linestrings(ORIGIN_X + x, ORIGIN_Y + y)
+
+def _titik_di_badan_jalan(as_jalan, n, lebar_jalan, rng):
+    jarak = rng.uniform(0, as_jalan.length, n)
+    titik = shapely.line_interpolate_point(as_jalan, jarak)
+    x, y = shapely.get_x(titik), shapely.get_y(titik)
+    geser = lebar_jalan / 2 * 0.9
+    return x + rng.uniform(-geser, geser, n), y + rng.uniform(-geser, geser, n)
+
+def buat_layer_kerusakan(as_jalan, n_retak, n_pothole, n_rutting, lebar_jalan=3.0, seed=0):
+    """Layer retak (poligon tipis), lubang (titik), dan rutting (poligon bulat) di badan jalan"""
+    rng = np.random.default_rng(seed)
+
+    x, y = _titik_di_badan_jalan(as_jalan, n_retak, lebar_jalan, rng)
+    panjang = rng.uniform(0.3, 2.0, n_retak)
+    lebar = rng.uniform(0.001, 0.01, n_retak)
+    retak = shapely.box(x - panjang / 2, y - lebar / 2, x + panjang / 2, y + lebar / 2)
+
+    x, y = _titik_di_badan_jalan(as_jalan, n_pothole, lebar_jalan, rng)
+    pothole = shapely.points(x, y)
+
+    x, y = _titik_di_badan_jalan(as_jalan, n_rutting, lebar_jalan, rng)
+    rutting = shapely.buffer(shapely.points(x, y), rng.uniform(0.2, 1.0, n_rutting), quad_segs=4)
+
+    return (gpd.GeoDataFrame({"id": np.arange(n_retak)}, geometry=retak, crs=EPSG_SINTETIS),
+            gpd.GeoDataFrame({"id": np.arange(n_pothole)}, geometry=pothole, crs=EPSG_SINTETIS),
+            gpd.GeoDataFrame({"id": np.arange(n_rutting)}, geometry=rutting, crs=EPSG_SINTETIS))
+
+def tulis_dsm(path, as_jalan, ukuran_mb, resolusi_min=0.02, margin=5.0, ukuran_tile=256, tile_per_blok=64, seed=0):
+    """Menulis DSM float32 ber-tile yang menutup koridor jalan dengan ukuran file sekitar ukuran_mb"""
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = shapely.bounds(as_jalan)
+    minx, miny, maxx, maxy = minx - margin, miny - margin, maxx + margin, maxy + margin
+    resolusi = max(resolusi_min, math.sqrt((maxx - minx) * (maxy - miny) * 4 / (ukuran_mb * 1024 ** 2)))
+    lebar, tinggi = int(math.ceil((maxx - minx) / resolusi)), int(math.ceil((maxy - miny) / resolusi))
+
+    profile = dict(driver="GTiff", width=lebar, height=tinggi, count=1, dtype="float32", crs=f"EPSG:{EPSG_SINTETIS}",
+                   transform=from_origin(minx, maxy, resolusi, resolusi), nodata=-9999.0,
+                   tiled=True, blockxsize=ukuran_tile, blockysize=ukuran_tile, BIGTIFF="IF_SAFER")
+    # Ditulis per blok selebar beberapa tile penuh agar memori tetap kecil walau DSM berukuran GB
+    kolom_per_blok = ukuran_tile * tile_per_blok
+    with rasterio.open(path, "w", **profile) as dst:
+        for row_start in range(0, tinggi, ukuran_tile):
+            n_baris = min(ukuran_tile, tinggi - row_start)
+            for col_start in range(0, lebar, kolom_per_blok):
+                n_kolom = min(kolom_per_blok, lebar - col_start)
+                kolom = np.arange(col_start, col_start + n_kolom, dtype="float32")
+                blok = 100 + 0.0005 * kolom * resolusi + rng.normal(0, 0.01, (n_baris, n_kolom))
+                dst.write(blok.astype("float32"), 1, window=Window(col_start, row_start, n_kolom, n_baris))
+    return {"resolusi_m": resolusi, "lebar_px": lebar, "tinggi_px": tinggi, "ukuran_mb": os.path.getsize(path) / 1024 ** 2}
+
+def tulis_zip_shapefile(gdf, zip_path):
+    """Menyimpan GeoDataFrame sebagai shapefile di dalam .zip (format input aplikasi)"""
+    nama = os.path.splitext(os.path.basename(zip_path))[0]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gdf.to_file(os.path.join(tmpdir, f"{nama}.shp"))
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zf:
+            for f in os.listdir(tmpdir):
+                zf.write(os.path.join(tmpdir, f), f)
+    return zip_path
+
+def siapkan_data_sintetis(folder, panjang_km, fitur, dsm_mb, lebar_jalan=3.0, seed=0):
+    """Membangkitkan (atau memakai ulang) satu set input sintetis di folder; mengembalikan path dan metadata"""
+    os.makedirs(folder, exist_ok=True)
+    paths = {k: os.path.join(folder, f"{k}.zip") for k in ("jalan", "retak", "pothole", "rutting")}
+    paths["dsm"] = os.path.join(folder, "dsm.tif")
+    if all(os.path.exists(p) for p in paths.values()):
+        with rasterio.open(paths["dsm"]) as src:
+            meta_dsm = {"resolusi_m": src.res[0], "lebar_px": src.width, "tinggi_px": src.height,
+                        "ukuran_mb": os.path.getsize(paths["dsm"]) / 1024 ** 2}
+        return paths, meta_dsm
+
+    as_jalan = buat_as_jalan(panjang_km)
+    retak, pothole, rutting = buat_layer_kerusakan(as_jalan, fitur, fitur, fitur, lebar_jalan=lebar_jalan, seed=seed)
+    tulis_zip_shapefile(gpd.GeoDataFrame(geometry=[as_jalan], crs=EPSG_SINTETIS), paths["jalan"])
+    tulis_zip_shapefile(retak, paths["retak"])
+    tulis_zip_shapefile(pothole, paths["pothole"])
+    tulis_zip_shapefile(rutting, paths["rutting"])
+    # DSM ditulis terakhir lewat file sementara, sehingga keberadaannya menandakan set data lengkap
+    meta_dsm = tulis_dsm(paths["dsm"] + ".tmp", as_jalan, dsm_mb, seed=seed)
+    os.replace(paths["dsm"] + ".tmp", paths["dsm"])
+    return paths, meta_dsm
+
+def buat_hasil_sdi(n_segmen, interval_segmen=100.0, lebar_jalan=3.0, segmen_per_rute=1000, jarak_vertex=10.0, seed=0):
+    """df_sdi dan seg_gdf sintetis berskema sama dengan keluaran hitung_survey (untuk benchmark ekspor).
+
+    Segmen berupa poligon koridor sepanjang interval_segmen dengan vertex setiap jarak_vertex di kedua sisi,
+    dikelompokkan per rute berisi segmen_per_rute segmen; kerusakan acak lalu diskor lewat hitung_tabel_sdi.
+    """
+    import pandas as pd
+    from sdi_pipeline import hitung_tabel_sdi, label_sta
+
+    rng = np.random.default_rng(seed)
+    idx = np.arange(n_segmen)
+    rute, urutan = idx // segmen_per_rute, idx % segmen_per_rute
+    sta_awal = urutan * interval_segmen
+
+    # Tepi kiri (maju) lalu tepi kanan (mundur) setiap segmen, di baris as jalan rute masing-masing
+    x = sta_awal[:, None] + np.arange(0, interval_segmen + jarak_vertex / 2, jarak_vertex)[None, :]
+    y = np.broadcast_to((rute * 50.0)[:, None], x.shape)
+    xs = np.concatenate([x, x[:, ::-1], x[:, :1]], axis=1)
+    ys = np.concatenate([y + lebar_jalan / 2, y[:, ::-1] - lebar_jalan / 2, y[:, :1] + lebar_jalan / 2], axis=1)
+    geoms = shapely.polygons(np.stack([ORIGIN_X + xs, ORIGIN_Y + ys], axis=-1))
+
+    seg_gdf = gpd.GeoDataFrame({
+        "Segmen": idx + 1,
+        "Rute": (rute + 1).astype(str),
+        "STA": label_sta(sta_awal, sta_awal + interval_segmen),
+        "STA_Awal": sta_awal,
+        "STA_Akhir": sta_awal + interval_segmen,
+    }, geometry=geoms, crs=EPSG_SINTETIS)
+    seg_gdf["Luas_Segmen"] = seg_gdf.geometry.area
+    kerusakan = pd.DataFrame({
+        "Segmen": seg_gdf["Segmen"],
+        "persen_retak": rng.gamma(1.5, 4.0, n_segmen),
+        "lebar_retak": rng.gamma(2.0, 1.5, n_segmen),
+        "jumlah_lubang": rng.poisson(3, n_segmen),
+        "kedalaman_rutting": rng.gamma(1.5, 1.0, n_segmen),
+    })
+    return hitung_tabel_sdi(seg_gdf, None, None, None, kerusakan=kerusakan)
+
+def _persegi_panjang_miring(x, y, panjang, lebar, sudut, urutan=(0, 1, 2, 3, 0)):
+    """Poligon persegi panjang berpusat (x, y) yang diputar sebesar sudut (radian); urutan sudut dapat diacak (bowtie)"""
+    dx, dy = np.array([-1, 1, 1, -1]) / 2, np.array([-1, -1, 1, 1]) / 2
+    px = dx[None, :] * panjang[:, None]
+    py = dy[None, :] * lebar[:, None]
+    cos, sin = np.cos(sudut)[:, None], np.sin(sudut)[:, None]
+    xs, ys = x[:, None] + px * cos - py * sin, y[:, None] + px * sin + py * cos
+    urutan = list(urutan)
+    return shapely.polygons(np.stack([xs[:, urutan], ys[:, urutan]], axis=-1))
+
+def buat_layer_detektor(as_jalan, n_retak, n_rutting, lebar_jalan=3.0, jarak_vertex=0.002, grid=0.0005,
+                        porsi_tidak_valid=0.05, porsi_tumpang=0.2, porsi_multipart=0.05, seed=0):
+    """Layer retak & rutting menyerupai keluaran deteksi otomatis: tepi bertangga bervertex rapat, sebagian poligon
+    tidak valid (bowtie), deteksi ganda yang bertampalan, dan multipart.
+
+    Retak diputar acak lalu tepinya dipadatkan setiap jarak_vertex dan dibulatkan ke grid (tepi bertangga);
+    porsi_tumpang dari retak dideteksi ulang dengan geseran kecil (ditambahkan di akhir layer).
+    """
+    rng = np.random.default_rng(seed)
+    x, y = _titik_di_badan_jalan(as_jalan, n_retak, lebar_jalan, rng)
+    panjang = rng.uniform(0.3, 2.0, n_retak)
+    lebar = rng.uniform(0.003, 0.01, n_retak)
+    sudut = rng.uniform(0, np.pi, n_retak)
+    retak = _persegi_panjang_miring(x, y, panjang, lebar, sudut)
+    bowtie = rng.random(n_retak) < porsi_tidak_valid
+    retak[bowtie] = _persegi_panjang_miring(x[bowtie], y[bowtie], panjang[bowtie], lebar[bowtie] * 4, sudut[bowtie],
+                                            urutan=(0, 2, 1, 3, 0))
+
+    ulang = rng.random(n_retak) < porsi_tumpang
+    geser = rng.uniform(0.1, 0.4, ulang.sum()) * panjang[ulang]
+    retak_ulang = _persegi_panjang_miring(x[ulang] + geser * np.cos(sudut[ulang]), y[ulang] + geser * np.sin(sudut[ulang]),
+                                          panjang[ulang], lebar[ulang] * rng.uniform(0.8, 1.2, ulang.sum()),
+                                          sudut[ulang] + rng.uniform(-0.02, 0.02, ulang.sum()))
+    retak = np.concatenate([retak, retak_ulang])
+    # Bowtie dibiarkan tidak valid; hanya poligon valid yang dipadatkan & dibulatkan ke grid
+    valid = shapely.is_valid(retak)
+    retak[valid] = shapely.set_precision(shapely.segmentize(retak[valid], jarak_vertex), grid)
+
+    multi = np.flatnonzero(rng.random(len(retak) - 1) < porsi_multipart)
+    multi = multi[np.diff(np.r_[-2, multi]) > 1]
+    retak[multi] = shapely.multipolygons(np.stack([retak[multi], retak[multi + 1]], axis=1))
+    retak = np.delete(retak, multi + 1)
+
+    x, y = _titik_di_badan_jalan(as_jalan, n_rutting, lebar_jalan, rng)
+    rutting = shapely.buffer(shapely.points(x, y), rng.uniform(0.2, 1.0, n_rutting), quad_segs=64)
+    rutting = shapely.set_precision(rutting, grid)
+    return (gpd.GeoDataFrame({"id": np.arange(len(retak))}, geometry=retak, crs=EPSG_SINTETIS),
+            gpd.GeoDataFrame({"id": np.arange(n_rutting)}, geometry=rutting, crs=EPSG_SINTETIS))
@@ -0,0 +1,214 @@
+"""Antrean job lokal (in-process) untuk run SDI dari aplikasi Streamlit.
+
+Run dikirim ke thread pool dengan batas job paralel (GEOSDI_JOB_PARALEL, default separuh
+jumlah core) sehingga beberapa pengguna tidak berebut core tanpa batas. Setiap job melaporkan
+tahap yang sedang berjalan lewat callback ProfilerTahap, dan pembatalan diperiksa di setiap
+batas tahap (serta di sela pembacaan jendela DSM). UI cukup mem-polling status_job().
+"""
+import os
+import time
+import uuid
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from sdi_pipeline import (WARNA_KONDISI, CacheTahap, hitung_survey, hitung_survey_perkiraan, id_google_drive,
+                          payload_peta_web, sidik_sumber, siapkan_dsm, siapkan_dsm_cache)
+from sdi_artefak import path_artefak, simpan_run
+from sdi_riwayat import PATH_RIWAYAT, simpan_riwayat
+from sdi_profiling import ProfilerTahap
+
+BATAS_JOB_PARALEL = int(os.environ.get("GEOSDI_JOB_PARALEL", max(1, (os.cpu_count() or 2) // 2)))
+# Job yang sudah berakhir dilupakan setelah sekian menit
+SIMPAN_JOB_MENIT = 60
+# Worker process per job untuk koridor panjang (1 = serial; koridor pendek selalu serial)
+SHARD_PARALEL = int(os.environ.get("GEOSDI_SHARD_PARALEL", 1))
+# Fitur per batch untuk mode streaming layer kerusakan (0 = layer dibaca utuh)
+BATCH_KERUSAKAN = int(os.environ.get("GEOSDI_BATCH_KERUSAKAN", 0))
+# Cache tahap bersama: mengganti lebar/interval segmen tidak membaca ulang layer maupun menghitung ulang DSM
+CACHE_TAHAP = CacheTahap(maks_entri_per_tahap=int(os.environ.get("GEOSDI_CACHE_TAHAP", 4)))
+
+# Tahap yang dilaporkan sebagai progres, berurutan (nama tahap profiler -> label UI)
+TAHAP_JOB = {
+    "siapkan_dsm": "Mengunduh / menyiapkan DSM",
+    "perkiraan": "Menghitung pratinjau perkiraan",
+    "baca_jalan": "Membaca layer jalan",
+    "segmentasi": "Membuat segmen",
+    "baca_kerusakan": "Membaca layer kerusakan",
+    "kebersihan_geometri": "Memeriksa & memperbaiki geometri kerusakan",
+    "kerusakan_bertahap": "Membaca & menghitung kerusakan per batch",
+    "kedalaman_dsm": "Menghitung kedalaman rutting dari DSM",
+    "overlay_skor": "Overlay & skor SDI",
+    "simpan": "Menyimpan hasil",
+    "render": "Merender peta & grafik",
+}
+
+class JobDibatalkan(Exception):
+    """Dilempar di batas tahap ketika pengguna membatalkan job"""
+
+class Job:
+    """Status satu job: antri -> berjalan -> selesai / gagal / dibatalkan"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "antri"
+        self.tahap = None
+        self.error = None
+        self.hasil = None
+        # Hasil perkiraan yang sudah dapat ditampilkan selagi job masih berjalan
+        self.hasil_sementara = None
+        self.batal = threading.Event()
+        self.dibuat = time.time()
+        self.mulai = None
+        self.selesai = None
+        self.future = None
+
+    def masuk_tahap(self, nama):
+        """Callback saat_tahap profiler: mencatat tahap aktif dan menghentikan job yang dibatalkan"""
+        self.periksa_batal()
+        self.tahap = nama
+
+    def periksa_batal(self):
+        if self.batal.is_set():
+            raise JobDibatalkan()
+
+    def ringkasan(self):
+        urutan = list(TAHAP_JOB)
+        if self.status == "selesai":
+            progres = 1.0
+        elif self.tahap in TAHAP_JOB:
+            progres = urutan.index(self.tahap) / len(urutan)
+        else:
+            progres = 0.0
+        with _kunci:
+            posisi = sum(1 for j in _jobs.values() if j.status == "antri" and j.dibuat <= self.dibuat) \
+                if self.status == "antri" else 0
+        return {
+            "id": self.id,
+            "status": self.status,
+            "tahap": self.tahap,
+            "label": TAHAP_JOB.get(self.tahap, self.tahap or "Menunggu giliran"),
+            "progres": progres,
+            "posisi_antrean": posisi,
+            "error": self.error,
+            "ada_pratinjau": self.hasil_sementara is not None,
+            "durasi_s": round((self.selesai or time.time()) - (self.mulai or time.time()), 1),
+        }
+
+_kunci = threading.Lock()
+_jobs = {}
+
+@functools.lru_cache(maxsize=None)
+def eksekutor_job():
+    """Thread pool bersama untuk seluruh sesi; jumlah worker = batas job paralel"""
+    return ThreadPoolExecutor(max_workers=BATAS_JOB_PARALEL, thread_name_prefix="job_sdi")
+
+def kirim_job(fungsi, **kwargs):
+    """Memasukkan fungsi(job, **kwargs) ke antrean dan mengembalikan job_id"""
+    _lupakan_job_lama()
+    job = Job()
+    with _kunci:
+        _jobs[job.id] = job
+    job.future = eksekutor_job().submit(_jalankan, job, fungsi, kwargs)
+    return job.id
+
+def status_job(job_id):
+    """Ringkasan status job (dict) atau None bila job tidak dikenal"""
+    job = _jobs.get(job_id)
+    return job.ringkasan() if job else None
+
+def hasil_job(job_id):
+    job = _jobs.get(job_id)
+    return job.hasil if job else None
+
+def hasil_sementara_job(job_id):
+    job = _jobs.get(job_id)
+    return job.hasil_sementara if job else None
+
+def batalkan_job(job_id):
+    """Membatalkan job; job yang masih antri langsung dibatalkan, yang berjalan berhenti di batas tahap berikutnya"""
+    job = _jobs.get(job_id)
+    if job is None:
+        return
+    job.batal.set()
+    if job.future is not None and job.future.cancel():
+        job.status = "dibatalkan"
+        job.selesai = time.time()
+
+def _jalankan(job, fungsi, kwargs):
+    job.status = "berjalan"
+    job.mulai = time.time()
+    try:
+        job.periksa_batal()
+        job.hasil = fungsi(job, **kwargs)
+        job.periksa_batal()
+        job.status = "selesai"
+    except JobDibatalkan:
+        job.status = "dibatalkan"
+    except Exception as e:
+        if job.batal.is_set():
+            # Mis. CancelledError dari shard process pool yang dihentikan karena pembatalan
+            job.status = "dibatalkan"
+        else:
+            job.status = "gagal"
+            job.error = f"{type(e).__name__}: {e}"
+    finally:
+        job.selesai = time.time()
+
+def _lupakan_job_lama():
+    batas = time.time() - SIMPAN_JOB_MENIT * 60
+    with _kunci:
+        for job_id in [k for k, j in _jobs.items() if j.selesai is not None and j.selesai < batas]:
+            del _jobs[job_id]
+
+# =========================================
+# JOB RUN SDI (APLIKASI STREAMLIT)
+# =========================================
+def proses_run_sdi(job, jalan, retak=None, pothole=None, rutting=None, dsm_upload=None, dsm_link=None,
+                   lebar_jalan=3.0, interval_segmen=100, epsg_code=32749, kolom_rute=None, info=None,
+                   pratinjau=False, profil=False, perkiraan=True):
+    """Job lengkap satu run aplikasi: siapkan DSM -> (pratinjau perkiraan) -> hitung SDI -> simpan artefak & riwayat -> payload peta & grafik.
+
+    Dengan perkiraan=True, hasil hitung_survey_perkiraan diterbitkan lebih dulu di job.hasil_sementara
+    (tidak dijalankan pada mode streaming, karena pratinjau memuat layer kerusakan secara utuh).
+    """
+    profiler = ProfilerTahap(aktif=profil, saat_tahap=job.masuk_tahap)
+
+    with profiler.tahap("siapkan_dsm"):
+        if dsm_upload is not None:
+            dsm_path = siapkan_dsm_cache("upload_" + sidik_sumber(dsm_upload), buffer=dsm_upload.getbuffer())
+        elif id_google_drive(dsm_link or ""):
+            dsm_path = siapkan_dsm(dsm_link)
+        else:
+            raise ValueError("Link Google Drive tidak valid. Pastikan format link benar.")
+
+    if perkiraan and not BATCH_KERUSAKAN:
+        with profiler.tahap("perkiraan") as catatan:
+            df_kira, seg_kira, ringkasan = hitung_survey_perkiraan(
+                jalan, dsm_path, retak=retak, pothole=pothole, rutting=rutting, lebar_jalan=lebar_jalan,
+                interval_segmen=interval_segmen, epsg_code=epsg_code, kolom_rute=kolom_rute, cache=CACHE_TAHAP,
+            )
+            catatan["segmen"] = len(df_kira)
+            job.hasil_sementara = {
+                "peta_web": payload_peta_web(seg_kira),
+                "distribusi": df_kira["Kondisi"].value_counts().reindex(list(WARNA_KONDISI), fill_value=0).to_dict(),
+                "rata_sdi": (df_kira["SDI4"].mean(), df_kira["SDI4_Perkiraan_Min"].mean(), df_kira["SDI4_Perkiraan_Maks"].mean()),
+                "ringkasan": ringkasan,
+            }
+
+    df_sdi, seg_gdf = hitung_survey(
+        jalan, dsm_path, retak=retak, pothole=pothole, rutting=rutting, lebar_jalan=lebar_jalan,
+        interval_segmen=interval_segmen, epsg_code=epsg_code, kolom_rute=kolom_rute, profiler=profiler, batal=job.batal,
+        cache=CACHE_TAHAP, max_workers_shard=SHARD_PARALEL, batch_kerusakan=BATCH_KERUSAKAN or None,
+    )
+
+    with profiler.tahap("simpan", segmen=len(seg_gdf)):
+        run_id = simpan_run(df_sdi, seg_gdf, info=info, interval_segmen=interval_segmen, pratinjau=pratinjau)
+        # Run pratinjau (render cepat) tetap dihitung presisi, sehingga ikut dicatat di riwayat tren
+        survey_id = simpan_riwayat(seg_gdf, info=info, interval_segmen=interval_segmen, run_id=run_id) \
+            if PATH_RIWAYAT else None
+    with profiler.tahap("render", segmen=len(seg_gdf)):
+        peta_web = payload_peta_web(seg_gdf)
+        path_artefak(run_id, "grafik")
+
+    return {"run_id": run_id, "survey_id": survey_id, "peta_web": peta_web, "laporan_performa": profiler.laporan() if profiler.aktif else None}
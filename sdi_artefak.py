@@ -0,0 +1,174 @@
+"""Penyimpanan hasil run SDI di disk dengan ekspor (peta, grafik, PDF, GPKG, GeoParquet, FlatGeobuf, XLSX) yang dibuat secara lazy.
+
+Setiap run disimpan di folder `<DIREKTORI_ARTEFAK>/<run_id>/` berisi seg_gdf (GeoParquet),
+df_sdi (Parquet), dan meta.json. Ekspor baru dibuat saat pertama kali diminta lalu disimpan
+di folder yang sama, sehingga permintaan berikutnya cukup membaca file. Run yang lebih tua
+dari TTL atau melewati batas ukuran total (LRU) dihapus setiap kali run baru disimpan.
+"""
+import os
+import json
+import time
+import uuid
+import shutil
+import tempfile
+import threading
+import functools
+
+from sdi_impor import modul_lazy
+from sdi_pipeline import (INFO_SURVEY_DEFAULT, buat_grafik, buat_peta, buat_peta_strip, tulis_excel, tulis_flatgeobuf,
+                          tulis_geoparquet, tulis_gpkg)
+
+pd = modul_lazy("pandas")
+gpd = modul_lazy("geopandas")
+
+DIREKTORI_ARTEFAK = os.environ.get("GEOSDI_ARTEFAK", os.path.join(os.path.expanduser("~"), ".cache", "geosdi", "artefak"))
+TTL_ARTEFAK_JAM = float(os.environ.get("GEOSDI_ARTEFAK_TTL_JAM", 24))
+BATAS_ARTEFAK_GB = float(os.environ.get("GEOSDI_ARTEFAK_GB", 5))
+
+# Nama file setiap jenis ekspor di folder run
+ARTEFAK = {
+    "peta": "peta_sdi.png",
+    "grafik": "grafik_sdi.png",
+    "pdf": "Laporan_SDI.pdf",
+    "gpkg": "Peta_Hasil_SDI.gpkg",
+    "geoparquet": "Peta_Hasil_SDI.parquet",
+    "fgb": "Peta_Hasil_SDI.fgb",
+    "excel": "Data_SDI.xlsx",
+}
+
+_kunci_global = threading.Lock()
+_kunci_artefak = {}
+
+def folder_run(run_id):
+    return os.path.join(DIREKTORI_ARTEFAK, run_id)
+
+def run_tersedia(run_id):
+    """True bila folder run masih ada (belum dihapus karena TTL/batas ukuran)"""
+    return bool(run_id) and os.path.exists(os.path.join(folder_run(run_id), "meta.json"))
+
+def simpan_run(df_sdi, seg_gdf, info=None, interval_segmen=100, pratinjau=False):
+    """Menyimpan hasil hitung satu run ke disk dan mengembalikan run_id"""
+    os.makedirs(DIREKTORI_ARTEFAK, exist_ok=True)
+    run_id = uuid.uuid4().hex
+    folder_sementara = tempfile.mkdtemp(suffix=".tmp", dir=DIREKTORI_ARTEFAK)
+    try:
+        seg_gdf.to_parquet(os.path.join(folder_sementara, "segmen.parquet"))
+        df_sdi.to_parquet(os.path.join(folder_sementara, "sdi.parquet"), index=False)
+        meta = {"info": {**INFO_SURVEY_DEFAULT, **(info or {})}, "interval_segmen": interval_segmen,
+                "pratinjau": pratinjau, "dibuat": time.time()}
+        with open(os.path.join(folder_sementara, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(folder_sementara, folder_run(run_id))
+    finally:
+        if os.path.exists(folder_sementara):
+            shutil.rmtree(folder_sementara, ignore_errors=True)
+
+    bersihkan_artefak(kecuali=run_id)
+    return run_id
+
+# Hasil baca dibagi antar sesi dan tidak boleh diubah di tempat (pakai .copy() bila perlu)
+@functools.lru_cache(maxsize=8)
+def muat_seg_gdf(run_id):
+    _tandai_dipakai(run_id)
+    return gpd.read_parquet(os.path.join(folder_run(run_id), "segmen.parquet"))
+
+@functools.lru_cache(maxsize=8)
+def muat_df_sdi(run_id):
+    _tandai_dipakai(run_id)
+    return pd.read_parquet(os.path.join(folder_run(run_id), "sdi.parquet"))
+
+@functools.lru_cache(maxsize=32)
+def muat_meta(run_id):
+    with open(os.path.join(folder_run(run_id), "meta.json")) as f:
+        return json.load(f)
+
+def path_artefak(run_id, jenis):
+    """Path ekspor `jenis` untuk run_id; dibuat sekali saat pertama diminta lalu dipakai ulang"""
+    path = os.path.join(folder_run(run_id), ARTEFAK[jenis])
+    _tandai_dipakai(run_id)
+    if os.path.exists(path):
+        return path
+
+    with _kunci_global:
+        kunci = _kunci_artefak.setdefault(path, threading.Lock())
+    with kunci:
+        if not os.path.exists(path):
+            # Ditulis dengan nama akhir di subfolder sementara (nama layer GPKG mengikuti nama file), lalu dipindah
+            with tempfile.TemporaryDirectory(dir=folder_run(run_id)) as folder_sementara:
+                path_sementara = os.path.join(folder_sementara, ARTEFAK[jenis])
+                _buat_artefak(run_id, jenis, path_sementara)
+                os.replace(path_sementara, path)
+    return path
+
+def baca_artefak(run_id, jenis):
+    """Bytes ekspor `jenis` (dipakai sebagai callable data pada st.download_button)"""
+    with open(path_artefak(run_id, jenis), "rb") as f:
+        return f.read()
+
+def _buat_artefak(run_id, jenis, path):
+    meta = muat_meta(run_id)
+    dpi = 96 if meta["pratinjau"] else 300
+    if jenis == "peta":
+        buat_peta(muat_seg_gdf(run_id), path, dpi=dpi, label=not meta["pratinjau"])
+    elif jenis == "grafik":
+        buat_grafik(muat_seg_gdf(run_id), path, dpi=dpi)
+    elif jenis == "gpkg":
+        tulis_gpkg(muat_seg_gdf(run_id), path)
+    elif jenis == "geoparquet":
+        tulis_geoparquet(muat_seg_gdf(run_id), path)
+    elif jenis == "fgb":
+        tulis_flatgeobuf(muat_seg_gdf(run_id), path)
+    elif jenis == "excel":
+        tulis_excel(muat_df_sdi(run_id), path)
+    elif jenis == "pdf":
+        from sdi_laporan import buat_laporan_pdf
+        seg_gdf = muat_seg_gdf(run_id)
+        peta_path, grafik_path = path_artefak(run_id, "peta"), path_artefak(run_id, "grafik")
+        with tempfile.TemporaryDirectory(dir=folder_run(run_id)) as folder_strip:
+            peta_strip = [] if meta["pratinjau"] else buat_peta_strip(seg_gdf, folder_strip)
+            buat_laporan_pdf(path, muat_df_sdi(run_id), seg_gdf, meta["info"], meta["interval_segmen"],
+                             peta_path, grafik_path, peta_strip=peta_strip)
+    else:
+        raise ValueError(f"Jenis artefak tidak dikenal: {jenis}")
+
+def _tandai_dipakai(run_id):
+    try:
+        os.utime(folder_run(run_id))  # LRU: mtime folder = terakhir dipakai
+    except FileNotFoundError:
+        pass
+
+def _ukuran_folder(folder):
+    total = 0
+    for akar, _, files in os.walk(folder):
+        for f in files:
+            try:
+                total += os.path.getsize(os.path.join(akar, f))
+            except OSError:
+                pass
+    return total
+
+def bersihkan_artefak(kecuali=None):
+    """Menghapus run yang melewati TTL, lalu run paling lama tidak dipakai hingga total ukuran di bawah batas"""
+    if not os.path.isdir(DIREKTORI_ARTEFAK):
+        return
+    sekarang = time.time()
+    runs = []
+    for nama in os.listdir(DIREKTORI_ARTEFAK):
+        folder = os.path.join(DIREKTORI_ARTEFAK, nama)
+        if nama == kecuali or nama.endswith(".tmp") or not os.path.isdir(folder):
+            continue
+        mtime = os.path.getmtime(folder)
+        if sekarang - mtime > TTL_ARTEFAK_JAM * 3600:
+            shutil.rmtree(folder, ignore_errors=True)
+        else:
+            runs.append((mtime, _ukuran_folder(folder), folder))
+
+    total = sum(size for _, size, _ in runs)
+    if kecuali:
+        total += _ukuran_folder(folder_run(kecuali))
+    batas = BATAS_ARTEFAK_GB * 1024 ** 3
+    for _, size, folder in sorted(runs):
+        if total <= batas:
+            break
+        shutil.rmtree(folder, ignore_errors=True)
+        total -= size
@@ -0,0 +1,174 @@
+"""Eksekusi batch pipeline SDI untuk banyak survey sekaligus (tanpa browser).
+
+Manifest berupa CSV atau JSON dengan satu baris/objek per survey. Kolom yang dikenali:
+
+    nama, jalan, retak, pothole, rutting, dsm,
+    lebar_jalan, interval_segmen, epsg_code, kolom_rute,
+    lokasi, sta_umum, surveyor, tanggal, instansi
+
+`jalan` dan `dsm` wajib diisi; `dsm` boleh berupa path .tif atau link Google Drive.
+Path relatif dihitung dari folder manifest.
+
+Contoh:
+    python sdi_batch.py manifest.csv --output hasil_batch --workers 8
+    python sdi_batch.py manifest.csv --riwayat riwayat_sdi.gpkg
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import geopandas as gpd
+
+from sdi_pipeline import INFO_SURVEY_DEFAULT, id_google_drive, jalankan_pipeline, siapkan_dsm
+from sdi_profiling import ProfilerTahap
+from sdi_riwayat import simpan_riwayat
+
+KOLOM_PATH = ["jalan", "retak", "pothole", "rutting", "dsm"]
+
+def baca_manifest(manifest_path):
+    """Membaca manifest survey (CSV/JSON) menjadi list dict dengan path absolut"""
+    if manifest_path.lower().endswith(".json"):
+        with open(manifest_path) as f:
+            data = json.load(f)
+        daftar = data["survey"] if isinstance(data, dict) else data
+    else:
+        daftar = pd.read_csv(manifest_path, dtype=str, keep_default_na=False).to_dict("records")
+
+    folder_manifest = os.path.dirname(os.path.abspath(manifest_path))
+    daftar_survey = []
+    for i, baris in enumerate(daftar, start=1):
+        survey = {k: v for k, v in baris.items() if v not in ("", None)}
+        for kolom in KOLOM_PATH:
+            if kolom in survey and not id_google_drive(str(survey[kolom])):
+                survey[kolom] = os.path.join(folder_manifest, survey[kolom])
+        if "jalan" not in survey or "dsm" not in survey:
+            raise ValueError(f"Survey ke-{i} pada manifest wajib memiliki kolom 'jalan' dan 'dsm'.")
+        survey.setdefault("nama", f"survey_{i:03d}")
+        daftar_survey.append(survey)
+    return daftar_survey
+
+def proses_survey(survey, dsm_path, output_root, profil=False, batch_kerusakan=None):
+    """Menjalankan pipeline untuk satu survey dan mengembalikan satu baris ringkasan"""
+    mulai = time.perf_counter()
+    ringkasan = {"nama": survey["nama"], "status": "gagal", "jumlah_segmen": 0, "panjang_km": 0.0,
+                 "rata_sdi": None, "kondisi_dominan": None, "durasi_s": None, "output_dir": None, "error": None}
+    try:
+        if isinstance(dsm_path, Exception):
+            raise dsm_path
+        output_dir = os.path.join(output_root, survey["nama"])
+        interval_segmen = float(survey.get("interval_segmen", 100))
+        hasil = jalankan_pipeline(
+            survey["jalan"], dsm_path, output_dir,
+            retak=survey.get("retak"), pothole=survey.get("pothole"), rutting=survey.get("rutting"),
+            lebar_jalan=float(survey.get("lebar_jalan", 3.0)),
+            interval_segmen=interval_segmen,
+            epsg_code=int(survey.get("epsg_code", 32749)),
+            kolom_rute=survey.get("kolom_rute"),
+            info={k: survey[k] for k in INFO_SURVEY_DEFAULT if k in survey},
+            # Paralelisme sudah di level survey; DSM dibaca satu thread per proses agar core tidak berebut
+            max_workers_dsm=1,
+            max_workers_render=1,
+            profiler=ProfilerTahap(aktif=profil),
+            batch_kerusakan=batch_kerusakan,
+        )
+        df_sdi = hasil["df_sdi"]
+        ringkasan.update({
+            "status": "sukses",
+            "jumlah_segmen": len(df_sdi),
+            "panjang_km": round(len(df_sdi) * interval_segmen / 1000, 3),
+            "rata_sdi": round(df_sdi["SDI4"].mean(), 2),
+            "kondisi_dominan": df_sdi["Kondisi"].value_counts().idxmax() if not df_sdi.empty else "-",
+            "output_dir": output_dir,
+        })
+    except Exception as e:
+        ringkasan["error"] = f"{type(e).__name__}: {e}"
+    ringkasan["durasi_s"] = round(time.perf_counter() - mulai, 3)
+    return ringkasan
+
+def jalankan_batch(daftar_survey, output_root, workers=None, profil=False, batch_kerusakan=None, riwayat=None):
+    """Menjalankan banyak survey pada process pool (default satu worker per core).
+
+    Bila `riwayat` diisi path GeoPackage, setiap survey yang sukses ditambahkan ke riwayat multi-survey
+    oleh proses utama (penulisan riwayat tidak paralel), urut sesuai manifest.
+    """
+    os.makedirs(output_root, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    mulai = time.perf_counter()
+
+    baris_ringkasan = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 1. Setiap DSM unik disiapkan (dikonversi ke cache) sekali saja sebelum survey diproses
+        dsm_siap = {}
+        futures_dsm = {pool.submit(siapkan_dsm, sumber): sumber for sumber in {s["dsm"] for s in daftar_survey}}
+        for future in as_completed(futures_dsm):
+            try:
+                dsm_siap[futures_dsm[future]] = future.result()
+            except Exception as e:
+                dsm_siap[futures_dsm[future]] = e
+
+        # 2. Survey diproses paralel memakai DSM dari cache
+        futures = [pool.submit(proses_survey, survey, dsm_siap[survey["dsm"]], output_root, profil, batch_kerusakan)
+                   for survey in daftar_survey]
+        for future in as_completed(futures):
+            ringkasan = future.result()
+            print(f"[{ringkasan['status']}] {ringkasan['nama']} ({ringkasan['durasi_s']} s)"
+                  + (f" - {ringkasan['error']}" if ringkasan["error"] else ""))
+            baris_ringkasan.append(ringkasan)
+
+    durasi = time.perf_counter() - mulai
+    urutan = {survey["nama"]: i for i, survey in enumerate(daftar_survey)}
+    df_ringkasan = pd.DataFrame(baris_ringkasan).sort_values("nama", key=lambda s: s.map(urutan))
+    sukses = df_ringkasan[df_ringkasan["status"] == "sukses"]
+
+    if riwayat:
+        survey_per_nama = {survey["nama"]: survey for survey in daftar_survey}
+        for baris in sukses.itertuples():
+            survey = survey_per_nama[baris.nama]
+            seg_gdf = gpd.read_parquet(os.path.join(baris.output_dir, "Peta_Hasil_SDI.parquet"))
+            simpan_riwayat(seg_gdf, info={k: survey[k] for k in INFO_SURVEY_DEFAULT if k in survey},
+                           interval_segmen=float(survey.get("interval_segmen", 100)), path=riwayat)
+
+    throughput = {
+        "jumlah_survey": len(df_ringkasan),
+        "sukses": len(sukses),
+        "gagal": len(df_ringkasan) - len(sukses),
+        "workers": workers,
+        "durasi_total_s": round(durasi, 3),
+        "survey_per_menit": round(len(sukses) / durasi * 60, 2) if durasi > 0 else None,
+        "segmen_per_detik": round(sukses["jumlah_segmen"].sum() / durasi, 2) if durasi > 0 else None,
+        "km_per_jam": round(sukses["panjang_km"].sum() / durasi * 3600, 2) if durasi > 0 else None,
+    }
+    df_ringkasan.to_csv(os.path.join(output_root, "ringkasan_batch.csv"), index=False)
+    with open(os.path.join(output_root, "ringkasan_batch.json"), "w") as f:
+        json.dump({"throughput": throughput, "survey": df_ringkasan.to_dict("records")}, f, indent=2, default=str)
+    return df_ringkasan, throughput
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eksekusi batch pipeline SDI GeoSDI dari manifest CSV/JSON.")
+    parser.add_argument("manifest", help="Path manifest survey (.csv atau .json)")
+    parser.add_argument("-o", "--output", default="hasil_batch", help="Folder output (default: hasil_batch)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Jumlah proses paralel (default: jumlah core)")
+    parser.add_argument("--profil", action="store_true", help="Simpan laporan_performa.json (durasi & memori per tahap) per survey")
+    parser.add_argument("--batch-kerusakan", type=int, default=None,
+                        help="Baca layer kerusakan per N fitur (mode streaming, memori terbatas untuk layer jutaan fitur)")
+    parser.add_argument("--riwayat", metavar="PATH",
+                        help="Tambahkan hasil setiap survey ke riwayat multi-survey (GeoPackage) untuk kueri tren")
+    args = parser.parse_args(argv)
+
+    df_ringkasan, throughput = jalankan_batch(baca_manifest(args.manifest), args.output, workers=args.workers, profil=args.profil,
+                                              batch_kerusakan=args.batch_kerusakan, riwayat=args.riwayat)
+
+    print()
+    print(df_ringkasan.drop(columns=["output_dir"]).to_string(index=False))
+    print()
+    print(f"Selesai: {throughput['sukses']}/{throughput['jumlah_survey']} survey dalam {throughput['durasi_total_s']} s "
+          f"dengan {throughput['workers']} worker")
+    print(f"Throughput: {throughput['survey_per_menit']} survey/menit, {throughput['segmen_per_detik']} segmen/detik, "
+          f"{throughput['km_per_jam']} km/jam")
+    return 0 if throughput["gagal"] == 0 else 1
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+"""Impor lazy untuk stack berat (GIS, plotting, laporan) agar halaman pertama aplikasi tidak menunggu semuanya dimuat.
+
+Modul dipakai lewat proxy yang baru mengimpor modul aslinya saat atribut pertama kali diakses:
+
+    gpd = modul_lazy("geopandas")
+    gpd.read_file(...)  # geopandas baru diimpor di sini
+
+Impor berjalan lewat importlib (thread lain yang mengakses proxy bersamaan menunggu impor selesai);
+setelah itu akses atribut langsung diteruskan ke modul aslinya.
+"""
+import importlib
+import sys
+
+class ModulLazy:
+    """Proxy modul; `sebelum_impor` dipanggil sekali tepat sebelum modul diimpor (mis. memilih backend matplotlib)"""
+
+    def __init__(self, nama, sebelum_impor=None):
+        self._nama = nama
+        self._sebelum_impor = sebelum_impor
+        self._modul = None
+
+    def _muat(self):
+        if self._modul is None:
+            if self._sebelum_impor is not None and self._nama not in sys.modules:
+                self._sebelum_impor()
+            self._modul = importlib.import_module(self._nama)
+        return self._modul
+
+    def __getattr__(self, atribut):
+        return getattr(self._muat(), atribut)
+
+    def __dir__(self):
+        return dir(self._muat())
+
+    def __repr__(self):
+        status = "dimuat" if self._nama in sys.modules else "belum dimuat"
+        return f"<modul lazy {self._nama!r} ({status})>"
+
+def modul_lazy(nama, sebelum_impor=None):
+    """Proxy lazy untuk modul `nama` (langsung modul aslinya bila sudah pernah diimpor)"""
+    return sys.modules.get(nama) or ModulLazy(nama, sebelum_impor)
+
+def _backend_agg():
+    import matplotlib
+    matplotlib.use("Agg")
+
+def pyplot_lazy():
+    """matplotlib.pyplot dengan backend Agg (render ke file, tanpa display), diimpor saat render pertama"""
+    if "matplotlib.pyplot" in sys.modules:
+        return sys.modules["matplotlib.pyplot"]
+    return ModulLazy("matplotlib.pyplot", sebelum_impor=_backend_agg)
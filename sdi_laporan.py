@@ -0,0 +1,150 @@
+"""Laporan PDF SDI (ReportLab): ringkasan, peta, grafik, peta lajur, dan tabel per segmen.
+
+Dipisah dari sdi_pipeline agar stack ReportLab baru diimpor saat laporan benar-benar disusun
+(unduhan PDF di aplikasi, atau tahap pdf pada jalankan_pipeline), bukan saat aplikasi dibuka.
+"""
+import io
+
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak, Flowable
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import pagesizes
+from reportlab.lib.units import inch
+from reportlab.lib.enums import TA_CENTER
+
+GAYA_TABEL_SEGMEN = TableStyle([
+    ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+    ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#1e293b")),
+    ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0,0), (-1,-1), 9),
+    ('PADDING', (0,0), (-1,-1), 6)
+])
+
+class TabelTertunda(Flowable):
+    """Flowable yang baru membangun Table saat ditata lalu melepasnya setelah digambar.
+
+    Laporan ribuan segmen hanya menyimpan potongan DataFrame di daftar elemen,
+    sehingga baris tabel (string + objek sel) tidak pernah ada di memori sekaligus.
+    """
+
+    def __init__(self, df_potongan, kolom, header, lebar_kolom):
+        super().__init__()
+        self.df_potongan = df_potongan
+        self.kolom = kolom
+        self.header = header
+        self.lebar_kolom = lebar_kolom
+        self._tabel = None
+
+    def tabel(self):
+        if self._tabel is None:
+            data = [self.header] + self.df_potongan[self.kolom].astype(str).to_numpy().tolist()
+            self._tabel = Table(data, repeatRows=1, colWidths=self.lebar_kolom)
+            self._tabel.setStyle(GAYA_TABEL_SEGMEN)
+        return self._tabel
+
+    def wrap(self, availWidth, availHeight):
+        self.width, self.height = self.tabel().wrap(availWidth, availHeight)
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        bagian = self.tabel().split(availWidth, availHeight)
+        self._tabel = None
+        return bagian
+
+    def drawOn(self, canvas, x, y, _sW=0):
+        self.tabel().drawOn(canvas, x, y, _sW)
+        self._tabel = None
+
+def tabel_per_halaman(df, kolom, header, lebar_kolom, baris_per_halaman=30):
+    """Memecah tabel per segmen menjadi TabelTertunda berukuran satu halaman A4"""
+    return [TabelTertunda(df.iloc[i:i + baris_per_halaman], kolom, header, lebar_kolom)
+            for i in range(0, len(df), baris_per_halaman)] or [TabelTertunda(df, kolom, header, lebar_kolom)]
+
+def _sumber_gambar(sumber):
+    """Path PNG atau bytes PNG (untuk laporan yang disusun dari memori)"""
+    return io.BytesIO(sumber) if isinstance(sumber, (bytes, bytearray)) else sumber
+
+def buat_laporan_pdf(pdf_path, df_sdi, seg_gdf, info, interval_segmen, peta_path, grafik_path, peta_strip=None):
+    """Menyusun laporan PDF SDI (ringkasan, peta, grafik, peta lajur opsional, dan tabel per segmen).
+
+    pdf_path boleh berupa path atau objek file (mis. BytesIO); gambar boleh berupa path atau bytes PNG.
+    Memori tata letak tabel dibatasi per halaman (TabelTertunda), tetapi canvas ReportLab menyimpan stream setiap
+    halaman yang selesai hingga dokumen disimpan, sehingga memori puncak tetap naik linear dengan jumlah segmen
+    (sekitar 1,2 MB per 1.000 segmen; ukuran PDF akhir sekitar 0,15 MB per 1.000 segmen).
+    """
+    lokasi, sta_umum, surveyor, tanggal, instansi = (info[k] for k in ("lokasi", "sta_umum", "surveyor", "tanggal", "instansi"))
+
+    doc = SimpleDocTemplate(pdf_path, pagesize=pagesizes.A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    elements = []
+    styles = getSampleStyleSheet()
+    cover_style = ParagraphStyle('cover', parent=styles['Title'], alignment=TA_CENTER)
+    rata_sdi = round(df_sdi["SDI4"].mean(), 2)
+    kondisi_dominan = df_sdi["Kondisi"].value_counts().idxmax() if not df_sdi.empty else "-"
+
+    elements.append(Paragraph(instansi, cover_style))
+    elements.append(Spacer(1, 0.3*inch))
+    elements.append(Paragraph("LAPORAN SURVEY", cover_style))
+    elements.append(Spacer(1, 0.3*inch))
+    elements.append(Paragraph("SURFACE DISTRESS INDEX (SDI)", cover_style))
+    elements.append(Spacer(1, 1*inch))
+    elements.append(Paragraph(f"<b>Lokasi :</b> {lokasi}", styles["Normal"]))
+    elements.append(Paragraph(f"<b>STA :</b> {sta_umum}", styles["Normal"]))
+    elements.append(Paragraph(f"<b>Surveyor :</b> {surveyor}", styles["Normal"]))
+    elements.append(Paragraph(f"<b>Tanggal :</b> {tanggal}", styles["Normal"]))
+    elements.append(PageBreak())
+
+    elements.append(Paragraph("<b>1. Ringkasan Rekapitulasi Umum</b>", styles["Heading2"]))
+    ringkasan_table = Table([
+        ["Lokasi", lokasi], ["STA", sta_umum],
+        ["Jumlah Segmen", str(len(seg_gdf))],
+        ["Panjang Jalan Terukur", f"{len(seg_gdf)*interval_segmen} meter"],
+        ["Rata-rata SDI Keseluruhan", f"{rata_sdi}"],
+        ["Kondisi Dominan", kondisi_dominan]
+    ], colWidths=[200, 300])
+    ringkasan_table.setStyle(TableStyle([
+        ('GRID',(0,0),(-1,-1),0.5,colors.grey),
+        ('BACKGROUND',(0,0),(0,-1),colors.HexColor("#f3f4f6")),
+        ('FONTNAME', (0,0), (0,-1), 'Helvetica-Bold'),
+        ('PADDING', (0,0), (-1,-1), 8)
+    ]))
+    elements.append(ringkasan_table)
+    elements.append(Spacer(1, 0.3 * inch))
+
+    elements.append(Paragraph("<b>2. Visualisasi Kondisi Jalan</b>", styles["Heading2"]))
+    elements.append(Image(_sumber_gambar(peta_path), width=7.5*inch, height=4.5*inch))
+    elements.append(Spacer(1, 0.2 * inch))
+    elements.append(Image(_sumber_gambar(grafik_path), width=4.5*inch, height=3*inch))
+    elements.append(PageBreak())
+
+    # --- PETA LAJUR (KORIDOR PANJANG), DUA LEMBAR PER HALAMAN ---
+    if peta_strip:
+        elements.append(Paragraph("<b>Peta Lajur Kondisi Jalan</b>", styles["Heading2"]))
+        for i, (judul, path) in enumerate(peta_strip):
+            elements.append(Image(_sumber_gambar(path), width=7.5*inch, height=3.2*inch))
+            elements.append(Spacer(1, 0.2 * inch))
+            if i % 2 == 1 and i < len(peta_strip) - 1:
+                elements.append(PageBreak())
+        elements.append(PageBreak())
+
+    # --- TABEL 3 & 4: STA digabung sekali, tabel dipecah per halaman dan baru dibangun saat ditata ---
+    df_tabel = df_sdi.merge(seg_gdf[["Segmen", "STA"]], on="Segmen", how="left")
+
+    elements.append(Paragraph("<b>3. Data Kerusakan Terukur Per Segmen</b>", styles["Heading2"]))
+    elements.append(Spacer(1, 0.2 * inch))
+    header1 = ["Segmen", "STA", "% Retak", "Lebar Retak\n(mm)", "Jumlah\nLubang", "Rutting\n(cm)"]
+    kolom1 = ["Segmen", "STA", "%Retak", "Lebar Retak (mm)", "Jumlah Lubang", "Rutting (cm)"]
+    lebar1 = [0.8*inch, 2.0*inch, 1.0*inch, 1.2*inch, 1.0*inch, 1.0*inch]
+    elements.extend(tabel_per_halaman(df_tabel, kolom1, header1, lebar1))
+    elements.append(PageBreak())
+
+    elements.append(Paragraph("<b>4. Perhitungan Berjenjang SDI Per Segmen</b>", styles["Heading2"]))
+    elements.append(Spacer(1, 0.2 * inch))
+    header2 = ["Segmen", "STA", "SDI 1\n(Retak)", "SDI 2\n(+L. Retak)", "SDI 3\n(+Lubang)", "SDI 4\n(+Rutting)", "Kondisi Akhir"]
+    kolom2 = ["Segmen", "STA", "SDI1", "SDI2", "SDI3", "SDI4", "Kondisi"]
+    lebar2 = [0.8*inch, 1.8*inch, 0.8*inch, 0.9*inch, 0.8*inch, 0.8*inch, 1.1*inch]
+    elements.extend(tabel_per_halaman(df_tabel, kolom2, header2, lebar2))
+
+    doc.build(elements)
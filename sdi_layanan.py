@@ -0,0 +1,489 @@
+"""Layanan skor SDI lokal yang tetap hangat untuk koridor yang dihitung ulang berkali-kali.
+
+Setiap koridor dimuat sekali: grid segmen beserta STRtree-nya, fitur kerusakan per layer, dan indeks
+fitur <-> segmen disimpan di memori, sedangkan dataset DSM tetap terbuka di pool handle. Penambahan
+atau penghapusan fitur hanya menghitung ulang segmen yang disentuh fitur tersebut (overlay dan skor
+memakai fungsi yang sama dengan hitung_survey, sehingga hasilnya sama dengan hitung ulang penuh).
+
+Layanan dapat dipakai langsung di proses yang sama (LayananSkor / KlienLokal) atau lewat HTTP lokal:
+
+    python sdi_layanan.py --port 8765 --manifest manifest.csv
+
+    GET    /status                      ringkasan koridor & handle DSM yang terbuka
+    POST   /koridor                     {"id", "jalan", "dsm", "retak", "pothole", "rutting", "lebar_jalan", ...}
+    GET    /koridor/<id>                tabel SDI seluruh segmen
+    DELETE /koridor/<id>                melepas koridor dari memori
+    POST   /koridor/<id>/fitur          {"layer", "fitur": GeoJSON FeatureCollection, "crs" (default EPSG:4326)}
+    POST   /koridor/<id>/hapus          {"layer", "id": [id fitur]}
+
+Path pada POST /koridor dibaca dari sisi server; `dsm` boleh berupa link Google Drive (lewat cache DSM).
+"""
+import abc
+import argparse
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import error as urllib_error
+from urllib import request as urllib_request
+
+import numpy as np
+
+from sdi_impor import modul_lazy
+from sdi_pipeline import (baca_layer_kerusakan, baca_layer_vektor, bersihkan_geometri, buat_segmen, hitung_depth_cm,
+                          hitung_kerusakan_segmen, hitung_tabel_sdi, siapkan_dsm)
+
+gpd = modul_lazy("geopandas")
+shapely = modul_lazy("shapely")
+rasterio = modul_lazy("rasterio")
+
+LAYER_KERUSAKAN = ("retak", "pothole", "rutting")
+
+class GalatLayanan(Exception):
+    """Permintaan ditolak layanan (status HTTP dan pesan dari server)"""
+
+    def __init__(self, status, pesan):
+        super().__init__(f"{status}: {pesan}")
+        self.status = status
+        self.pesan = pesan
+
+class KoridorTidakDitemukan(KeyError):
+    """Koridor dengan id tersebut belum dimuat (HTTP 404)"""
+
+    def __str__(self):
+        return self.args[0] if self.args else ""
+
+# =========================================
+# POOL HANDLE DSM
+# =========================================
+class PoolDSM:
+    """Dataset rasterio yang tetap terbuka per path (LRU, maksimal maks_handle).
+
+    Satu dataset GDAL tidak aman dibaca bersamaan, jadi setiap handle dipinjam bergantian lewat kuncinya
+    sendiri. File yang berubah di disk (mtime/ukuran berbeda) dibuka ulang saat dipinjam berikutnya;
+    handle yang sedang dipinjam tidak pernah ditutup oleh LRU.
+    """
+
+    def __init__(self, maks_handle=8):
+        self.maks_handle = maks_handle
+        self._handle = OrderedDict()  # path -> (dataset, kunci, sidik file)
+        self._kunci = threading.Lock()
+
+    @staticmethod
+    def _sidik(path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    @contextmanager
+    def pinjam(self, path):
+        path = os.path.abspath(path)
+        with self._kunci:
+            entri = self._handle.pop(path, None)
+            if entri is not None and entri[2] != self._sidik(path) and entri[1].acquire(blocking=False):
+                entri[0].close()
+                entri[1].release()
+                entri = None
+            if entri is None:
+                entri = (rasterio.open(path), threading.Lock(), self._sidik(path))
+            self._handle[path] = entri
+            self._tutup_lebih()
+        with entri[1]:
+            yield entri[0]
+
+    def _tutup_lebih(self):
+        for path in list(self._handle)[:-1]:
+            if len(self._handle) <= self.maks_handle:
+                return
+            dataset, kunci, _ = self._handle[path]
+            if kunci.acquire(blocking=False):
+                del self._handle[path]
+                dataset.close()
+                kunci.release()
+
+    def daftar(self):
+        with self._kunci:
+            return list(self._handle)
+
+    def tutup(self):
+        with self._kunci:
+            for dataset, kunci, _ in self._handle.values():
+                with kunci:
+                    dataset.close()
+            self._handle.clear()
+
+# =========================================
+# STATE KORIDOR DI MEMORI
+# =========================================
+class Koridor:
+    """Grid segmen + STRtree, fitur kerusakan per layer (id stabil), indeks fitur <-> segmen, dan tabel SDI satu koridor"""
+
+    def __init__(self, seg_gdf, layer, dsm_path):
+        self.seg_gdf = seg_gdf
+        self.crs = seg_gdf.crs
+        self.dsm_path = dsm_path
+        self._seg = seg_gdf[["Segmen", "Luas_Segmen", seg_gdf.geometry.name]]
+        self._pohon = shapely.STRtree(self._seg.geometry.values)
+        self.kunci = threading.Lock()
+
+        self.fitur = {nama: {} for nama in LAYER_KERUSAKAN}
+        self.kedalaman = {}
+        self.fitur_segmen = {nama: {} for nama in LAYER_KERUSAKAN}
+        self.segmen_fitur = {nama: [set() for _ in range(len(seg_gdf))] for nama in LAYER_KERUSAKAN}
+        self.id_berikut = dict.fromkeys(LAYER_KERUSAKAN, 0)
+        for nama, gdf in layer.items():
+            self.daftarkan(nama, gdf.geometry.values, gdf["kedalaman_calc"].values if nama == "rutting" else None)
+
+        self.df_sdi, _ = hitung_tabel_sdi(self._seg, *(layer[nama] for nama in LAYER_KERUSAKAN))
+
+    def daftarkan(self, layer, geoms, kedalaman=None):
+        """Menambahkan fitur ke layer dan indeks; mengembalikan (id fitur baru, posisi segmen yang disentuh)"""
+        awal = self.id_berikut[layer]
+        ids = np.arange(awal, awal + len(geoms))
+        self.id_berikut[layer] = awal + len(geoms)
+        self.fitur[layer].update(zip(ids.tolist(), geoms))
+        if kedalaman is not None:
+            self.kedalaman.update(zip(ids.tolist(), np.asarray(kedalaman, dtype=float).tolist()))
+
+        idx_fitur, idx_seg = self._pohon.query(geoms, predicate="intersects")
+        fitur_segmen, segmen_fitur = self.fitur_segmen[layer], self.segmen_fitur[layer]
+        urutan = np.argsort(idx_fitur, kind="stable")
+        idx_fitur, idx_seg = idx_fitur[urutan], idx_seg[urutan]
+        batas = np.flatnonzero(np.diff(idx_fitur)) + 1
+        for i, posisi in zip(idx_fitur[np.r_[0, batas]] if len(idx_fitur) else [], np.split(idx_seg, batas)):
+            fid = int(ids[i])
+            fitur_segmen[fid] = posisi
+            for p in posisi.tolist():
+                segmen_fitur[p].add(fid)
+        return ids, np.unique(idx_seg)
+
+    def lepaskan(self, layer, ids):
+        """Menghapus fitur dari layer dan indeks; mengembalikan posisi segmen yang disentuh"""
+        ids = list(dict.fromkeys(ids))
+        tidak_ada = [fid for fid in ids if fid not in self.fitur[layer]]
+        if tidak_ada:
+            raise ValueError(f"Fitur {layer} dengan id {tidak_ada[:10]} tidak ada di koridor.")
+        tersentuh = []
+        for fid in ids:
+            del self.fitur[layer][fid]
+            if layer == "rutting":
+                del self.kedalaman[fid]
+            posisi = self.fitur_segmen[layer].pop(fid, np.array([], dtype=int))
+            for p in posisi.tolist():
+                self.segmen_fitur[layer][p].discard(fid)
+            tersentuh.append(posisi)
+        return np.unique(np.concatenate(tersentuh)) if tersentuh else np.array([], dtype=int)
+
+    def layer_gdf(self, layer, ids=None):
+        """GeoDataFrame fitur layer (urut id, yaitu urutan penambahan); ids=None berarti seluruh fitur"""
+        ids = sorted(self.fitur[layer]) if ids is None else sorted(ids)
+        gdf = gpd.GeoDataFrame({"id": ids}, geometry=[self.fitur[layer][fid] for fid in ids], crs=self.crs)
+        if layer == "rutting":
+            gdf["kedalaman_calc"] = np.array([self.kedalaman[fid] for fid in ids], dtype=float)
+        return gdf
+
+    def hitung_ulang(self, posisi):
+        """Menghitung ulang skor segmen pada posisi baris tertentu hanya dari fitur yang beririsan dengannya"""
+        posisi = np.asarray(posisi, dtype=int)
+        if posisi.size == 0:
+            return self.df_sdi.iloc[[]]
+        layer = [self.layer_gdf(nama, set().union(*(self.segmen_fitur[nama][p] for p in posisi.tolist())))
+                 for nama in LAYER_KERUSAKAN]
+        kerusakan = hitung_kerusakan_segmen(self._seg.iloc[posisi], *layer)
+        df_baru, _ = hitung_tabel_sdi(self._seg.iloc[posisi], None, None, None, kerusakan=kerusakan)
+        for kolom in df_baru.columns:
+            self.df_sdi.loc[posisi, kolom] = df_baru[kolom].values
+        return self.df_sdi.iloc[posisi]
+
+    def ringkasan(self):
+        return {
+            "segmen": len(self.seg_gdf),
+            "fitur": {nama: len(self.fitur[nama]) for nama in LAYER_KERUSAKAN},
+            "dsm": self.dsm_path,
+            "crs": self.crs.to_string(),
+            "rata_sdi": round(float(self.df_sdi["SDI4"].mean()), 2) if len(self.df_sdi) else None,
+        }
+
+# =========================================
+# LAYANAN SKOR
+# =========================================
+class LayananSkor:
+    """Koridor hangat di memori + pool handle DSM; semua operasi aman dipanggil dari banyak thread"""
+
+    def __init__(self, maks_handle_dsm=8):
+        self.pool_dsm = PoolDSM(maks_handle_dsm)
+        self._koridor = {}
+        self._kunci = threading.Lock()
+
+    def muat_koridor(self, koridor_id, jalan, dsm, retak=None, pothole=None, rutting=None, lebar_jalan=3.0,
+                     interval_segmen=100, epsg_code=32749, kolom_rute=None, max_workers_dsm=None):
+        """Membaca jalan & layer kerusakan (dibersihkan seperti di hitung_survey), membuat segmen, menghitung
+        kedalaman rutting, dan skor awal koridor.
+
+        Koridor dengan id yang sama diganti setelah koridor baru selesai dimuat.
+        """
+        mulai = time.perf_counter()
+        dsm_path = siapkan_dsm(dsm)
+        seg_gdf = buat_segmen(baca_layer_vektor(jalan), interval_segmen, lebar_jalan, epsg_code, kolom_rute=kolom_rute)
+        layer, kebersihan = {}, {}
+        for nama, sumber in zip(LAYER_KERUSAKAN, (retak, pothole, rutting)):
+            layer[nama], kebersihan[nama] = bersihkan_geometri(baca_layer_kerusakan(sumber, seg_gdf.crs))
+        gdf_rutting = layer["rutting"]
+        kedalaman = hitung_depth_cm(gdf_rutting, dsm_path, max_workers=max_workers_dsm)["kedalaman_calc"].values \
+            if not gdf_rutting.empty else np.array([], dtype=float)
+        # Geometri tetap di CRS segmen; hanya nilai kedalaman yang diambil dari hitungan di CRS DSM
+        layer["rutting"] = gdf_rutting.assign(kedalaman_calc=kedalaman)
+
+        koridor = Koridor(seg_gdf, layer, dsm_path)
+        with self.pool_dsm.pinjam(dsm_path):
+            pass  # handle dibuka sekarang agar penambahan rutting pertama tidak menunggu pembukaan DSM
+        with self._kunci:
+            self._koridor[koridor_id] = koridor
+        return {"koridor": koridor_id, **koridor.ringkasan(), "kebersihan_geometri": kebersihan,
+                "durasi_ms": _durasi_ms(mulai)}
+
+    def koridor(self, koridor_id):
+        try:
+            return self._koridor[koridor_id]
+        except KeyError:
+            raise KoridorTidakDitemukan(f"Koridor {koridor_id!r} belum dimuat.") from None
+
+    def tambah_fitur(self, koridor_id, layer, gdf):
+        """Menambahkan fitur (GeoDataFrame) ke satu layer; hanya segmen yang disentuh fitur baru yang dihitung ulang.
+
+        Fitur tanpa CRS dianggap sudah di CRS koridor. Fitur dibersihkan dengan bersihkan_geometri (multipart dipecah
+        menjadi beberapa id). Mengembalikan id fitur baru, hitungan kebersihan, dan baris SDI yang berubah.
+        """
+        mulai = time.perf_counter()
+        koridor = self.koridor(koridor_id)
+        _periksa_layer(layer)
+        if gdf.crs is None:
+            gdf = gdf.set_crs(koridor.crs)
+        elif gdf.crs != koridor.crs:
+            gdf = gdf.to_crs(koridor.crs)
+        gdf, kebersihan = bersihkan_geometri(gdf)
+
+        kedalaman = None
+        if layer == "rutting" and not gdf.empty:
+            with self.pool_dsm.pinjam(koridor.dsm_path) as DSM:
+                kedalaman = hitung_depth_cm(gdf, koridor.dsm_path, dsm=DSM)["kedalaman_calc"].values
+        with koridor.kunci:
+            ids, posisi = koridor.daftarkan(layer, gdf.geometry.values, kedalaman)
+            df_baru = koridor.hitung_ulang(posisi)
+        return {"id": ids.tolist(), "kebersihan_geometri": kebersihan, "segmen": df_baru.to_dict("records"),
+                "durasi_ms": _durasi_ms(mulai)}
+
+    def hapus_fitur(self, koridor_id, layer, ids):
+        """Menghapus fitur berdasarkan id; hanya segmen yang disentuh fitur tersebut yang dihitung ulang"""
+        mulai = time.perf_counter()
+        koridor = self.koridor(koridor_id)
+        _periksa_layer(layer)
+        with koridor.kunci:
+            posisi = koridor.lepaskan(layer, [int(fid) for fid in ids])
+            df_baru = koridor.hitung_ulang(posisi)
+        return {"id": [int(fid) for fid in ids], "segmen": df_baru.to_dict("records"), "durasi_ms": _durasi_ms(mulai)}
+
+    def skor(self, koridor_id):
+        """Salinan tabel SDI koridor saat ini"""
+        koridor = self.koridor(koridor_id)
+        with koridor.kunci:
+            return koridor.df_sdi.copy()
+
+    def tutup_koridor(self, koridor_id):
+        with self._kunci:
+            if self._koridor.pop(koridor_id, None) is None:
+                raise KoridorTidakDitemukan(f"Koridor {koridor_id!r} belum dimuat.")
+
+    def status(self):
+        with self._kunci:
+            koridor = dict(self._koridor)
+        return {"koridor": {k: v.ringkasan() for k, v in koridor.items()}, "handle_dsm": self.pool_dsm.daftar()}
+
+    def tutup(self):
+        with self._kunci:
+            self._koridor.clear()
+        self.pool_dsm.tutup()
+
+def _periksa_layer(layer):
+    if layer not in LAYER_KERUSAKAN:
+        raise ValueError(f"Layer {layer!r} tidak dikenal (pilihan: {', '.join(LAYER_KERUSAKAN)}).")
+
+def _durasi_ms(mulai):
+    return round((time.perf_counter() - mulai) * 1000, 1)
+
+# =========================================
+# ROUTING (DIPAKAI HTTP & KLIEN LOKAL)
+# =========================================
+KOLOM_MUAT = ("jalan", "dsm", "retak", "pothole", "rutting", "lebar_jalan", "interval_segmen", "epsg_code", "kolom_rute")
+
+def tangani(layanan, metode, path, payload=None):
+    """Menjalankan satu permintaan (metode, path, payload JSON) dan mengembalikan (status HTTP, isi JSON).
+
+    Status 404 hanya untuk rute tidak dikenal dan KoridorTidakDitemukan, 400 untuk payload tidak valid
+    (ValueError/TypeError), dan 500 untuk galat lain (termasuk KeyError dari dalam perhitungan).
+    """
+    payload = payload or {}
+    bagian = [b for b in path.split("?")[0].split("/") if b]
+    try:
+        if metode == "GET" and bagian == ["status"]:
+            return 200, layanan.status()
+        if bagian[:1] == ["koridor"]:
+            if metode == "POST" and len(bagian) == 1:
+                if "id" not in payload or "jalan" not in payload or "dsm" not in payload:
+                    raise ValueError("Payload koridor wajib memiliki 'id', 'jalan', dan 'dsm'.")
+                return 200, layanan.muat_koridor(payload["id"], **{k: payload[k] for k in KOLOM_MUAT if k in payload})
+            if len(bagian) == 2 and metode == "GET":
+                return 200, {"koridor": bagian[1], "segmen": layanan.skor(bagian[1]).to_dict("records")}
+            if len(bagian) == 2 and metode == "DELETE":
+                layanan.tutup_koridor(bagian[1])
+                return 200, {"koridor": bagian[1]}
+            if len(bagian) == 3 and metode == "POST" and bagian[2] == "fitur":
+                koleksi = payload.get("fitur") or {}
+                gdf = gpd.GeoDataFrame.from_features(koleksi.get("features", []), crs=payload.get("crs") or "EPSG:4326")
+                return 200, layanan.tambah_fitur(bagian[1], payload.get("layer"), gdf)
+            if len(bagian) == 3 and metode == "POST" and bagian[2] == "hapus":
+                return 200, layanan.hapus_fitur(bagian[1], payload.get("layer"), payload.get("id", []))
+        return 404, {"error": f"Rute {metode} {path} tidak dikenal."}
+    except KoridorTidakDitemukan as e:
+        return 404, {"error": str(e)}
+    except (ValueError, TypeError) as e:
+        return 400, {"error": f"{type(e).__name__}: {e}"}
+    except Exception as e:
+        return 500, {"error": f"{type(e).__name__}: {e}"}
+
+class _PenanganHTTP(BaseHTTPRequestHandler):
+    def _proses(self, metode):
+        try:
+            panjang = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(panjang) or b"{}")
+            status, isi = tangani(self.server.layanan, metode, self.path, payload)
+        except ValueError as e:
+            status, isi = 400, {"error": f"Payload JSON tidak valid: {e}"}
+        data = json.dumps(isi, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._proses("GET")
+
+    def do_POST(self):
+        self._proses("POST")
+
+    def do_DELETE(self):
+        self._proses("DELETE")
+
+    def log_message(self, format, *args):
+        if self.server.log:
+            super().log_message(format, *args)
+
+def buat_server(layanan, host="127.0.0.1", port=8765, log=False):
+    """ThreadingHTTPServer untuk layanan (port=0 memilih port bebas); jalankan dengan serve_forever()"""
+    server = ThreadingHTTPServer((host, port), _PenanganHTTP)
+    server.layanan = layanan
+    server.log = log
+    return server
+
+# =========================================
+# KLIEN (IN-PROCESS & HTTP)
+# =========================================
+class _Klien(abc.ABC):
+    """Operasi layanan dengan payload JSON; subclass hanya menentukan cara permintaan dikirim"""
+
+    @abc.abstractmethod
+    def _kirim(self, metode, path, payload=None):
+        """Mengirim satu permintaan dan mengembalikan (status HTTP, isi JSON sebagai dict)"""
+
+    def _hasil(self, metode, path, payload=None):
+        status, isi = self._kirim(metode, path, payload)
+        if status >= 400:
+            raise GalatLayanan(status, isi.get("error"))
+        return isi
+
+    def status(self):
+        return self._hasil("GET", "/status")
+
+    def muat_koridor(self, koridor_id, jalan, dsm, **opsi):
+        return self._hasil("POST", "/koridor", {"id": koridor_id, "jalan": jalan, "dsm": dsm, **opsi})
+
+    def skor(self, koridor_id):
+        return self._hasil("GET", f"/koridor/{koridor_id}")["segmen"]
+
+    def tutup_koridor(self, koridor_id):
+        return self._hasil("DELETE", f"/koridor/{koridor_id}")
+
+    def tambah_fitur(self, koridor_id, layer, fitur, crs=None):
+        """fitur berupa GeoDataFrame (CRS-nya ikut dikirim) atau GeoJSON FeatureCollection (dict)"""
+        if hasattr(fitur, "to_json"):
+            crs = crs or (fitur.crs.to_string() if fitur.crs is not None else None)
+            fitur = json.loads(fitur[[fitur.geometry.name]].to_json())
+        return self._hasil("POST", f"/koridor/{koridor_id}/fitur", {"layer": layer, "fitur": fitur, "crs": crs})
+
+    def hapus_fitur(self, koridor_id, layer, ids):
+        return self._hasil("POST", f"/koridor/{koridor_id}/hapus", {"layer": layer, "id": list(ids)})
+
+class KlienLokal(_Klien):
+    """Klien in-process: payload melewati serialisasi JSON yang sama dengan HTTP, tanpa socket"""
+
+    def __init__(self, layanan=None):
+        self.layanan = layanan or LayananSkor()
+
+    def _kirim(self, metode, path, payload=None):
+        status, isi = tangani(self.layanan, metode, path, json.loads(json.dumps(payload, default=str)))
+        return status, json.loads(json.dumps(isi, default=str))
+
+class KlienHTTP(_Klien):
+    """Klien HTTP untuk layanan yang berjalan di proses lain (mis. http://127.0.0.1:8765)"""
+
+    def __init__(self, url="http://127.0.0.1:8765", timeout=600):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _kirim(self, metode, path, payload=None):
+        data = json.dumps(payload).encode() if payload is not None else None
+        permintaan = urllib_request.Request(self.url + path, data=data, method=metode,
+                                            headers={"Content-Type": "application/json"})
+        try:
+            with urllib_request.urlopen(permintaan, timeout=self.timeout) as respons:
+                return respons.status, json.load(respons)
+        except urllib_error.HTTPError as e:
+            return e.code, json.load(e)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan skor SDI lokal (HTTP) dengan koridor & handle DSM yang tetap hangat.")
+    parser.add_argument("--host", default="127.0.0.1", help="Alamat bind (default 127.0.0.1, hanya lokal)")
+    parser.add_argument("--port", type=int, default=8765, help="Port HTTP (default 8765)")
+    parser.add_argument("--handle-dsm", type=int, default=8, help="Maksimal dataset DSM yang tetap terbuka (default 8)")
+    parser.add_argument("--manifest", help="Manifest survey (format sdi_batch) yang koridornya dimuat saat start; id = nama")
+    parser.add_argument("--log", action="store_true", help="Cetak log setiap permintaan HTTP")
+    args = parser.parse_args(argv)
+
+    layanan = LayananSkor(maks_handle_dsm=args.handle_dsm)
+    if args.manifest:
+        from sdi_batch import baca_manifest
+        for survey in baca_manifest(args.manifest):
+            opsi = {k: survey[k] for k in ("retak", "pothole", "rutting", "kolom_rute") if k in survey}
+            ringkasan = layanan.muat_koridor(
+                survey["nama"], survey["jalan"], survey["dsm"],
+                lebar_jalan=float(survey.get("lebar_jalan", 3.0)),
+                interval_segmen=float(survey.get("interval_segmen", 100)),
+                epsg_code=int(survey.get("epsg_code", 32749)), **opsi)
+            print(f"Koridor {survey['nama']}: {ringkasan['segmen']} segmen ({ringkasan['durasi_ms']:.0f} ms)")
+
+    server = buat_server(layanan, args.host, args.port, log=args.log)
+    print(f"Layanan skor SDI berjalan di http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        layanan.tutup()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,1528 @@
+"""Pipeline perhitungan Surface Distress Index (SDI) GeoSDI tanpa ketergantungan pada Streamlit.
+
+Modul ini dipakai oleh aplikasi Streamlit (app.py) maupun eksekusi batch (sdi_batch.py).
+"""
+import numpy as np
+import os
+import re
+import math
+import queue
+import multiprocessing
+import shutil
+import hashlib
+import zipfile
+import functools
+import io
+import tempfile
+import threading
+import warnings
+from collections import OrderedDict
+from contextlib import nullcontext
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
+
+# Stack GIS & plotting diimpor saat pertama dipakai (lihat sdi_impor), sehingga aplikasi yang hanya
+# butuh konstanta/antrean di halaman pertama tidak menunggu geopandas, rasterio, dan matplotlib dimuat
+from sdi_impor import modul_lazy, pyplot_lazy
+gpd = modul_lazy("geopandas")
+pd = modul_lazy("pandas")
+shapely = modul_lazy("shapely")
+rasterio = modul_lazy("rasterio")
+plt = pyplot_lazy()
+mpatches = modul_lazy("matplotlib.patches")
+
+from sdi_profiling import ProfilerTahap
+
+# Cache DSM lokal (GeoTIFF ber-tile + overview), dapat diatur lewat environment variable
+DIREKTORI_CACHE_DSM = os.environ.get("GEOSDI_CACHE_DSM", os.path.join(os.path.expanduser("~"), ".cache", "geosdi", "dsm"))
+BATAS_CACHE_DSM_GB = float(os.environ.get("GEOSDI_CACHE_DSM_GB", 20))
+# Di atas jumlah baris ini XLSX ditulis streaming (memori tetap, baris ditulis berurutan lalu dibuang)
+BARIS_EXCEL_STREAMING = int(os.environ.get("GEOSDI_EXCEL_STREAMING_BARIS", 50_000))
+# Toleransi simplify tahap kebersihan geometri layer kerusakan (m); 0 = vertex tidak dikurangi.
+# Galat luas <= 2 * toleransi * keliling, jadi toleransi harus jauh di bawah batas lebar retak SDI2 (> 3 mm); pada
+# 0,25 mm galat total luas retak terukur sekitar 0,01% (1 mm: sekitar 6%, lihat benchmarks/bench_kebersihan.py)
+TOLERANSI_SIMPLIFY_M = float(os.environ.get("GEOSDI_TOLERANSI_SIMPLIFY_M", 0.00025))
+
+# Format input vektor yang didukung dan komponen shapefile yang dibaca dari zip
+FORMAT_VEKTOR = (".zip", ".gpkg", ".fgb", ".parquet", ".geoparquet")
+KOMPONEN_SHAPEFILE = (".shp", ".shx", ".dbf", ".prj", ".cpg")
+
+# ==========================================================
+# FUNGSI PEMROSESAN SPASIAL & MATEMATIKA
+# ==========================================================
+@functools.lru_cache(maxsize=None)
+def opsi_engine_vektor():
+    """Memilih engine I/O vektor tercepat yang tersedia: pyogrio + Arrow, pyogrio, lalu fiona"""
+    try:
+        import pyogrio  # noqa: F401
+    except ImportError:
+        return {"engine": "fiona"}
+    try:
+        import pyarrow  # noqa: F401
+        return {"engine": "pyogrio", "use_arrow": True}
+    except ImportError:
+        return {"engine": "pyogrio"}
+
+def _cari_shp(zf):
+    """Nama .shp pertama di dalam zip (None bila tidak ada)"""
+    nama_shp = sorted(n for n in zf.namelist() if n.lower().endswith(".shp") and not n.startswith("__MACOSX/"))
+    return nama_shp[0] if nama_shp else None
+
+def _shapefile_dari_zip(data):
+    """Mengembalikan zip berisi satu shapefile di root (dibungkus ulang di memori bila perlu) atau None"""
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        shp = _cari_shp(zf)
+        if shp is None:
+            return None
+        if "/" not in shp and sum(n.lower().endswith(".shp") for n in zf.namelist()) == 1:
+            return data
+        # GDAL hanya membaca shapefile di root zip dari buffer, jadi komponen shapefile dipindah ke root
+        dasar = shp[:-4]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zout:
+            for n in zf.namelist():
+                root, ext = os.path.splitext(n)
+                if root == dasar and ext.lower() in KOMPONEN_SHAPEFILE:
+                    zout.writestr(os.path.basename(n), zf.read(n))
+        return buffer.getbuffer()
+
+def baca_layer_vektor(sumber):
+    """Membaca layer vektor langsung dari buffer upload atau path tanpa ekstraksi ke disk.
+
+    Format: shapefile di dalam .zip, GeoPackage (.gpkg), FlatGeobuf (.fgb), dan GeoParquet (.parquet).
+    """
+    if isinstance(sumber, (str, os.PathLike)):
+        path = os.path.abspath(os.fspath(sumber))
+        ext = os.path.splitext(path)[1].lower()
+        if ext in (".parquet", ".geoparquet"):
+            return gpd.read_parquet(path)
+        if ext == ".zip":
+            with zipfile.ZipFile(path) as zf:
+                shp = _cari_shp(zf)
+            return gpd.read_file(f"/vsizip/{path}/{shp}", **opsi_engine_vektor()) if shp else None
+        return gpd.read_file(path, **opsi_engine_vektor())
+
+    data = sumber.getbuffer()
+    ext = os.path.splitext(sumber.name)[1].lower()
+    if ext in (".parquet", ".geoparquet"):
+        import pyarrow as pa
+        return gpd.read_parquet(pa.BufferReader(data))
+    if ext == ".zip":
+        data = _shapefile_dari_zip(data)
+        if data is None:
+            return None
+    return gpd.read_file(io.BytesIO(data), **opsi_engine_vektor())
+
+def _gdf_dari_batch_wkb(batch, kolom_geom, crs):
+    return gpd.GeoDataFrame(geometry=shapely.from_wkb(batch.column(kolom_geom).to_numpy(zero_copy_only=False)), crs=crs)
+
+def baca_layer_bertahap(sumber, crs, ukuran_batch=100_000):
+    """Generator GeoDataFrame (hanya geometri) per ukuran_batch fitur, sudah diproyeksikan ke crs.
+
+    Dipakai mode streaming agar layer kerusakan berukuran jutaan fitur tidak pernah dimuat utuh. Urutan fitur
+    sama dengan baca_layer_vektor. Tanpa pyogrio + pyarrow, batch dibaca lewat rows= pada gpd.read_file.
+    """
+    if not sumber:
+        return
+    lokal = isinstance(sumber, (str, os.PathLike))
+    if lokal:
+        path = os.path.abspath(os.fspath(sumber))
+        ext = os.path.splitext(path)[1].lower()
+    else:
+        data = sumber.getbuffer()
+        ext = os.path.splitext(sumber.name)[1].lower()
+
+    def ke_crs(gdf):
+        if gdf.crs is None:
+            return gdf.set_crs(crs)
+        return gdf if gdf.crs == crs else gdf.to_crs(crs)
+
+    if ext in (".parquet", ".geoparquet"):
+        import json
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from pyproj import CRS
+        berkas = pq.ParquetFile(path if lokal else pa.BufferReader(data))
+        meta_geo = json.loads(berkas.schema_arrow.metadata[b"geo"])
+        kolom_geom = meta_geo["primary_column"]
+        meta_kolom = meta_geo["columns"][kolom_geom]
+        if meta_kolom.get("encoding", "WKB").upper() != "WKB":
+            # Encoding GeoArrow native tidak didekode per batch; layer dibaca utuh sebagai satu batch
+            gdf = baca_layer_vektor(sumber)
+            yield ke_crs(gdf[[gdf.geometry.name]])
+            return
+        # Tanpa kunci "crs" GeoParquet mengartikan OGC:CRS84
+        crs_layer = CRS.from_user_input(meta_kolom["crs"]) if meta_kolom.get("crs") is not None else \
+            (None if "crs" in meta_kolom else "OGC:CRS84")
+        for batch in berkas.iter_batches(batch_size=ukuran_batch, columns=[kolom_geom]):
+            yield ke_crs(_gdf_dari_batch_wkb(batch, kolom_geom, crs_layer))
+        return
+
+    if ext == ".zip":
+        if lokal:
+            with zipfile.ZipFile(path) as zf:
+                shp = _cari_shp(zf)
+            if shp is None:
+                return
+            path = f"/vsizip/{path}/{shp}"
+        else:
+            data = _shapefile_dari_zip(data)
+            if data is None:
+                return
+    sumber_gdal = path if lokal else bytes(data)
+
+    if opsi_engine_vektor().get("use_arrow"):
+        import pyogrio
+        with pyogrio.open_arrow(sumber_gdal, columns=[], batch_size=ukuran_batch, use_pyarrow=True) as (meta, reader):
+            kolom_geom = meta["geometry_name"] or "wkb_geometry"
+            for batch in reader:
+                yield ke_crs(_gdf_dari_batch_wkb(batch, kolom_geom, meta["crs"]))
+        return
+
+    awal = 0
+    while True:
+        gdf = gpd.read_file(io.BytesIO(sumber_gdal) if not lokal else sumber_gdal, rows=slice(awal, awal + ukuran_batch),
+                            **opsi_engine_vektor())
+        if gdf.empty:
+            return
+        yield ke_crs(gdf[[gdf.geometry.name]])
+        awal += ukuran_batch
+
+def siapkan_dsm_cache(kunci, tulis_sumber=None, buffer=None):
+    """Mengambil DSM dari cache lokal; bila belum ada, DSM dikonversi ke GeoTIFF ber-tile, terkompresi, dan ber-overview.
+
+    Sumber DSM berupa buffer di memori (langsung dibaca lewat MemoryFile tanpa ditulis ke disk)
+    atau fungsi tulis_sumber(path) yang menulis DSM mentah ke path sementara.
+    """
+    os.makedirs(DIREKTORI_CACHE_DSM, exist_ok=True)
+    cache_path = os.path.join(DIREKTORI_CACHE_DSM, f"{kunci}.tif")
+    if os.path.exists(cache_path):
+        os.utime(cache_path)  # tandai sebagai baru dipakai (LRU)
+        return cache_path
+
+    fd_cache, path_sementara = tempfile.mkstemp(suffix=".tmp.tif", dir=DIREKTORI_CACHE_DSM)
+    os.close(fd_cache)
+    path_mentah = None
+    try:
+        if buffer is not None:
+            with rasterio.MemoryFile(buffer) as memfile, memfile.open() as src:
+                konversi_dsm_cache(src, path_sementara)
+        else:
+            fd_mentah, path_mentah = tempfile.mkstemp(suffix=".mentah.tif", dir=DIREKTORI_CACHE_DSM)
+            os.close(fd_mentah)
+            tulis_sumber(path_mentah)
+            with rasterio.open(path_mentah) as src:
+                konversi_dsm_cache(src, path_sementara)
+        os.replace(path_sementara, cache_path)
+    finally:
+        for path in (path_mentah, path_sementara):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    bersihkan_dsm_cache(kecuali=cache_path)
+    return cache_path
+
+def konversi_dsm_cache(src, dst_path):
+    """Menyalin dataset DSM ke GeoTIFF ber-tile 512x512, DEFLATE, dengan overview internal"""
+    from rasterio.enums import Resampling
+    from rasterio.shutil import copy as copy_raster
+
+    predictor = 3 if np.issubdtype(np.dtype(src.dtypes[0]), np.floating) else 2
+    copy_raster(src, dst_path, driver="GTiff", tiled=True, blockxsize=512, blockysize=512,
+                compress="DEFLATE", predictor=predictor, BIGTIFF="IF_SAFER")
+    with rasterio.open(dst_path, "r+") as dst:
+        faktor = [f for f in (2, 4, 8, 16, 32, 64) if max(dst.width, dst.height) // f >= 256]
+        if faktor:
+            dst.build_overviews(faktor, Resampling.average)
+            dst.update_tags(ns="rio_overview", resampling="average")
+
+def bersihkan_dsm_cache(kecuali=None):
+    """Menghapus DSM cache yang paling lama tidak dipakai hingga total ukuran di bawah batas"""
+    files = [os.path.join(DIREKTORI_CACHE_DSM, f) for f in os.listdir(DIREKTORI_CACHE_DSM) if f.endswith(".tif")]
+    files = [(os.path.getmtime(f), os.path.getsize(f), f) for f in files if not f.endswith((".tmp.tif", ".mentah.tif"))]
+    total = sum(size for _, size, _ in files)
+    batas = BATAS_CACHE_DSM_GB * 1024 ** 3
+    for _, size, path in sorted(files):
+        if total <= batas:
+            break
+        if path == kecuali:
+            continue
+        os.remove(path)
+        total -= size
+
+def jendela_piksel(bounds, transform, tinggi, lebar):
+    """Membuat jendela piksel (Window) yang menutup bounds, dipotong ke batas raster.
+
+    Baris/kolom dihitung langsung dari transform, sehingga DSM harus north-up tanpa rotasi (a > 0, e < 0, b = d = 0);
+    transform lain ditolak dengan ValueError agar jendela tidak diam-diam meleset dari rutting.
+    """
+    from rasterio.windows import Window
+
+    if transform.b != 0 or transform.d != 0 or transform.a <= 0 or transform.e >= 0:
+        raise ValueError(f"DSM harus north-up tanpa rotasi (transform {tuple(transform)[:6]}); "
+                         "lakukan warp DSM ke grid north-up terlebih dahulu")
+    minx, miny, maxx, maxy = bounds
+    row_start, col_start = int(math.floor((maxy - transform.f) / transform.e)), int(math.floor((minx - transform.c) / transform.a))
+    row_stop, col_stop = int(math.ceil((miny - transform.f) / transform.e)), int(math.ceil((maxx - transform.c) / transform.a))
+    row_start, row_stop = max(row_start, 0), min(row_stop, tinggi)
+    col_start, col_stop = max(col_start, 0), min(col_stop, lebar)
+    if row_stop <= row_start or col_stop <= col_start:
+        return None
+    return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+def statistik_jendela_dsm(DSM, window, geom_hole, geom_ring, nodata_val):
+    """Membaca satu jendela DSM lalu menghitung percentile_10 (lubang) dan median (ring) dari bacaan yang sama"""
+    from rasterio.features import geometry_mask
+
+    data = DSM.read(1, window=window)
+    valid = data != nodata_val if nodata_val is not None else np.ones(data.shape, dtype=bool)
+    if np.issubdtype(data.dtype, np.floating):
+        valid &= ~np.isnan(data)
+
+    transform = DSM.window_transform(window)
+    z_min, z_ref = np.nan, np.nan
+    if not geom_hole.is_empty:
+        nilai_hole = data[geometry_mask([geom_hole], out_shape=data.shape, transform=transform, invert=True) & valid]
+        if nilai_hole.size > 0:
+            z_min = float(np.percentile(nilai_hole, 10))
+    if not geom_ring.is_empty:
+        nilai_ring = data[geometry_mask([geom_ring], out_shape=data.shape, transform=transform, invert=True) & valid]
+        if nilai_ring.size > 0:
+            z_ref = float(np.median(nilai_ring))
+    return z_min, z_ref
+
+def hitung_depth_cm(gdf, dsm_path, buffer_distance=0.3, max_workers=None, batas_memori_mb=512, batal=None, dsm=None):
+    """Menghitung kedalaman rutting dari DSM dalam satuan cm (hanya membaca jendela piksel di sekitar tiap rutting).
+
+    batal (threading.Event, opsional): bila di-set, thread berhenti mengambil jendela baru dan hasil tidak lengkap.
+    dsm (opsional): dataset rasterio yang sudah terbuka (mis. dari pool handle sdi_layanan); jendela dibaca
+    serial di thread pemanggil tanpa membuka file lagi, cocok untuk sedikit fitur.
+    """
+    with (nullcontext(dsm) if dsm is not None else rasterio.open(dsm_path)) as DSM:
+        dsm_crs = DSM.crs
+        nodata_val = DSM.nodata
+        dsm_transform = DSM.transform
+        dsm_tinggi, dsm_lebar = DSM.height, DSM.width
+        itemsize = np.dtype(DSM.dtypes[0]).itemsize
+
+    if gdf.crs != dsm_crs:
+        gdf = gdf.to_crs(dsm_crs)
+
+    buffer_outer = gdf.geometry.buffer(buffer_distance)
+    ring_geom = buffer_outer.difference(gdf.geometry)
+
+    # Satu tugas per rutting, diurutkan per baris/kolom jendela agar pembacaan tile DSM tetap berdekatan
+    tugas = []
+    for i, (bounds, geom_hole, geom_ring) in enumerate(zip(buffer_outer.bounds.values, gdf.geometry.values, ring_geom.values)):
+        if geom_hole is None or geom_hole.is_empty:
+            continue
+        window = jendela_piksel(bounds, dsm_transform, dsm_tinggi, dsm_lebar)
+        if window is not None:
+            tugas.append((i, window, geom_hole, geom_ring))
+    tugas.sort(key=lambda t: (t[1].row_off, t[1].col_off))
+
+    z_min = np.full(len(gdf), np.nan)
+    z_ref = np.full(len(gdf), np.nan)
+
+    if tugas and dsm is not None:
+        for i, window, geom_hole, geom_ring in tugas:
+            if batal is not None and batal.is_set():
+                break
+            z_min[i], z_ref[i] = statistik_jendela_dsm(dsm, window, geom_hole, geom_ring, nodata_val)
+    elif tugas:
+        # Setiap thread hanya memegang satu jendela pada satu waktu (data + 2 mask boolean),
+        # sehingga jumlah thread dibatasi oleh anggaran memori dibagi jendela terbesar.
+        byte_jendela_maks = max(t[1].width * t[1].height for t in tugas) * (itemsize + 2)
+        jumlah_thread = min(max_workers or os.cpu_count() or 1, len(tugas),
+                            max(1, int(batas_memori_mb * 1024 * 1024 // byte_jendela_maks)))
+
+        antrian = queue.SimpleQueue()
+        for t in tugas:
+            antrian.put(t)
+
+        def kerja():
+            with rasterio.open(dsm_path) as DSM:
+                while batal is None or not batal.is_set():
+                    try:
+                        i, window, geom_hole, geom_ring = antrian.get_nowait()
+                    except queue.Empty:
+                        return
+                    z_min[i], z_ref[i] = statistik_jendela_dsm(DSM, window, geom_hole, geom_ring, nodata_val)
+
+        with ThreadPoolExecutor(max_workers=jumlah_thread) as pool:
+            for future in [pool.submit(kerja) for _ in range(jumlah_thread)]:
+                future.result()
+
+    depth = np.where(np.isnan(z_min) | np.isnan(z_ref), 0, (z_ref - z_min) * 100)
+    depth = np.clip(depth, 0, 15)
+
+    gdf = gdf.copy()
+    gdf["kedalaman_calc"] = depth
+    return gdf
+
+# =========================================
+# KEBERSIHAN GEOMETRI LAYER KERUSAKAN
+# =========================================
+JUMLAH_KEBERSIHAN = ("fitur_awal", "kosong", "diperbaiki", "multipart", "bagian_dibuang", "disederhanakan",
+                     "vertex_dibuang", "fitur_akhir")
+
+def bersihkan_geometri(gdf, toleransi_m=None, min_vertex=32):
+    """Validasi & perbaikan geometri layer kerusakan secara massal (operasi array shapely, tanpa loop per fitur).
+
+    Geometri kosong dibuang, geometri tidak valid (mis. poligon bowtie hasil deteksi otomatis) diperbaiki dengan
+    make_valid, multipart dipecah menjadi fitur tunggal (atribut disalin ke setiap bagian), dan bagian berdimensi
+    lebih rendah sisa perbaikan (garis/titik dari poligon yang runtuh) dibuang. Fitur dengan lebih dari min_vertex
+    vertex disederhanakan dengan toleransi_m (default TOLERANSI_SIMPLIFY_M): Douglas-Peucker biasa, dan hanya hasil
+    yang menjadi tidak valid/kosong yang diulang dengan simplify penjaga topologi (jauh lebih lambat).
+    Mengembalikan (gdf, jumlah) dengan jumlah berisi hitungan setiap perubahan (lihat JUMLAH_KEBERSIHAN).
+    """
+    toleransi_m = TOLERANSI_SIMPLIFY_M if toleransi_m is None else toleransi_m
+    jumlah = dict.fromkeys(JUMLAH_KEBERSIHAN, 0)
+    jumlah["fitur_awal"] = jumlah["fitur_akhir"] = len(gdf)
+    if gdf.empty:
+        return gdf, jumlah
+
+    geoms = np.asarray(gdf.geometry.values, dtype=object)
+    kosong = shapely.is_missing(geoms) | shapely.is_empty(geoms)
+    tidak_valid = ~kosong & ~shapely.is_valid(geoms)
+    if tidak_valid.any():
+        geoms = geoms.copy()
+        geoms[tidak_valid] = shapely.make_valid(geoms[tidak_valid], method="structure", keep_collapsed=False)
+    dimensi = shapely.get_dimensions(geoms)
+
+    # Dua tahap get_parts: GeometryCollection hasil perbaikan dapat berisi MultiPolygon
+    bagian, asal = shapely.get_parts(geoms, return_index=True)
+    bagian, idx = shapely.get_parts(bagian, return_index=True)
+    asal = asal[idx]
+    simpan = ~shapely.is_empty(bagian) & (shapely.get_dimensions(bagian) == dimensi[asal])
+    simpan &= (dimensi[asal] < 2) | (shapely.area(bagian) > 0)
+
+    jumlah["kosong"] = int(kosong.sum())
+    jumlah["diperbaiki"] = int(tidak_valid.sum())
+    jumlah["bagian_dibuang"] = int((~simpan & ~kosong[asal]).sum())
+    bagian, asal = bagian[simpan], asal[simpan]
+    jumlah["multipart"] = int((np.bincount(asal, minlength=len(gdf)) > 1).sum())
+
+    if toleransi_m > 0:
+        vertex = shapely.get_num_coordinates(bagian)
+        rumit = vertex > min_vertex
+        if rumit.any():
+            asli = bagian[rumit]
+            sederhana = shapely.simplify(asli, toleransi_m, preserve_topology=False)
+            rusak = shapely.is_empty(sederhana) | ~shapely.is_valid(sederhana)
+            if rusak.any():
+                sederhana[rusak] = shapely.simplify(asli[rusak], toleransi_m, preserve_topology=True)
+            bagian = bagian.copy()
+            bagian[rumit] = sederhana
+            dibuang = vertex[rumit] - shapely.get_num_coordinates(sederhana)
+            jumlah["disederhanakan"] = int((dibuang > 0).sum())
+            jumlah["vertex_dibuang"] = int(dibuang.sum())
+
+    hasil = gdf.iloc[asal].reset_index(drop=True)
+    hasil[hasil.geometry.name] = gpd.GeoSeries(bagian, crs=gdf.crs)
+    jumlah["fitur_akhir"] = len(hasil)
+    return hasil, jumlah
+
+def larutkan_tumpang_tindih(gdf, kolom_grup):
+    """Melarutkan (union) poligon yang interiornya saling bertampalan dalam grup yang sama (mis. potongan retak per segmen).
+
+    Poligon yang tidak bertampalan dengan poligon lain di grupnya dibiarkan apa adanya; setiap rangkaian poligon yang
+    saling bertampalan di-union lalu dipecah lagi menjadi poligon tunggal, sehingga luas yang tertutup dua deteksi
+    hanya dihitung sekali.
+    Kolom lain diambil nilai maksimumnya. Mengembalikan (gdf, jumlah poligon yang dilarutkan).
+    """
+    if len(gdf) < 2:
+        return gdf, 0
+    geoms = np.asarray(gdf.geometry.values, dtype=object)
+    kiri, kanan = gdf.sindex.query(geoms, predicate="intersects")
+    grup = gdf[kolom_grup].to_numpy()
+    pilih = (kiri < kanan) & (grup[kiri] == grup[kanan])
+    kiri, kanan = kiri[pilih], kanan[pilih]
+    # Bertampalan = interior beririsan dua dimensi (bukan sekadar bersinggungan di tepi)
+    tumpang = shapely.relate_pattern(geoms[kiri], geoms[kanan], "2********")
+    kiri, kanan = kiri[tumpang], kanan[tumpang]
+    if not len(kiri):
+        return gdf, 0
+    terlibat = np.zeros(len(gdf), dtype=bool)
+    terlibat[kiri] = terlibat[kanan] = True
+    # Union per komponen terhubung (biasanya 2-3 deteksi), bukan seluruh potongan segmen sekaligus
+    komponen = _komponen_terhubung(len(gdf), kiri, kanan)
+    larut = gdf[terlibat].assign(_komponen=komponen[terlibat]).dissolve(by="_komponen", aggfunc="max")
+    larut = larut.explode(index_parts=False)
+    larut = larut[larut.geometry.geom_type == "Polygon"]
+    return pd.concat([gdf[~terlibat], larut[gdf.columns]], ignore_index=True), int(terlibat.sum())
+
+def _komponen_terhubung(n, kiri, kanan):
+    """Label komponen terhubung graf tak berarah (n simpul, sisi kiri-kanan) lewat propagasi label minimum"""
+    label = np.arange(n)
+    while True:
+        minimum = np.minimum(label[kiri], label[kanan])
+        baru = label.copy()
+        np.minimum.at(baru, kiri, minimum)
+        np.minimum.at(baru, kanan, minimum)
+        baru = baru[baru]
+        if np.array_equal(baru, label):
+            return label
+        label = baru
+
+def hitung_kerusakan_segmen(seg_gdf, gdf_retak, gdf_pothole, gdf_rutting, catatan=None):
+    """Menghitung data kerusakan seluruh segmen sekaligus (satu overlay/sjoin per layer + agregasi groupby).
+
+    Potongan retak yang bertampalan di segmen yang sama dilarutkan lebih dulu (larutkan_tumpang_tindih) agar luasnya
+    tidak terhitung dua kali; jumlahnya dicatat di catatan["retak_dilarutkan"] bila catatan diberikan.
+    """
+    seg_poly = seg_gdf[["Segmen", "geometry"]]
+    segmen_idx = pd.Index(seg_gdf["Segmen"], name="Segmen")
+    luas_seg = pd.Series(seg_gdf["Luas_Segmen"].values, index=segmen_idx)
+
+    persen_retak = pd.Series(0.0, index=segmen_idx)
+    lebar_retak = pd.Series(0.0, index=segmen_idx)
+    if not gdf_retak.empty:
+        # Hanya kolom geometri yang dibawa agar atribut pengguna tidak bentrok dengan kolom "Segmen"
+        retak_seg = gpd.overlay(gdf_retak[[gdf_retak.geometry.name]], seg_poly, how="intersection")
+        retak_seg, dilarutkan = larutkan_tumpang_tindih(retak_seg, "Segmen")
+        if catatan is not None:
+            catatan["retak_dilarutkan"] = catatan.get("retak_dilarutkan", 0) + dilarutkan
+        if not retak_seg.empty:
+            luas = retak_seg.geometry.area
+            panjang = retak_seg.geometry.length
+            luas_retak = luas.groupby(retak_seg["Segmen"]).sum().reindex(segmen_idx, fill_value=0.0)
+            persen_retak = (luas_retak / luas_seg * 100).where(luas_seg > 0, 0.0)
+            lebar = (luas / panjang.where(panjang > 0)).groupby(retak_seg["Segmen"]).mean()
+            lebar_retak = (lebar.reindex(segmen_idx) * 1000).fillna(0.0)
+
+    jumlah_lubang = pd.Series(0, index=segmen_idx)
+    if not gdf_pothole.empty:
+        pothole_seg = gpd.sjoin(gdf_pothole[[gdf_pothole.geometry.name]], seg_poly, predicate="within")
+        jumlah_lubang = pothole_seg.groupby("Segmen").size().reindex(segmen_idx, fill_value=0)
+
+    kedalaman_rutting = pd.Series(0.0, index=segmen_idx)
+    if not gdf_rutting.empty:
+        rutting_seg = gpd.overlay(gdf_rutting[["kedalaman_calc", gdf_rutting.geometry.name]], seg_poly, how="intersection")
+        if not rutting_seg.empty:
+            kedalaman_rutting = rutting_seg.groupby("Segmen")["kedalaman_calc"].mean().reindex(segmen_idx).fillna(0.0)
+
+    return pd.DataFrame({
+        "persen_retak": persen_retak.values,
+        "lebar_retak": lebar_retak.values,
+        "jumlah_lubang": jumlah_lubang.values.astype(int),
+        "kedalaman_rutting": kedalaman_rutting.values,
+    }, index=segmen_idx).reset_index()
+
+class AkumulatorKerusakan:
+    """Penjumlah data kerusakan per segmen untuk mode streaming: setiap batch fitur di-overlay ke segmen lalu
+    hanya jumlahannya yang disimpan (luas retak, rasio luas/panjang retak, jumlah lubang, jumlah kedalaman rutting).
+
+    Memori sebanding dengan jumlah segmen, bukan jumlah fitur. hasil() setara dengan hitung_kerusakan_segmen
+    (berbeda paling jauh pada pembulatan floating point karena urutan penjumlahan per batch), kecuali retak yang
+    bertampalan dengan retak dari batch lain: pelarutan tumpang tindih hanya dilakukan di dalam satu batch.
+    """
+
+    def __init__(self, seg_gdf):
+        self.seg_poly = seg_gdf[["Segmen", "geometry"]]
+        self.segmen_idx = pd.Index(seg_gdf["Segmen"], name="Segmen")
+        self.luas_seg = seg_gdf["Luas_Segmen"].to_numpy(dtype=float)
+        n = len(seg_gdf)
+        self.luas_retak = np.zeros(n)
+        self.jumlah_rasio_retak = np.zeros(n)
+        self.n_rasio_retak = np.zeros(n, dtype=np.int64)
+        self.jumlah_lubang = np.zeros(n, dtype=np.int64)
+        self.jumlah_kedalaman = np.zeros(n)
+        self.n_rutting = np.zeros(n, dtype=np.int64)
+        self.retak_dilarutkan = 0
+
+    def _posisi(self, segmen):
+        return self.segmen_idx.get_indexer(segmen)
+
+    def _bincount(self, posisi, bobot=None):
+        return np.bincount(posisi, weights=bobot, minlength=len(self.segmen_idx))
+
+    def tambah_retak(self, gdf):
+        if gdf.empty:
+            return
+        retak_seg = gpd.overlay(gdf[[gdf.geometry.name]], self.seg_poly, how="intersection")
+        retak_seg, dilarutkan = larutkan_tumpang_tindih(retak_seg, "Segmen")
+        self.retak_dilarutkan += dilarutkan
+        if retak_seg.empty:
+            return
+        posisi = self._posisi(retak_seg["Segmen"])
+        luas = retak_seg.geometry.area.to_numpy()
+        panjang = retak_seg.geometry.length.to_numpy()
+        self.luas_retak += self._bincount(posisi, luas)
+        ada_panjang = panjang > 0
+        self.jumlah_rasio_retak += self._bincount(posisi[ada_panjang], luas[ada_panjang] / panjang[ada_panjang])
+        self.n_rasio_retak += self._bincount(posisi[ada_panjang]).astype(np.int64)
+
+    def tambah_pothole(self, gdf):
+        if gdf.empty:
+            return
+        pothole_seg = gpd.sjoin(gdf[[gdf.geometry.name]], self.seg_poly, predicate="within")
+        self.jumlah_lubang += self._bincount(self._posisi(pothole_seg["Segmen"])).astype(np.int64)
+
+    def tambah_rutting(self, gdf):
+        """gdf harus sudah memiliki kolom kedalaman_calc (hasil hitung_depth_cm)"""
+        if gdf.empty:
+            return
+        rutting_seg = gpd.overlay(gdf[["kedalaman_calc", gdf.geometry.name]], self.seg_poly, how="intersection")
+        if rutting_seg.empty:
+            return
+        posisi = self._posisi(rutting_seg["Segmen"])
+        self.jumlah_kedalaman += self._bincount(posisi, rutting_seg["kedalaman_calc"].to_numpy(dtype=float))
+        self.n_rutting += self._bincount(posisi).astype(np.int64)
+
+    def hasil(self):
+        """Data kerusakan per segmen dengan kolom yang sama seperti hitung_kerusakan_segmen"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            persen_retak = np.where(self.luas_seg > 0, self.luas_retak / self.luas_seg * 100, 0.0)
+            lebar_retak = np.where(self.n_rasio_retak > 0, self.jumlah_rasio_retak / self.n_rasio_retak * 1000, 0.0)
+            kedalaman_rutting = np.where(self.n_rutting > 0, self.jumlah_kedalaman / self.n_rutting, 0.0)
+        return pd.DataFrame({
+            "persen_retak": persen_retak,
+            "lebar_retak": lebar_retak,
+            "jumlah_lubang": self.jumlah_lubang.astype(int),
+            "kedalaman_rutting": kedalaman_rutting,
+        }, index=self.segmen_idx).reset_index()
+
+def hitung_kerusakan_bertahap(seg_gdf, retak, pothole, rutting, dsm_path, ukuran_batch=100_000, max_workers_dsm=None,
+                              batal=None, catatan=None):
+    """Data kerusakan per segmen dengan layer dibaca per batch: setiap batch diproyeksikan, dihitung kedalaman
+    rutting-nya (jendela DSM batch tersebut saja), di-overlay ke segmen, lalu dibuang setelah dijumlahkan.
+
+    Setiap batch dibersihkan geometrinya (bersihkan_geometri) sebelum kedalaman dan overlay; hitungannya dijumlahkan
+    ke catatan. batal (threading.Event): pembacaan berhenti di batas batch berikutnya dan hasilnya tidak lengkap.
+    """
+    akumulator = AkumulatorKerusakan(seg_gdf)
+    catatan = {} if catatan is None else catatan
+    catatan["batch"] = 0
+    for nama, sumber, tambah in (
+        ("retak", retak, akumulator.tambah_retak),
+        ("pothole", pothole, akumulator.tambah_pothole),
+        ("rutting", rutting, lambda gdf: akumulator.tambah_rutting(
+            hitung_depth_cm(gdf, dsm_path, max_workers=max_workers_dsm, batal=batal))),
+    ):
+        catatan[f"fitur_{nama}"] = 0
+        for gdf in baca_layer_bertahap(sumber, seg_gdf.crs, ukuran_batch=ukuran_batch):
+            if batal is not None and batal.is_set():
+                break
+            catatan[f"fitur_{nama}"] += len(gdf)
+            gdf, jumlah = bersihkan_geometri(gdf)
+            for kunci in JUMLAH_KEBERSIHAN[1:-1]:
+                catatan[f"{nama}_{kunci}"] = catatan.get(f"{nama}_{kunci}", 0) + jumlah[kunci]
+            tambah(gdf)
+            catatan["batch"] += 1
+    catatan["retak_dilarutkan"] = akumulator.retak_dilarutkan
+    return akumulator.hasil()
+
+# Tabel aturan SDI (default: batas Bina Marga). Setiap aturan dievaluasi berurutan
+# sebagai (operator, batas, nilai); baris terakhir ("lainnya") adalah nilai default.
+ATURAN_SDI_BINA_MARGA = {
+    # SDI 1: nilai dari persentase luas retak
+    "persen_retak": [("==", 0, 0), ("<", 10, 5), ("<=", 30, 20), ("lainnya", None, 40)],
+    # SDI 2: pengali SDI 1 berdasarkan lebar retak (mm)
+    "lebar_retak": [(">", 3, 2), ("lainnya", None, 1)],
+    # SDI 3: tambahan nilai dari jumlah lubang
+    "jumlah_lubang": [("==", 0, 0), ("<", 10, 15), ("<=", 50, 75), ("lainnya", None, 225)],
+    # SDI 4: tambahan nilai dari kedalaman rutting (cm)
+    "kedalaman_rutting": [("==", 0, 0), ("<", 1, 5 * 0.5), ("<=", 3, 5 * 2), ("lainnya", None, 5 * 4)],
+    # Klasifikasi kondisi dari SDI 4
+    "kondisi": [("<", 50, "Baik"), ("<=", 100, "Sedang"), ("<=", 150, "Rusak Ringan"), ("lainnya", None, "Rusak Berat")],
+}
+
+OPERATOR_ATURAN = {"==": np.equal, "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal}
+
+def terapkan_aturan(nilai, aturan):
+    """Memetakan array nilai ke hasil aturan pertama yang terpenuhi"""
+    syarat = [OPERATOR_ATURAN[op](nilai, batas) for op, batas, _ in aturan[:-1]]
+    pilihan = [hasil for _, _, hasil in aturan[:-1]]
+    if not syarat:
+        return np.full(np.shape(nilai), aturan[-1][2])
+    return np.select(syarat, pilihan, default=aturan[-1][2])
+
+def hitung_sdi_batch(persen_retak, lebar_retak, jumlah_lubang, kedalaman_rutting, aturan=None):
+    """Menghitung SDI1-SDI4 dan kondisi untuk banyak segmen sekaligus (array / kolom DataFrame)"""
+    aturan = ATURAN_SDI_BINA_MARGA if aturan is None else aturan
+    index = persen_retak.index if isinstance(persen_retak, pd.Series) else None
+
+    sdi1 = terapkan_aturan(np.asarray(persen_retak, dtype=float), aturan["persen_retak"])
+    sdi2 = sdi1 * terapkan_aturan(np.asarray(lebar_retak, dtype=float), aturan["lebar_retak"])
+    sdi3 = sdi2 + terapkan_aturan(np.asarray(jumlah_lubang, dtype=float), aturan["jumlah_lubang"])
+    sdi4 = sdi3 + terapkan_aturan(np.asarray(kedalaman_rutting, dtype=float), aturan["kedalaman_rutting"])
+    kondisi = terapkan_aturan(sdi4, aturan["kondisi"])
+
+    return pd.DataFrame({"SDI1": sdi1, "SDI2": sdi2, "SDI3": sdi3, "SDI4": sdi4, "Kondisi": kondisi}, index=index)
+
+def hitung_sdi(persen_retak, lebar_retak, jumlah_lubang, kedalaman_rutting, aturan=None):
+    """Menghitung SDI untuk satu segmen (pembungkus skalar dari hitung_sdi_batch)"""
+    hasil = hitung_sdi_batch([persen_retak], [lebar_retak], [jumlah_lubang], [kedalaman_rutting], aturan=aturan)
+    return tuple(hasil.to_dict("records")[0].values())
+
+# ==========================================================
+# TAHAPAN PIPELINE SDI
+# ==========================================================
+INFO_SURVEY_DEFAULT = {
+    "lokasi": "Jl. Leyangan",
+    "sta_umum": "0+000 - 1+500",
+    "surveyor": "Nama Anda",
+    "tanggal": "28 Februari 2026",
+    "instansi": "Universitas Diponegoro",
+}
+
+WARNA_KONDISI = {"Baik": "#2ecc71", "Sedang": "#f1c40f", "Rusak Ringan": "#e67e22", "Rusak Berat": "#e74c3c"}
+
+# file_id upload -> sidik, dibatasi (LRU) agar server yang berjalan lama tidak menyimpan entri setiap upload
+_sidik_upload = OrderedDict()
+_kunci_sidik_upload = threading.Lock()
+MAKS_SIDIK_UPLOAD = 256
+
+def sidik_sumber(sumber):
+    """Sidik (hash hex) input: isi buffer untuk objek upload, path + ukuran + mtime untuk file lokal"""
+    if not sumber:
+        return None
+    if hasattr(sumber, "getbuffer"):
+        # Upload Streamlit punya file_id unik, sehingga file besar (DSM) cukup di-hash sekali
+        file_id = getattr(sumber, "file_id", None)
+        with _kunci_sidik_upload:
+            if file_id in _sidik_upload:
+                _sidik_upload.move_to_end(file_id)
+                return _sidik_upload[file_id]
+        sidik = hashlib.sha256(sumber.getbuffer()).hexdigest()
+        if file_id is not None:
+            with _kunci_sidik_upload:
+                _sidik_upload[file_id] = sidik
+                if len(_sidik_upload) > MAKS_SIDIK_UPLOAD:
+                    _sidik_upload.popitem(last=False)
+        return sidik
+    stat = os.stat(sumber)
+    return hashlib.sha256(f"{os.path.abspath(sumber)}|{stat.st_size}|{stat.st_mtime_ns}".encode()).hexdigest()
+
+class CacheTahap:
+    """LRU kecil di memori untuk hasil tahap pipeline yang mahal, dikunci oleh sidik input + parameter tahap.
+
+    Dipakai agar perubahan parameter jalan (lebar, interval, kolom rute) hanya menghitung ulang
+    segmentasi, overlay, dan skor; layer yang sudah dibaca dan kedalaman rutting dari DSM dipakai ulang.
+    Nilai yang dikembalikan dibagi antar pemanggil dan tidak boleh diubah di tempat.
+    """
+
+    def __init__(self, maks_entri_per_tahap=4):
+        self.maks_entri_per_tahap = maks_entri_per_tahap
+        self._data = OrderedDict()
+        self._kunci = threading.Lock()
+
+    def ambil(self, tahap, kunci, hitung, catatan=None, batal=None):
+        """Nilai tahap dari cache, atau hitung() lalu disimpan (tidak disimpan bila run dibatalkan di tengah jalan)"""
+        with self._kunci:
+            if (tahap, kunci) in self._data:
+                self._data.move_to_end((tahap, kunci))
+                if catatan is not None:
+                    catatan["cache"] = "hit"
+                return self._data[(tahap, kunci)]
+        nilai = hitung()
+        if catatan is not None:
+            catatan["cache"] = "miss"
+        if batal is not None and batal.is_set():
+            return nilai
+        with self._kunci:
+            self._data[(tahap, kunci)] = nilai
+            entri_tahap = [k for k in self._data if k[0] == tahap]
+            for k in entri_tahap[:max(0, len(entri_tahap) - self.maks_entri_per_tahap)]:
+                del self._data[k]
+        return nilai
+
+    def cari(self, tahap, kunci, default=None):
+        """Nilai tahap yang sudah ada di cache tanpa menghitung (default bila belum ada)"""
+        with self._kunci:
+            if (tahap, kunci) not in self._data:
+                return default
+            self._data.move_to_end((tahap, kunci))
+            return self._data[(tahap, kunci)]
+
+def _ambil_tahap(cache, tahap, kunci, hitung, catatan=None, batal=None):
+    return hitung() if cache is None else cache.ambil(tahap, kunci, hitung, catatan=catatan, batal=batal)
+
+def id_google_drive(link):
+    """Mengambil file id dari link shareable Google Drive (None bila bukan link Drive)"""
+    match = re.search(r"/d/([a-zA-Z0-9_-]+)", link)
+    return match.group(1) if match else None
+
+def siapkan_dsm(sumber):
+    """Menyiapkan DSM dari path lokal atau link Google Drive melalui cache DSM"""
+    file_id = id_google_drive(sumber)
+    if file_id:
+        def unduh_dsm(path):
+            import gdown
+            gdown.download(id=file_id, output=path, quiet=False)
+
+        return siapkan_dsm_cache("gdrive_" + file_id, unduh_dsm)
+
+    # File lokal dikunci dengan path, ukuran, dan waktu modifikasi agar tidak perlu membaca seluruh isi DSM
+    return siapkan_dsm_cache("file_" + sidik_sumber(sumber), lambda path: shutil.copyfile(sumber, path))
+
+def potong_substring(garis, interval_segmen):
+    """Memotong satu LineString menjadi substring lengkung sepanjang interval_segmen (operasi array numpy).
+
+    Mengembalikan array LineString segmen beserta jarak batas segmen di sepanjang garis.
+    """
+    xy = shapely.get_coordinates(garis)
+    jarak_vertex = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(xy, axis=0).T))])
+    unik = np.concatenate([[True], np.diff(jarak_vertex) > 0])  # buang vertex ganda (ruas nol)
+    xy, jarak_vertex = xy[unik], jarak_vertex[unik]
+
+    panjang = jarak_vertex[-1]
+    batas = np.append(np.arange(0, panjang, interval_segmen), panjang)
+    n_segmen = len(batas) - 1
+    if n_segmen < 1:
+        return np.array([], dtype=object), batas[:0]
+
+    titik_batas = np.column_stack([np.interp(batas, jarak_vertex, xy[:, 0]), np.interp(batas, jarak_vertex, xy[:, 1])])
+
+    # Vertex asli yang jatuh di dalam sebuah segmen ikut menjadi vertex substring (lengkung tetap terjaga)
+    seg_vertex = np.searchsorted(batas, jarak_vertex, side="right") - 1
+    interior = (seg_vertex < n_segmen) & (jarak_vertex > batas[np.minimum(seg_vertex, n_segmen - 1)])
+
+    idx_segmen = np.arange(n_segmen)
+    seg = np.concatenate([idx_segmen, seg_vertex[interior], idx_segmen])
+    kelas = np.concatenate([np.zeros(n_segmen), np.ones(interior.sum()), np.full(n_segmen, 2)])
+    urutan_vertex = np.concatenate([np.zeros(n_segmen), np.flatnonzero(interior), np.zeros(n_segmen)])
+    coords = np.concatenate([titik_batas[:-1], xy[interior], titik_batas[1:]])
+
+    urutan = np.lexsort((urutan_vertex, kelas, seg))
+    return shapely.linestrings(coords[urutan], indices=seg[urutan]), batas
+
+def pisah_rute(jalan, kolom_rute=None):
+    """Menggabungkan ruas jalan per rute lalu memecahnya menjadi garis menerus (cabang menjadi rute terpisah)"""
+    from shapely.ops import linemerge
+
+    if kolom_rute and kolom_rute in jalan.columns:
+        kelompok = [(str(nama), grup.geometry) for nama, grup in jalan.groupby(kolom_rute, sort=False)]
+    else:
+        kelompok = [(None, jalan.geometry)]
+
+    rute = []
+    for nama, geoms in kelompok:
+        union_geom = geoms.union_all()
+        merged = linemerge(union_geom) if union_geom.geom_type == "MultiLineString" else union_geom
+        bagian = list(merged.geoms) if hasattr(merged, "geoms") else [merged]
+        bagian = [g for g in bagian if g.geom_type == "LineString" and g.length > 0]
+        for i, garis in enumerate(bagian, start=1):
+            if nama is None:
+                rute.append((str(len(rute) + 1), garis))
+            else:
+                rute.append((nama if len(bagian) == 1 else f"{nama}.{i}", garis))
+    return rute
+
+def label_sta(awal, akhir):
+    """Label STA per segmen dari jarak awal/akhir (meter) tanpa loop Python"""
+    awal = pd.Series(np.round(awal).astype(np.int64)).astype(str).str.zfill(3)
+    akhir = pd.Series(np.round(akhir).astype(np.int64)).astype(str).str.zfill(3)
+    return (awal + "+000 - " + akhir + "+000").to_numpy()
+
+def buat_segmen(jalan, interval_segmen, lebar_jalan, epsg_code, kolom_rute=None):
+    """Membagi jalan menjadi poligon segmen lengkung sepanjang interval_segmen untuk setiap rute"""
+    if jalan.crs is None:
+        jalan = jalan.set_crs(epsg=4326)
+    if jalan.crs.to_epsg() != epsg_code:
+        jalan = jalan.to_crs(epsg=epsg_code)
+
+    geoms, nama_rute, sta_awal, sta_akhir = [], [], [], []
+    for nama, garis in pisah_rute(jalan, kolom_rute):
+        segmen, batas = potong_substring(garis, interval_segmen)
+        geoms.append(segmen)
+        nama_rute.append(np.full(len(segmen), nama, dtype=object))
+        sta_awal.append(batas[:-1])
+        sta_akhir.append(np.minimum(batas[:-1] + interval_segmen, int(garis.length)))
+
+    geoms = np.concatenate(geoms) if geoms else np.array([], dtype=object)
+    sta_awal = np.concatenate(sta_awal) if sta_awal else np.array([])
+    sta_akhir = np.concatenate(sta_akhir) if sta_akhir else np.array([])
+
+    seg_gdf = gpd.GeoDataFrame({
+        "Segmen": np.arange(1, len(geoms) + 1),
+        "Rute": np.concatenate(nama_rute) if nama_rute else np.array([], dtype=object),
+        "STA": label_sta(sta_awal, sta_akhir),
+        "STA_Awal": sta_awal,
+        "STA_Akhir": sta_akhir,
+    }, geometry=shapely.buffer(geoms, lebar_jalan / 2, cap_style="flat"), crs=jalan.crs)
+    seg_gdf["Luas_Segmen"] = seg_gdf.geometry.area
+    return seg_gdf
+
+def baca_layer_kerusakan(sumber, crs):
+    """Membaca layer kerusakan (opsional) dan menyamakan CRS-nya dengan segmen"""
+    gdf = baca_layer_vektor(sumber) if sumber else gpd.GeoDataFrame(columns=['geometry'], crs=crs)
+    if not gdf.empty:
+        if gdf.crs is None:
+            gdf.set_crs(crs, inplace=True)
+        elif gdf.crs != crs:
+            gdf.to_crs(crs, inplace=True)
+    return gdf
+
+def hitung_tabel_sdi(seg_gdf, gdf_retak, gdf_pothole, gdf_rutting, aturan=None, kerusakan=None, catatan=None):
+    """Menghitung tabel SDI per segmen lalu menggabungkannya ke seg_gdf.
+
+    kerusakan (opsional) adalah data kerusakan per segmen yang sudah dihitung (mis. hasil hitung_kerusakan_shard);
+    bila diberikan, layer kerusakan tidak dibaca lagi. catatan diteruskan ke hitung_kerusakan_segmen.
+    """
+    if kerusakan is None:
+        kerusakan = hitung_kerusakan_segmen(seg_gdf, gdf_retak, gdf_pothole, gdf_rutting, catatan=catatan)
+    skor = hitung_sdi_batch(kerusakan["persen_retak"], kerusakan["lebar_retak"], kerusakan["jumlah_lubang"], kerusakan["kedalaman_rutting"], aturan=aturan)
+
+    df_sdi = pd.DataFrame({
+        "Segmen": kerusakan["Segmen"],
+        "%Retak": kerusakan["persen_retak"].round(2),
+        "Lebar Retak (mm)": kerusakan["lebar_retak"].round(2),
+        "Jumlah Lubang": kerusakan["jumlah_lubang"],
+        "Rutting (cm)": kerusakan["kedalaman_rutting"].round(2),
+        "SDI1": skor["SDI1"], "SDI2": skor["SDI2"], "SDI3": skor["SDI3"], "SDI4": skor["SDI4"].round(2),
+        "Kondisi": skor["Kondisi"]
+    })
+    seg_gdf = seg_gdf.merge(df_sdi, on="Segmen", how="left")
+    return df_sdi, seg_gdf
+
+# =========================================
+# SHARD KORIDOR PANJANG (PROCESS POOL)
+# =========================================
+def jumlah_shard(n_segmen, max_workers=None, segmen_min_per_shard=200):
+    """Jumlah rantai segmen untuk mode shard; 1 berarti koridor dihitung serial"""
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers <= 1:
+        return 1
+    # Dua shard per worker agar shard yang lebih padat kerusakannya tidak membuat worker lain menganggur
+    return max(1, min(2 * max_workers, n_segmen // segmen_min_per_shard))
+
+def bagi_shard(n_segmen, jumlah):
+    """Membagi n_segmen baris (urut Segmen) menjadi rantai bersebelahan; list (awal, akhir) posisi baris"""
+    batas = np.linspace(0, n_segmen, max(1, min(jumlah, n_segmen)) + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(batas[:-1], batas[1:]) if b > a]
+
+def _fitur_per_shard(gdf, seg_geoms, shard):
+    """Posisi fitur gdf yang beririsan dengan segmen tiap shard, urutan asli dipertahankan"""
+    if gdf.empty:
+        return [np.array([], dtype=int)] * len(shard)
+    idx_seg, idx_fitur = gdf.sindex.query(seg_geoms, predicate="intersects")
+    return [np.unique(idx_fitur[(idx_seg >= awal) & (idx_seg < akhir)]) for awal, akhir in shard]
+
+def _hitung_kerusakan_shard(args):
+    """Worker process pool: kedalaman rutting (bila belum ada) dan data kerusakan satu rantai segmen"""
+    seg_shard, gdf_retak, gdf_pothole, gdf_rutting, dsm_path = args
+    if not gdf_rutting.empty and "kedalaman_calc" not in gdf_rutting.columns:
+        # Paralelisme sudah di level shard; DSM dibaca satu thread per proses
+        gdf_rutting = hitung_depth_cm(gdf_rutting, dsm_path, max_workers=1)
+    return hitung_kerusakan_segmen(seg_shard, gdf_retak, gdf_pothole, gdf_rutting)
+
+def hitung_kerusakan_shard(seg_gdf, gdf_retak, gdf_pothole, gdf_rutting, dsm_path, max_workers=None, jumlah=None, batal=None):
+    """Data kerusakan per segmen dengan koridor dibagi menjadi rantai segmen yang dihitung paralel di process pool.
+
+    Setiap shard hanya menerima fitur retak/lubang/rutting yang beririsan dengan segmennya (urutan asli tetap)
+    dan membaca jendela DSM untuk rutting-nya sendiri, sehingga overlay dan agregasi per segmen sama persis
+    dengan jalur serial. Rutting di perbatasan dua shard dihitung kedalamannya di kedua shard.
+    batal (threading.Event): shard yang belum berjalan dibatalkan dan CancelledError langsung dilempar.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    shard = bagi_shard(len(seg_gdf), jumlah or jumlah_shard(len(seg_gdf), max_workers))
+    # Hanya kolom yang dipakai hitung_kerusakan_segmen yang dikirim ke worker
+    seg_gdf = seg_gdf[["Segmen", "Luas_Segmen", seg_gdf.geometry.name]]
+    layer = [gdf[[k for k in ("kedalaman_calc", gdf.geometry.name) if k in gdf.columns]]
+             for gdf in (gdf_retak, gdf_pothole, gdf_rutting)]
+    fitur = [_fitur_per_shard(gdf, seg_gdf.geometry.values, shard) for gdf in layer]
+    tugas = [(seg_gdf.iloc[awal:akhir], *(gdf.iloc[idx[i]] for gdf, idx in zip(layer, fitur)), dsm_path)
+             for i, (awal, akhir) in enumerate(shard)]
+
+    pool = ProcessPoolExecutor(max_workers=min(max_workers, len(tugas)), mp_context=multiprocessing.get_context("spawn"))
+    try:
+        futures = [pool.submit(_hitung_kerusakan_shard, t) for t in tugas]
+        while batal is not None and not all(f.done() for f in futures):
+            if batal.wait(0.2):
+                raise CancelledError()
+        hasil = [f.result() for f in futures]
+    except BaseException:
+        # Shard yang belum mulai dibatalkan; shard yang sedang berjalan tidak ditunggu
+        pool.shutdown(wait=False, cancel_futures=True)
+        raise
+    pool.shutdown()
+    return pd.concat(hasil, ignore_index=True)
+
+# =========================================
+# PRATINJAU PERKIRAAN (CEPAT, DENGAN PERKIRAAN GALAT)
+# =========================================
+def _titik_pada_batas(geoms, k):
+    """k titik berjarak sama pada batas setiap geometri (n*k titik, NaN untuk geometri tanpa batas)"""
+    t = np.tile((np.arange(k) + 0.5) / k, len(geoms))
+    titik = shapely.line_interpolate_point(np.repeat(shapely.boundary(geoms), k), t, normalized=True)
+    return shapely.get_x(titik).reshape(-1, k), shapely.get_y(titik).reshape(-1, k)
+
+def perkiraan_depth_cm(gdf, dsm_path, buffer_distance=0.3, batas_memori_mb=128, titik_per_fitur=8, sampel_kalibrasi=100,
+                       seed=0):
+    """Perkiraan cepat kedalaman rutting (cm) tanpa merasterisasi tiap rutting.
+
+    DSM di sekitar seluruh rutting dibaca satu kali pada resolusi yang diturunkan hingga muat di batas_memori_mb
+    (GDAL memakai overview bila ada), lalu disampel pada titik di dalam rutting (persentil 10) dan pada ring di
+    sekelilingnya (median). Galat diperkirakan dengan membandingkan sampel acak rutting terhadap hitung_depth_cm;
+    galat_sampel_cm adalah galat absolut maksimum pada sampel tersebut, bukan batas galat seluruh rutting.
+    Mengembalikan (gdf dengan kolom kedalaman_calc, info) dengan info berisi galat_sampel_cm, faktor_turun, dan
+    fraksi rutting tanpa nilai DSM valid.
+    """
+    with rasterio.open(dsm_path) as DSM:
+        if gdf.crs != DSM.crs:
+            gdf = gdf.to_crs(DSM.crs)
+        geoms = gdf.geometry.values
+        idx = np.flatnonzero(~(shapely.is_missing(geoms) | shapely.is_empty(geoms)))
+        depth = np.zeros(len(gdf))
+        info = {"galat_sampel_cm": 0.0, "faktor_turun": 1, "tanpa_dsm": 0.0}
+        window = jendela_piksel(shapely.total_bounds(shapely.buffer(geoms[idx], buffer_distance)), DSM.transform,
+                                DSM.height, DSM.width) if len(idx) else None
+        if window is None:
+            info["tanpa_dsm"] = 1.0 if len(idx) else 0.0
+            gdf = gdf.copy()
+            gdf["kedalaman_calc"] = depth
+            return gdf, info
+
+        faktor = max(1, math.ceil(math.sqrt(window.width * window.height * 4 / (batas_memori_mb * 1024 ** 2))))
+        tinggi, lebar = math.ceil(window.height / faktor), math.ceil(window.width / faktor)
+        data = DSM.read(1, window=window, out_shape=(tinggi, lebar), masked=True).astype("float32").filled(np.nan)
+        transform = DSM.window_transform(window) * rasterio.Affine.scale(window.width / lebar, window.height / tinggi)
+        info["faktor_turun"] = faktor
+
+    def sampel(x, y):
+        col, row = ~transform * (x, y)
+        ok = np.isfinite(col) & np.isfinite(row)
+        row = np.where(ok, np.floor(np.where(ok, row, 0)), -1).astype(np.int64)
+        col = np.where(ok, np.floor(np.where(ok, col, 0)), -1).astype(np.int64)
+        ok &= (row >= 0) & (row < tinggi) & (col >= 0) & (col < lebar)
+        return np.where(ok, data[np.clip(row, 0, tinggi - 1), np.clip(col, 0, lebar - 1)], np.nan)
+
+    g = geoms[idx]
+    k = titik_per_fitur
+    pusat = shapely.point_on_surface(g)
+    px, py = shapely.get_x(pusat)[:, None], shapely.get_y(pusat)[:, None]
+    tx, ty = _titik_pada_batas(g, k)
+    # Titik lubang: pusat + titik tengah antara pusat dan batas; titik ring: batas dari buffer setengah jarak ring
+    z_lubang = sampel(np.hstack([px, (px + tx) / 2]), np.hstack([py, (py + ty) / 2]))
+    z_ring = sampel(*_titik_pada_batas(shapely.buffer(g, buffer_distance / 2), k))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # baris tanpa nilai DSM valid menghasilkan NaN
+        z_min = np.nanpercentile(z_lubang, 10, axis=1)
+        z_ref = np.nanmedian(z_ring, axis=1)
+    tanpa_nilai = np.isnan(z_min) | np.isnan(z_ref)
+    depth[idx] = np.clip(np.where(tanpa_nilai, 0, (z_ref - z_min) * 100), 0, 15)
+    info["tanpa_dsm"] = float(tanpa_nilai.mean())
+
+    gdf = gdf.copy()
+    gdf["kedalaman_calc"] = depth
+    if sampel_kalibrasi:
+        pilihan = np.sort(np.random.default_rng(seed).choice(idx, min(sampel_kalibrasi, len(idx)), replace=False))
+        persis = hitung_depth_cm(gdf.iloc[pilihan][[gdf.geometry.name]], dsm_path, buffer_distance, max_workers=1)
+        info["galat_sampel_cm"] = float(np.abs(persis["kedalaman_calc"].to_numpy() - depth[pilihan]).max())
+    return gdf, info
+
+def periksa_input(seg_gdf, epsg_code, layer, dsm_path, batas_luar_koridor=0.5):
+    """Pemeriksaan cepat kesalahan input umum; mengembalikan list pesan peringatan.
+
+    layer: dict nama -> GeoDataFrame kerusakan (sudah dalam CRS segmen).
+    """
+    from pyproj import CRS
+
+    peringatan = []
+    if seg_gdf.empty:
+        return ["Layer jalan tidak menghasilkan segmen (periksa geometri dan interval segmen)."]
+    bounds = seg_gdf.total_bounds
+    if not np.isfinite(bounds).all():
+        return ["Koordinat segmen tidak valid; layer jalan kemungkinan tidak memiliki CRS atau CRS-nya salah."]
+
+    crs_epsg = CRS.from_epsg(epsg_code)
+    area = crs_epsg.area_of_use
+    if area is not None:
+        minx, miny, maxx, maxy = seg_gdf.geometry.to_crs(4326).total_bounds
+        if maxx < area.west or minx > area.east or maxy < area.south or miny > area.north:
+            peringatan.append(f"Jalan berada di luar area penggunaan EPSG:{epsg_code} ({crs_epsg.name}); periksa kode EPSG.")
+
+    for nama, gdf in layer.items():
+        if gdf.empty:
+            peringatan.append(f"Layer {nama} kosong atau tidak diunggah.")
+            continue
+        di_koridor = np.unique(seg_gdf.sindex.query(gdf.geometry, predicate="intersects")[0]).size
+        luar = 1 - di_koridor / len(gdf)
+        if luar > batas_luar_koridor:
+            peringatan.append(f"{luar:.0%} fitur {nama} berada di luar koridor segmen; periksa CRS layer atau lebar jalan.")
+
+    with rasterio.open(dsm_path) as DSM:
+        koridor = shapely.box(*seg_gdf.to_crs(DSM.crs).total_bounds) if DSM.crs else shapely.box(*bounds)
+        tutupan = koridor.intersection(shapely.box(*DSM.bounds)).area / koridor.area if koridor.area > 0 else 0.0
+    if tutupan == 0:
+        peringatan.append("DSM tidak bertampalan dengan koridor jalan; periksa CRS atau lokasi DSM.")
+    elif tutupan < 0.9:
+        peringatan.append(f"DSM hanya menutup sekitar {tutupan:.0%} kotak batas koridor jalan.")
+    return peringatan
+
+def pesan_kebersihan(kebersihan):
+    """Pesan ringkas per layer untuk geometri yang diperbaiki/dibuang/dipecah oleh bersihkan_geometri"""
+    pesan = []
+    for nama, jumlah in kebersihan.items():
+        rincian = [f"{jumlah[k]} {label}" for k, label in (("diperbaiki", "tidak valid diperbaiki"),
+                                                          ("kosong", "kosong dibuang"),
+                                                          ("multipart", "multipart dipecah")) if jumlah[k]]
+        if rincian:
+            pesan.append(f"Geometri {nama}: {', '.join(rincian)}.")
+    return pesan
+
+# =========================================
+# VISUALISASI PETA & GRAFIK
+# =========================================
+def gambar_segmen(ax, seg_gdf, maks_label=300, label=True, legenda_bawah=False, tepi_hitam=None):
+    """Menggambar seluruh poligon segmen sebagai satu PolyCollection, lalu label yang sudah dijarangkan"""
+    from matplotlib.collections import PolyCollection
+
+    geoms = seg_gdf.geometry.values
+    valid = ~shapely.is_empty(geoms) & ~shapely.is_missing(geoms)
+    parts, idx_seg = shapely.get_parts(geoms[valid], return_index=True)
+    coords, idx_coord = shapely.get_coordinates(shapely.get_exterior_ring(parts), return_index=True)
+    verts = np.split(coords, np.flatnonzero(np.diff(idx_coord)) + 1)
+
+    warna = seg_gdf["Kondisi"].map(WARNA_KONDISI).fillna("#bdc3c7").to_numpy()[valid][idx_seg]
+    if tepi_hitam is None:
+        tepi_hitam = len(seg_gdf) <= 200
+    if tepi_hitam:
+        koleksi = PolyCollection(verts, facecolors=warna, edgecolors="black", linewidths=1)
+    else:
+        # Pada jaringan besar/peta lajur poligon lebih tipis dari satu piksel; tepi berwarna sama agar warna tetap terlihat
+        koleksi = PolyCollection(verts, facecolors=warna, edgecolors=warna, linewidths=1.5)
+    ax.add_collection(koleksi)
+    ax.autoscale_view()
+    ax.set_aspect("equal")
+
+    legend_handles = []
+    jumlah = seg_gdf["Kondisi"].value_counts()
+    for kondisi, warna_kondisi in WARNA_KONDISI.items():
+        if jumlah.get(kondisi, 0) > 0:
+            legend_handles.append(mpatches.Patch(color=warna_kondisi, label=f"{kondisi} ({jumlah[kondisi]})"))
+    if legend_handles and legenda_bawah:
+        ax.legend(handles=legend_handles, loc="upper center", bbox_to_anchor=(0.5, -0.02), ncol=len(legend_handles),
+                  fontsize=8, frameon=False)
+    elif legend_handles:
+        # loc="best" menguji seluruh vertex koleksi, sehingga hanya dipakai untuk jaringan kecil
+        ax.legend(handles=legend_handles, loc="best" if len(seg_gdf) <= 200 else "upper right",
+                  title="Kategori Kondisi", fontsize=8, title_fontsize=9)
+    ax.axis("off")
+
+    if not label or maks_label <= 0 or not valid.any():
+        return
+    pusat = shapely.centroid(geoms[valid])
+    x, y = shapely.get_x(pusat), shapely.get_y(pusat)
+    segmen = seg_gdf["Segmen"].to_numpy()[valid]
+    sdi = seg_gdf["SDI4"].to_numpy()[valid]
+    for i in pilih_label(ax, x, y, maks_label):
+        ax.text(x[i], y[i], f"S{segmen[i]}\n{sdi[i]:.0f}",
+            fontsize=7, weight="bold", ha="center", va="center",
+            bbox=dict(facecolor="white", alpha=0.8, boxstyle="round,pad=0.2", edgecolor="gray", lw=0.5))
+
+def pilih_label(ax, x, y, maks_label, ukuran_sel_px=(75, 45)):
+    """Indeks label yang ditampilkan: paling banyak satu per sel grid layar dan tidak lebih dari maks_label"""
+    ax.apply_aspect()
+    xy_px = ax.transData.transform(np.column_stack([x, y]))
+    sel = np.floor(xy_px / np.asarray(ukuran_sel_px)).astype(np.int64)
+    _, pertama = np.unique(sel, axis=0, return_index=True)
+    pilih = np.sort(pertama)
+    if len(pilih) > maks_label:
+        pilih = pilih[np.linspace(0, len(pilih) - 1, maks_label).astype(int)]
+    return pilih
+
+def buat_peta(seg_gdf, peta_path, dpi=300, label=True):
+    """Menyimpan peta kondisi SDI per segmen sebagai PNG (dpi rendah + tanpa label untuk pratinjau cepat)"""
+    fig_map, ax_map = plt.subplots(figsize=(10,6))
+    gambar_segmen(ax_map, seg_gdf, label=label)
+    ax_map.set_title("Peta Kondisi Jalan Metode SDI", fontsize=12, weight="bold")
+    fig_map.savefig(peta_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig_map)
+
+def _render_lembar_strip(args):
+    """Worker process pool: merender satu lembar peta lajur"""
+    sub_gdf, path, judul, dpi = args
+    fig, ax = plt.subplots(figsize=(10, 4))
+    gambar_segmen(ax, sub_gdf, maks_label=60, legenda_bawah=True, tepi_hitam=False)
+    ax.set_title(judul, fontsize=11, weight="bold")
+    fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return path
+
+def buat_peta_strip(seg_gdf, folder, km_per_lembar=2.0, dpi=200, max_workers=None):
+    """Peta lajur (strip map) per km_per_lembar untuk koridor panjang, tiap lembar dirender paralel.
+
+    Mengembalikan list (judul, path PNG); kosong bila tidak ada rute yang lebih panjang dari satu lembar.
+    """
+    panjang_lembar = km_per_lembar * 1000
+    if seg_gdf.empty or seg_gdf["STA_Akhir"].max() <= panjang_lembar:
+        return []
+
+    os.makedirs(folder, exist_ok=True)
+    nomor_lembar = (seg_gdf["STA_Awal"] // panjang_lembar).astype(int)
+    tugas = []
+    for (rute, nomor), sub_gdf in seg_gdf.groupby([seg_gdf["Rute"], nomor_lembar], sort=False):
+        judul = (f"Rute {rute} - " if seg_gdf["Rute"].nunique() > 1 else "") + \
+                f"STA {sub_gdf['STA_Awal'].min() / 1000:.1f} - {sub_gdf['STA_Akhir'].max() / 1000:.1f} km"
+        path = os.path.join(folder, f"strip_{len(tugas) + 1:04d}.png")
+        tugas.append((sub_gdf[["Segmen", "SDI4", "Kondisi", "geometry"]], path, judul, dpi))
+
+    if max_workers == 1:
+        paths = [_render_lembar_strip(t) for t in tugas]
+    else:
+        # spawn: worker tidak mewarisi thread dan lock (Streamlit, GDAL, BLAS) dari proses induk lewat fork
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            paths = list(pool.map(_render_lembar_strip, tugas))
+    return [(t[2], path) for t, path in zip(tugas, paths)]
+
+def buat_grafik(seg_gdf, grafik_path, dpi=300):
+    """Menyimpan grafik distribusi kondisi segmen sebagai PNG"""
+    fig_bar, ax_bar = plt.subplots(figsize=(6,4))
+    rekap = seg_gdf["Kondisi"].value_counts()
+    warna_bar = [WARNA_KONDISI.get(x, "grey") for x in rekap.index]
+    rekap.plot(kind="bar", color=warna_bar, edgecolor="black", ax=ax_bar)
+    ax_bar.set_title("Distribusi Kondisi Jalan (Segmen)")
+    ax_bar.tick_params(axis="x", rotation=0)
+    fig_bar.tight_layout()
+    fig_bar.savefig(grafik_path, dpi=dpi)
+    plt.close(fig_bar)
+
+def payload_peta_web(seg_gdf, batas_detail=1500, toleransi_m=0.2, toleransi_lod_m=2.0):
+    """GeoJSON WGS84 ringkas untuk peta interaktif, dihitung sekali per hasil.
+
+    Jaringan hingga batas_detail segmen dikirim per segmen. Di atas itu dipakai layer
+    level-of-detail: segmen berurutan dengan kondisi sama pada satu rute digabung menjadi
+    satu poligon (tooltip berisi rentang segmen/STA dan SDI rata-rata).
+    """
+    lod = len(seg_gdf) > batas_detail
+    if lod:
+        urut = seg_gdf.sort_values(["Rute", "STA_Awal"], kind="stable")
+        blok = ((urut["Kondisi"] != urut["Kondisi"].shift()) | (urut["Rute"] != urut["Rute"].shift())).cumsum()
+        kelompok = urut.groupby(blok.to_numpy(), sort=False)
+        fitur = pd.DataFrame({
+            "Segmen_Awal": kelompok["Segmen"].first(),
+            "Segmen_Akhir": kelompok["Segmen"].last(),
+            "Rute": kelompok["Rute"].first(),
+            "STA_Awal": kelompok["STA_Awal"].min(),
+            "STA_Akhir": kelompok["STA_Akhir"].max(),
+            "SDI4": kelompok["SDI4"].mean().round(2),
+            "Kondisi": kelompok["Kondisi"].first(),
+        })
+        fitur["Segmen"] = np.where(fitur["Segmen_Awal"] == fitur["Segmen_Akhir"], fitur["Segmen_Awal"].astype(str),
+                                   fitur["Segmen_Awal"].astype(str) + " - " + fitur["Segmen_Akhir"].astype(str))
+        fitur["STA"] = label_sta(fitur["STA_Awal"].to_numpy(), fitur["STA_Akhir"].to_numpy())
+        potongan = np.split(urut.geometry.to_numpy(), np.flatnonzero(np.diff(blok.to_numpy())) + 1)
+        geom = [shapely.union_all(g) for g in potongan]
+        peta_gdf = gpd.GeoDataFrame(fitur[["Segmen", "Rute", "STA", "SDI4", "Kondisi"]], geometry=geom, crs=seg_gdf.crs)
+        toleransi = toleransi_lod_m
+    else:
+        peta_gdf = seg_gdf[["Segmen", "Rute", "STA", "SDI4", "Kondisi", "geometry"]].copy()
+        peta_gdf["SDI4"] = peta_gdf["SDI4"].round(2)
+        toleransi = toleransi_m
+
+    # Simplifikasi di CRS meter, lalu koordinat WGS84 dibulatkan ke ~10 cm
+    peta_gdf = peta_gdf.set_geometry(shapely.simplify(peta_gdf.geometry.values, toleransi, preserve_topology=True)).to_crs(epsg=4326)
+    peta_gdf = peta_gdf.set_geometry(shapely.set_precision(peta_gdf.geometry.values, 1e-6, mode="pointwise"))
+    minx, miny, maxx, maxy = peta_gdf.total_bounds
+    return {
+        "geojson": peta_gdf.to_json(drop_id=True),
+        "pusat": [(miny + maxy) / 2, (minx + maxx) / 2],
+        "bounds": [[miny, minx], [maxy, maxx]],
+        "lod": lod,
+        "jumlah_fitur": len(peta_gdf),
+    }
+
+# =========================================
+# PEMBUATAN PDF (REPORTLAB)
+# =========================================
+# Bagian laporan ada di sdi_laporan agar ReportLab baru diimpor saat PDF disusun;
+# nama lamanya tetap dapat diimpor dari modul ini
+NAMA_LAPORAN = ("GAYA_TABEL_SEGMEN", "TabelTertunda", "tabel_per_halaman", "buat_laporan_pdf")
+
+def __getattr__(nama):
+    if nama in NAMA_LAPORAN:
+        import sdi_laporan
+        return getattr(sdi_laporan, nama)
+    raise AttributeError(f"module {__name__!r} has no attribute {nama!r}")
+
+# =========================================
+# PEMBUATAN FILE SPASIAL & EXCEL
+# =========================================
+# Hasil infer_dtype untuk kolom object yang dapat ditulis GDAL apa adanya
+TIPE_SKALAR = {"string", "empty", "integer", "floating", "mixed-integer-float", "boolean", "decimal", "date", "datetime"}
+
+def kolom_tak_skalar(gdf):
+    """Kolom atribut berisi list/tuple/dict atau tipe campuran yang harus ditulis sebagai teks ke GPKG/FlatGeobuf.
+
+    Ditentukan dari skema: kolom ber-dtype numerik/string/kategori langsung lolos, dan hanya kolom object yang
+    tipenya diinferensi (pandas infer_dtype, loop C yang berhenti di nilai pertama yang tidak cocok).
+    """
+    kolom = []
+    for col, dtype in gdf.dtypes.items():
+        if col == gdf.geometry.name or dtype != object:
+            continue
+        if pd.api.types.infer_dtype(gdf[col], skipna=True) not in TIPE_SKALAR:
+            kolom.append(col)
+    return kolom
+
+def siapkan_ekspor_vektor(seg_gdf):
+    """seg_gdf dengan kolom tak-skalar diubah menjadi teks (tanpa salinan bila tidak ada)"""
+    kolom = kolom_tak_skalar(seg_gdf)
+    return seg_gdf.assign(**{col: seg_gdf[col].astype(str) for col in kolom}) if kolom else seg_gdf
+
+def tulis_gpkg(seg_gdf, gpkg_path):
+    """Menyimpan segmen hasil SDI ke GeoPackage (pyogrio + Arrow bila tersedia)"""
+    siapkan_ekspor_vektor(seg_gdf).to_file(gpkg_path, driver="GPKG", **opsi_engine_vektor())
+
+def tulis_flatgeobuf(seg_gdf, fgb_path):
+    """Menyimpan segmen hasil SDI ke FlatGeobuf ber-indeks spasial (dibaca streaming/per bbox oleh QGIS & GDAL).
+
+    Indeks spasial mengurutkan fitur menurut kurva Hilbert; urutan segmen ada di kolom Segmen.
+    """
+    siapkan_ekspor_vektor(seg_gdf).to_file(fgb_path, driver="FlatGeobuf", SPATIAL_INDEX="YES", **opsi_engine_vektor())
+
+def tulis_geoparquet(seg_gdf, parquet_path):
+    """Menyimpan segmen hasil SDI ke GeoParquet (kolumnar, ZSTD, dengan kolom bbox untuk filter spasial)"""
+    seg_gdf.to_parquet(parquet_path, index=False, compression="zstd", write_covering_bbox=True)
+
+def tulis_excel(df_sdi, excel_path, baris_streaming=None):
+    """Menyimpan tabel rekap SDI ke Excel; di atas baris_streaming baris (default BARIS_EXCEL_STREAMING) ditulis streaming"""
+    baris_streaming = BARIS_EXCEL_STREAMING if baris_streaming is None else baris_streaming
+    if len(df_sdi) > baris_streaming:
+        tulis_excel_streaming(df_sdi, excel_path)
+        return
+    with pd.ExcelWriter(excel_path, engine='xlsxwriter') as writer:
+        df_sdi.to_excel(writer, sheet_name='Rekap SDI', index=False)
+
+def tulis_excel_streaming(df, excel_path, sheet='Rekap SDI', baris_per_blok=10_000):
+    """Menulis DataFrame ke XLSX dengan xlsxwriter constant_memory: setiap baris dibuang dari memori setelah ditulis.
+
+    pandas.to_excel menulis sel per kolom sehingga tidak dapat dipakai dengan constant_memory; di sini baris
+    ditulis berurutan per blok. Tampilan mengikuti pandas: header tebal berbingkai, NaN sebagai sel kosong.
+    """
+    import xlsxwriter
+
+    with xlsxwriter.Workbook(excel_path, {"constant_memory": True}) as workbook:
+        worksheet = workbook.add_worksheet(sheet)
+        gaya_header = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], gaya_header)
+        for awal in range(0, len(df), baris_per_blok):
+            blok = df.iloc[awal:awal + baris_per_blok]
+            kolom = [blok[col].astype(object).where(blok[col].notna(), None).tolist() if blok[col].hasnans
+                     else blok[col].tolist() for col in df.columns]
+            for baris, nilai in enumerate(zip(*kolom), start=awal + 1):
+                worksheet.write_row(baris, 0, nilai)
+
+# =========================================
+# PIPELINE LENGKAP
+# =========================================
+def _sidik_input(cache, **sumber):
+    """Sidik setiap input (hanya bila cache dipakai)"""
+    return {nama: sidik_sumber(s) for nama, s in sumber.items()} if cache is not None else {}
+
+def _baca_segmen(jalan, sidik, lebar_jalan, interval_segmen, epsg_code, kolom_rute, profiler, cache):
+    with profiler.tahap("baca_jalan") as catatan:
+        gdf_jalan = _ambil_tahap(cache, "baca_jalan", sidik.get("jalan"), lambda: baca_layer_vektor(jalan), catatan)
+        catatan["fitur"] = len(gdf_jalan)
+    with profiler.tahap("segmentasi") as catatan:
+        seg_gdf = buat_segmen(gdf_jalan, interval_segmen, lebar_jalan, epsg_code, kolom_rute=kolom_rute)
+        catatan["segmen"] = len(seg_gdf)
+    return seg_gdf
+
+def _baca_kerusakan(retak, pothole, rutting, crs, sidik, profiler, cache):
+    """Membaca ketiga layer kerusakan lalu membersihkan geometrinya (bersihkan_geometri).
+
+    Hanya layer yang sudah bersih yang disimpan di cache (kunci: sidik layer + CRS segmen, yang hanya bergantung
+    pada EPSG, + toleransi simplify). Mengembalikan (gdf_retak, gdf_pothole, gdf_rutting, kebersihan) dengan
+    kebersihan = dict nama layer -> hitungan perubahan geometri.
+    """
+    sumber = {"retak": retak, "pothole": pothole, "rutting": rutting}
+    kunci = {nama: (sidik.get(nama), crs.to_string(), TOLERANSI_SIMPLIFY_M) for nama in sumber}
+    bersih = {nama: cache.cari(f"bersih_{nama}", kunci[nama]) if cache is not None else None for nama in sumber}
+    with profiler.tahap("baca_kerusakan") as catatan:
+        mentah = {nama: baca_layer_kerusakan(s, crs) for nama, s in sumber.items() if bersih[nama] is None}
+        if cache is not None:
+            catatan["cache"] = "miss" if mentah else "hit"
+        catatan.update({f"fitur_{nama}": len(gdf) for nama, gdf in mentah.items()})
+    with profiler.tahap("kebersihan_geometri") as catatan:
+        for nama, gdf in mentah.items():
+            bersih[nama] = _ambil_tahap(cache, f"bersih_{nama}", kunci[nama], lambda: bersihkan_geometri(gdf))
+        for nama, (_, jumlah) in bersih.items():
+            catatan.update({f"{nama}_{k}": v for k, v in jumlah.items() if k not in ("fitur_awal", "fitur_akhir")})
+    return (*(bersih[nama][0] for nama in sumber), {nama: bersih[nama][1] for nama in sumber})
+
+def hitung_survey(jalan, dsm_path, retak=None, pothole=None, rutting=None, lebar_jalan=3.0, interval_segmen=100,
+                  epsg_code=32749, kolom_rute=None, max_workers_dsm=None, profiler=None, batal=None, cache=None,
+                  max_workers_shard=1, batch_kerusakan=None):
+    """Tahap hitung pipeline (baca data -> segmen -> kedalaman DSM -> overlay -> skor) tanpa ekspor.
+
+    Mengembalikan (df_sdi, seg_gdf); dipakai jalankan_pipeline maupun aplikasi yang membuat ekspor secara lazy.
+    batal (threading.Event) menghentikan pembacaan DSM lebih awal; pembatalan penuh ditangani lewat
+    callback saat_tahap pada profiler. Dengan cache (CacheTahap), pembacaan layer dan kedalaman rutting
+    dipakai ulang selama sidik input, EPSG, dan DSM-nya sama. max_workers_shard > 1 (None = jumlah core)
+    membagi koridor panjang menjadi rantai segmen yang dihitung di process pool; hasilnya identik dengan
+    jalur serial, dan koridor yang terlalu pendek tetap dihitung serial. batch_kerusakan (jumlah fitur per batch)
+    mengaktifkan mode streaming untuk layer kerusakan yang sangat besar: memori puncak tidak bergantung pada ukuran
+    layer, tanpa cache layer maupun shard. Pada mode streaming, retak yang bertampalan hanya dilarutkan bila berada di
+    batch yang sama; deteksi ganda yang terbaca di batch berbeda dihitung dua kali, sehingga %Retak bisa lebih besar
+    (dan Lebar Retak bergeser) dibanding jalur di memori.
+    """
+    profiler = profiler or ProfilerTahap(aktif=False)
+    sidik = _sidik_input(cache, jalan=jalan, retak=retak, pothole=pothole, rutting=rutting)
+
+    # 1. BACA JALAN & BUAT SEGMEN
+    seg_gdf = _baca_segmen(jalan, sidik, lebar_jalan, interval_segmen, epsg_code, kolom_rute, profiler, cache)
+
+    if batch_kerusakan:
+        # 2-4. MODE STREAMING: layer kerusakan tidak pernah dimuat utuh; hanya jumlahan per segmen yang disimpan
+        with profiler.tahap("kerusakan_bertahap", segmen=len(seg_gdf)) as catatan:
+            kerusakan = hitung_kerusakan_bertahap(seg_gdf, retak, pothole, rutting, dsm_path, ukuran_batch=batch_kerusakan,
+                                                  max_workers_dsm=max_workers_dsm, batal=batal, catatan=catatan)
+        with profiler.tahap("overlay_skor", segmen=len(seg_gdf)):
+            df_sdi, seg_gdf = hitung_tabel_sdi(seg_gdf, None, None, None, kerusakan=kerusakan)
+        return df_sdi, seg_gdf
+
+    # 2. BACA DATA KERUSAKAN
+    crs = seg_gdf.crs
+    gdf_retak, gdf_pothole, gdf_rutting, _ = _baca_kerusakan(retak, pothole, rutting, crs, sidik, profiler, cache)
+
+    kunci_dsm = (sidik.get("rutting"), crs.to_string(), os.path.abspath(dsm_path))
+    n_shard = jumlah_shard(len(seg_gdf), max_workers_shard)
+    if n_shard > 1:
+        # 3-4. MODE SHARD: kedalaman DSM + overlay per rantai segmen di process pool (kedalaman dari cache bila ada)
+        if cache is not None and not gdf_rutting.empty:
+            gdf_rutting = cache.cari("kedalaman_dsm", kunci_dsm, gdf_rutting)
+        with profiler.tahap("overlay_skor", segmen=len(seg_gdf), fitur_rutting=len(gdf_rutting), shard=n_shard):
+            kerusakan = hitung_kerusakan_shard(seg_gdf, gdf_retak, gdf_pothole, gdf_rutting, dsm_path,
+                                               max_workers=max_workers_shard, jumlah=n_shard, batal=batal)
+            df_sdi, seg_gdf = hitung_tabel_sdi(seg_gdf, None, None, None, kerusakan=kerusakan)
+        return df_sdi, seg_gdf
+
+    # 3. KEDALAMAN RUTTING DARI DSM (tidak bergantung pada segmentasi)
+    if not gdf_rutting.empty:
+        with profiler.tahap("kedalaman_dsm", fitur_rutting=len(gdf_rutting)) as catatan:
+            gdf_rutting = _ambil_tahap(
+                cache, "kedalaman_dsm", kunci_dsm,
+                lambda: hitung_depth_cm(gdf_rutting, dsm_path, max_workers=max_workers_dsm, batal=batal),
+                catatan, batal=batal)
+
+    # 4. KALKULASI OVERLAY & SDI PER SEGMEN
+    with profiler.tahap("overlay_skor", segmen=len(seg_gdf)) as catatan:
+        df_sdi, seg_gdf = hitung_tabel_sdi(seg_gdf, gdf_retak, gdf_pothole, gdf_rutting, catatan=catatan)
+    return df_sdi, seg_gdf
+
+def hitung_survey_perkiraan(jalan, dsm_path, retak=None, pothole=None, rutting=None, lebar_jalan=3.0, interval_segmen=100,
+                            epsg_code=32749, kolom_rute=None, batas_memori_dsm_mb=128, cache=None, aturan=None):
+    """Pratinjau cepat hitung_survey untuk cek awal input sebelum run presisi penuh.
+
+    Kedalaman rutting diperkirakan dari DSM beresolusi turun (perkiraan_depth_cm), lalu setiap segmen diberi rentang
+    SDI4_Perkiraan_Min - SDI4_Perkiraan_Maks dan Kondisi_Stabil (kondisi sama di kedua ujung rentang). Retak dan lubang
+    memakai layer bersih yang sama dengan run presisi (sudah disederhanakan bersihkan_geometri), sehingga komponennya
+    sama persis; rentang hanya berasal dari rutting. Rentang ini perkiraan, bukan jaminan: kedalaman rutting memakai
+    galat maksimum sampel kalibrasi DSM (galat_sampel_cm), sehingga rutting di luar sampel dapat melampauinya. Aturan SDI
+    monoton, sehingga ujung rentang SDI cukup dihitung dari ujung bawah/atas kedalaman rutting.
+    Mengembalikan (df_sdi, seg_gdf, ringkasan); ringkasan memuat galat sampel rutting, faktor turun DSM,
+    dan peringatan input (periksa_input). Dengan cache yang sama, run presisi berikutnya tidak membaca ulang layer.
+    """
+    aturan = ATURAN_SDI_BINA_MARGA if aturan is None else aturan
+    profiler = ProfilerTahap(aktif=False)
+    sidik = _sidik_input(cache, jalan=jalan, retak=retak, pothole=pothole, rutting=rutting)
+    seg_gdf = _baca_segmen(jalan, sidik, lebar_jalan, interval_segmen, epsg_code, kolom_rute, profiler, cache)
+    gdf_retak, gdf_pothole, gdf_rutting, kebersihan = _baca_kerusakan(retak, pothole, rutting, seg_gdf.crs, sidik,
+                                                                       profiler, cache)
+
+    peringatan = periksa_input(seg_gdf, epsg_code, {"retak": gdf_retak, "lubang": gdf_pothole, "rutting": gdf_rutting},
+                               dsm_path)
+    peringatan += pesan_kebersihan(kebersihan)
+    info_dsm = {"galat_sampel_cm": 0.0, "faktor_turun": 1, "tanpa_dsm": 0.0}
+    if not gdf_rutting.empty:
+        gdf_rutting, info_dsm = perkiraan_depth_cm(gdf_rutting, dsm_path, batas_memori_mb=batas_memori_dsm_mb)
+        gdf_rutting = gdf_rutting.to_crs(seg_gdf.crs)
+        if info_dsm["tanpa_dsm"] > 0.5:
+            peringatan.append(f"{info_dsm['tanpa_dsm']:.0%} rutting tidak memiliki nilai DSM valid; periksa CRS atau nodata DSM.")
+
+    akumulator = AkumulatorKerusakan(seg_gdf)
+    akumulator.tambah_retak(gdf_retak)
+    akumulator.tambah_pothole(gdf_pothole)
+    akumulator.tambah_rutting(gdf_rutting)
+    kerusakan = akumulator.hasil()
+    df_sdi, seg_gdf = hitung_tabel_sdi(seg_gdf, None, None, None, aturan=aturan, kerusakan=kerusakan)
+
+    # Ujung bawah/atas perkiraan: rata-rata kedalaman rutting +- galat maksimum sampel kalibrasi DSM (bukan batas)
+    ada_rutting = akumulator.n_rutting > 0
+    rut = [np.where(ada_rutting, np.clip(kerusakan["kedalaman_rutting"] + arah * info_dsm["galat_sampel_cm"], 0, 15),
+                    0.0) for arah in (-1, 1)]
+    batas = [hitung_sdi_batch(kerusakan["persen_retak"], kerusakan["lebar_retak"], kerusakan["jumlah_lubang"], rut[i],
+                              aturan=aturan) for i in (0, 1)]
+    df_sdi["SDI4_Perkiraan_Min"] = batas[0]["SDI4"].round(2).to_numpy()
+    df_sdi["SDI4_Perkiraan_Maks"] = batas[1]["SDI4"].round(2).to_numpy()
+    df_sdi["Kondisi_Stabil"] = batas[0]["Kondisi"].to_numpy() == batas[1]["Kondisi"].to_numpy()
+    seg_gdf = seg_gdf.merge(df_sdi[["Segmen", "SDI4_Perkiraan_Min", "SDI4_Perkiraan_Maks", "Kondisi_Stabil"]], on="Segmen",
+                            how="left")
+
+    ringkasan = {
+        "segmen": len(df_sdi),
+        "kondisi_stabil": float(df_sdi["Kondisi_Stabil"].mean()) if len(df_sdi) else 1.0,
+        "galat_sampel_rutting_cm": round(info_dsm["galat_sampel_cm"], 2),
+        "faktor_turun_dsm": info_dsm["faktor_turun"],
+        "kebersihan_geometri": {**kebersihan, "retak_dilarutkan": akumulator.retak_dilarutkan},
+        "peringatan": peringatan,
+    }
+    return df_sdi, seg_gdf, ringkasan
+
+def jalankan_pipeline(jalan, dsm_path, output_dir, retak=None, pothole=None, rutting=None,
+                      lebar_jalan=3.0, interval_segmen=100, epsg_code=32749, info=None, max_workers_dsm=None,
+                      profiler=None, kolom_rute=None, pratinjau=False, dpi_peta=300, km_per_lembar=2.0,
+                      max_workers_render=None, max_workers_shard=1, batch_kerusakan=None):
+    """Menjalankan seluruh tahapan SDI: baca data -> segmen -> kedalaman DSM -> overlay -> skor -> ekspor.
+
+    Input vektor dapat berupa path file (zip SHP, GPKG, FlatGeobuf, GeoParquet) atau objek upload Streamlit. Seluruh keluaran
+    (peta, grafik, PDF, GPKG, GeoParquet, FlatGeobuf, XLSX) ditulis ke output_dir, lalu path-nya dikembalikan
+    bersama df_sdi dan seg_gdf. kolom_rute (opsional) adalah kolom ID/nama rute pada layer jalan;
+    tiap rute dipotong terpisah dan STA-nya dimulai dari 0. Bila profiler aktif, laporan performa per tahap ikut
+    disimpan sebagai laporan_performa.json. pratinjau=True merender peta dengan dpi rendah tanpa label dan tanpa
+    peta lajur; selain itu rute yang lebih panjang dari km_per_lembar ikut dirender sebagai peta lajur di PDF.
+    max_workers_shard dan batch_kerusakan diteruskan ke hitung_survey.
+    """
+    from sdi_laporan import buat_laporan_pdf
+
+    info = {**INFO_SURVEY_DEFAULT, **(info or {})}
+    profiler = profiler or ProfilerTahap(aktif=False)
+    os.makedirs(output_dir, exist_ok=True)
+
+    df_sdi, seg_gdf = hitung_survey(jalan, dsm_path, retak=retak, pothole=pothole, rutting=rutting, lebar_jalan=lebar_jalan,
+                                    interval_segmen=interval_segmen, epsg_code=epsg_code, kolom_rute=kolom_rute,
+                                    max_workers_dsm=max_workers_dsm, profiler=profiler, max_workers_shard=max_workers_shard,
+                                    batch_kerusakan=batch_kerusakan)
+
+    # 5. EKSPOR HASIL
+    hasil = {
+        "df_sdi": df_sdi,
+        "seg_gdf": seg_gdf,
+        "peta_path": os.path.join(output_dir, "peta_sdi.png"),
+        "grafik_path": os.path.join(output_dir, "grafik_sdi.png"),
+        "pdf_path": os.path.join(output_dir, "Laporan_SDI.pdf"),
+        "gpkg_path": os.path.join(output_dir, "Peta_Hasil_SDI.gpkg"),
+        "geoparquet_path": os.path.join(output_dir, "Peta_Hasil_SDI.parquet"),
+        "fgb_path": os.path.join(output_dir, "Peta_Hasil_SDI.fgb"),
+        "excel_path": os.path.join(output_dir, "Data_SDI.xlsx"),
+        "peta_strip": [],
+    }
+    dpi = 96 if pratinjau else dpi_peta
+    with profiler.tahap("render_peta", segmen=len(seg_gdf)):
+        buat_peta(seg_gdf, hasil["peta_path"], dpi=dpi, label=not pratinjau)
+    if not pratinjau:
+        with profiler.tahap("render_peta_strip", segmen=len(seg_gdf)) as catatan:
+            hasil["peta_strip"] = buat_peta_strip(seg_gdf, os.path.join(output_dir, "peta_strip"), km_per_lembar=km_per_lembar,
+                                                  max_workers=max_workers_render)
+            catatan["lembar"] = len(hasil["peta_strip"])
+    with profiler.tahap("render_grafik"):
+        buat_grafik(seg_gdf, hasil["grafik_path"], dpi=dpi)
+    with profiler.tahap("pdf", segmen=len(seg_gdf)):
+        buat_laporan_pdf(hasil["pdf_path"], df_sdi, seg_gdf, info, interval_segmen, hasil["peta_path"], hasil["grafik_path"],
+                         peta_strip=hasil["peta_strip"])
+    with profiler.tahap("ekspor_gpkg", segmen=len(seg_gdf)):
+        tulis_gpkg(seg_gdf, hasil["gpkg_path"])
+    with profiler.tahap("ekspor_geoparquet", segmen=len(seg_gdf)):
+        tulis_geoparquet(seg_gdf, hasil["geoparquet_path"])
+    with profiler.tahap("ekspor_fgb", segmen=len(seg_gdf)):
+        tulis_flatgeobuf(seg_gdf, hasil["fgb_path"])
+    with profiler.tahap("ekspor_excel", segmen=len(df_sdi)):
+        tulis_excel(df_sdi, hasil["excel_path"])
+
+    if profiler.aktif:
+        hasil["laporan_performa"] = profiler.laporan()
+        hasil["laporan_performa_path"] = profiler.simpan_json(os.path.join(output_dir, "laporan_performa.json"))
+    return hasil
@@ -0,0 +1,107 @@
+"""Instrumentasi ringan per tahap pipeline SDI (durasi, RSS puncak, dan jumlah fitur).
+
+Profiler nonaktif secara default: `tahap()` hanya mengembalikan dict kosong tanpa
+mengukur apa pun, sehingga run produksi tidak menanggung biaya pengukuran.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def rss_mb():
+    """Resident set size proses saat ini dalam MB (Linux: /proc, lainnya: psutil/ru_maxrss bila tersedia)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    if resource is not None:
+        return rss_puncak_proses_mb()
+    return float("nan")
+
+def rss_puncak_proses_mb():
+    """RSS puncak sepanjang umur proses dalam MB"""
+    if resource is None:
+        return float("nan")
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    return maxrss / 1024 ** 2 if os.uname().sysname == "Darwin" else maxrss / 1024
+
+class ProfilerTahap:
+    """Mencatat durasi, RSS awal/akhir/puncak, dan jumlah fitur untuk setiap tahap pipeline.
+
+    RSS puncak per tahap diambil oleh thread sampler yang hanya berjalan selama
+    sebuah tahap sedang diukur (interval default 20 ms). saat_tahap(nama) opsional dipanggil
+    di awal setiap tahap, juga saat profiler nonaktif (dipakai antrean job untuk progres/pembatalan).
+    """
+
+    def __init__(self, aktif=False, interval_sampel=0.02, saat_tahap=None):
+        self.aktif = aktif
+        self.interval_sampel = interval_sampel
+        self.saat_tahap = saat_tahap
+        self.tahap_list = []
+        self._mulai = time.perf_counter()
+
+    @contextmanager
+    def tahap(self, nama, **jumlah):
+        """Context manager untuk satu tahap; dict yang di-yield dapat diisi jumlah fitur tambahan"""
+        catatan = dict(jumlah)
+        if self.saat_tahap is not None:
+            self.saat_tahap(nama)
+        if not self.aktif:
+            yield catatan
+            return
+
+        rss_awal = rss_mb()
+        puncak = [rss_awal]
+        selesai = threading.Event()
+
+        def sampel():
+            while not selesai.wait(self.interval_sampel):
+                puncak[0] = max(puncak[0], rss_mb())
+
+        sampler = threading.Thread(target=sampel, daemon=True)
+        sampler.start()
+        mulai = time.perf_counter()
+        try:
+            yield catatan
+        finally:
+            durasi = time.perf_counter() - mulai
+            selesai.set()
+            sampler.join()
+            rss_akhir = rss_mb()
+            self.tahap_list.append({
+                "tahap": nama,
+                "durasi_s": round(durasi, 4),
+                "rss_awal_mb": round(rss_awal, 1),
+                "rss_akhir_mb": round(rss_akhir, 1),
+                "rss_puncak_mb": round(max(puncak[0], rss_akhir), 1),
+                **catatan,
+            })
+
+    def laporan(self):
+        """Ringkasan seluruh tahap yang tercatat dalam bentuk dict siap JSON"""
+        return {
+            "aktif": self.aktif,
+            "total_tahap_s": round(sum(t["durasi_s"] for t in self.tahap_list), 4),
+            "waktu_dinding_s": round(time.perf_counter() - self._mulai, 4),
+            "rss_puncak_proses_mb": round(rss_puncak_proses_mb(), 1),
+            "tahap": self.tahap_list,
+        }
+
+    def simpan_json(self, path):
+        """Menyimpan laporan performa ke file JSON"""
+        with open(path, "w") as f:
+            json.dump(self.laporan(), f, indent=2, default=str)
+        return path
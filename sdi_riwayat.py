@@ -0,0 +1,245 @@
+"""Riwayat hasil survey SDI dalam satu GeoPackage berindeks untuk kueri tren lintas survey.
+
+Setiap run disimpan sebagai satu baris tabel `survey` (lokasi, tanggal, ringkasan) dan baris-baris
+layer `segmen_sdi` (geometri EPSG:4326 dengan indeks spasial R-tree GeoPackage) yang dikunci oleh
+lokasi, rute, STA awal, dan tanggal survey. Distribusi kondisi per survey dicatat saat disimpan
+(tabel `survey_kondisi`), sehingga tren jaringan tidak perlu memindai seluruh segmen. Kueri tren
+dijalankan langsung lewat sqlite3 memakai indeks atribut; berkas tetap dapat dibuka di QGIS.
+"""
+import os
+import re
+import time
+import sqlite3
+import datetime
+from contextlib import closing
+
+from sdi_impor import modul_lazy
+from sdi_pipeline import INFO_SURVEY_DEFAULT, WARNA_KONDISI, opsi_engine_vektor
+
+pd = modul_lazy("pandas")
+gpd = modul_lazy("geopandas")
+
+# Kosongkan GEOSDI_RIWAYAT untuk menonaktifkan penyimpanan riwayat dari aplikasi
+PATH_RIWAYAT = os.environ.get("GEOSDI_RIWAYAT",
+                              os.path.join(os.path.expanduser("~"), ".local", "share", "geosdi", "riwayat_sdi.gpkg"))
+LAYER_SEGMEN = "segmen_sdi"
+
+# Kolom seg_gdf hasil SDI -> kolom layer riwayat
+KOLOM_SEGMEN = {
+    "Rute": "rute",
+    "Segmen": "segmen",
+    "STA": "sta",
+    "STA_Awal": "sta_awal",
+    "STA_Akhir": "sta_akhir",
+    "%Retak": "persen_retak",
+    "Lebar Retak (mm)": "lebar_retak_mm",
+    "Jumlah Lubang": "jumlah_lubang",
+    "Rutting (cm)": "rutting_cm",
+    "SDI1": "sdi1",
+    "SDI2": "sdi2",
+    "SDI3": "sdi3",
+    "SDI4": "sdi4",
+    "Kondisi": "kondisi",
+}
+
+SKEMA = """
+CREATE TABLE IF NOT EXISTS survey (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT,
+    lokasi TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    tanggal_teks TEXT,
+    surveyor TEXT,
+    instansi TEXT,
+    interval_segmen REAL,
+    jumlah_segmen INTEGER,
+    panjang_km REAL,
+    rata_sdi REAL,
+    dibuat REAL
+);
+CREATE TABLE IF NOT EXISTS survey_kondisi (
+    survey_id INTEGER NOT NULL,
+    kondisi TEXT NOT NULL,
+    jumlah_segmen INTEGER,
+    panjang_km REAL,
+    PRIMARY KEY (survey_id, kondisi)
+);
+CREATE INDEX IF NOT EXISTS idx_survey_lokasi ON survey (lokasi, tanggal, id);
+CREATE INDEX IF NOT EXISTS idx_segmen_kunci ON segmen_sdi (lokasi, rute, sta_awal, tanggal, survey_id);
+CREATE INDEX IF NOT EXISTS idx_segmen_survey ON segmen_sdi (survey_id);
+"""
+
+BULAN = {
+    "januari": 1, "jan": 1, "january": 1,
+    "februari": 2, "feb": 2, "pebruari": 2, "february": 2,
+    "maret": 3, "mar": 3, "march": 3,
+    "april": 4, "apr": 4,
+    "mei": 5, "may": 5,
+    "juni": 6, "jun": 6, "june": 6,
+    "juli": 7, "jul": 7, "july": 7,
+    "agustus": 8, "agu": 8, "agt": 8, "ags": 8, "aug": 8, "august": 8,
+    "september": 9, "sep": 9, "sept": 9,
+    "oktober": 10, "okt": 10, "oct": 10, "october": 10,
+    "november": 11, "nov": 11, "nopember": 11,
+    "desember": 12, "des": 12, "dec": 12, "december": 12,
+}
+
+def parse_tanggal(teks, default=None):
+    """Tanggal survey dari '2026-02-28', '28/02/2026', atau '28 Februari 2026' (default bila tidak dikenali)"""
+    teks = str(teks or "").strip().lower()
+    try:
+        if m := re.fullmatch(r"(\d{4})-(\d{1,2})-(\d{1,2})", teks):
+            return datetime.date(int(m[1]), int(m[2]), int(m[3]))
+        if m := re.fullmatch(r"(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})", teks):
+            return datetime.date(int(m[3]), int(m[2]), int(m[1]))
+        if (m := re.fullmatch(r"(\d{1,2})\s+([a-z]+)\.?\s+(\d{4})", teks)) and m[2] in BULAN:
+            return datetime.date(int(m[3]), BULAN[m[2]], int(m[1]))
+    except ValueError:
+        pass
+    return default
+
+def _koneksi(path):
+    con = sqlite3.connect(path, timeout=30)
+    con.row_factory = sqlite3.Row
+    return con
+
+def riwayat_tersedia(path=None):
+    return os.path.exists(path or PATH_RIWAYAT)
+
+def simpan_riwayat(seg_gdf, info=None, interval_segmen=100, run_id=None, path=None):
+    """Menambahkan satu survey (seg_gdf hasil SDI) ke riwayat dan mengembalikan survey_id.
+
+    Tanggal diambil dari info["tanggal"]; bila tidak dikenali, dipakai tanggal hari ini. Baris survey ditulis
+    lebih dulu dalam satu transaksi (survey_id dialokasikan SQLite, aman untuk beberapa proses penulis), lalu
+    segmen ditambahkan lewat GDAL; bila penulisan segmen gagal, survey beserta segmen yang sempat tertulis dihapus.
+    """
+    path = path or PATH_RIWAYAT
+    info = {**INFO_SURVEY_DEFAULT, **(info or {})}
+    tanggal = parse_tanggal(info["tanggal"], default=datetime.date.today()).isoformat()
+
+    segmen = pd.DataFrame({baru_kolom: seg_gdf[lama].to_numpy() for lama, baru_kolom in KOLOM_SEGMEN.items()})
+    segmen["rute"] = segmen["rute"].astype(str)
+    segmen.insert(0, "survey_id", 0)
+    segmen.insert(1, "lokasi", info["lokasi"])
+    segmen.insert(2, "tanggal", tanggal)
+    segmen_gdf = gpd.GeoDataFrame(segmen, geometry=seg_gdf.geometry.to_crs(4326).values, crs=4326)
+    panjang_km = (segmen["sta_akhir"] - segmen["sta_awal"]) / 1000
+    kondisi = pd.DataFrame({"jumlah_segmen": segmen.groupby("kondisi").size(),
+                            "panjang_km": panjang_km.groupby(segmen["kondisi"]).sum()})
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # GeoPackage dibuat lewat GDAL (layer segmen kosong) agar berkas valid dengan indeks spasial R-tree
+        segmen_gdf.iloc[:0].to_file(path, layer=LAYER_SEGMEN, driver="GPKG", **opsi_engine_vektor())
+
+    with closing(_koneksi(path)) as con, con:
+        con.executescript(SKEMA)
+        survey_id = con.execute(
+            "INSERT INTO survey (run_id, lokasi, tanggal, tanggal_teks, surveyor, instansi, interval_segmen,"
+            " jumlah_segmen, panjang_km, rata_sdi, dibuat) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, info["lokasi"], tanggal, str(info["tanggal"]), info["surveyor"], info["instansi"],
+             float(interval_segmen), len(segmen), float(panjang_km.sum()),
+             float(segmen["sdi4"].mean()) if len(segmen) else None, time.time())).lastrowid
+        con.executemany("INSERT INTO survey_kondisi VALUES (?, ?, ?, ?)",
+                        [(survey_id, k, int(b.jumlah_segmen), float(b.panjang_km)) for k, b in kondisi.iterrows()])
+
+    segmen_gdf["survey_id"] = survey_id
+    try:
+        segmen_gdf.to_file(path, layer=LAYER_SEGMEN, driver="GPKG", mode="a", **opsi_engine_vektor())
+    except BaseException:
+        with closing(_koneksi(path)) as con, con:
+            con.execute("DELETE FROM segmen_sdi WHERE survey_id = ?", (survey_id,))
+            con.execute("DELETE FROM survey_kondisi WHERE survey_id = ?", (survey_id,))
+            con.execute("DELETE FROM survey WHERE id = ?", (survey_id,))
+        raise
+    return survey_id
+
+def _kueri(sql, parameter=(), path=None):
+    path = path or PATH_RIWAYAT
+    if not os.path.exists(path):
+        return pd.DataFrame()
+    with closing(_koneksi(path)) as con:
+        if not con.execute("SELECT 1 FROM sqlite_master WHERE name = 'survey'").fetchone():
+            return pd.DataFrame()
+        return pd.read_sql_query(sql, con, params=parameter)
+
+def daftar_survey(lokasi=None, path=None):
+    """Survey yang tersimpan (terbaru dulu), opsional untuk satu lokasi"""
+    return _kueri("""
+        SELECT id AS survey_id, lokasi, tanggal, surveyor, instansi, jumlah_segmen, panjang_km, rata_sdi, run_id
+        FROM survey WHERE (:lokasi IS NULL OR lokasi = :lokasi)
+        ORDER BY tanggal DESC, id DESC
+    """, {"lokasi": lokasi}, path)
+
+def distribusi_kondisi(lokasi=None, path=None):
+    """Distribusi kondisi dari waktu ke waktu (format panjang: periode, kondisi, jumlah_segmen, panjang_km).
+
+    Untuk satu lokasi, periode adalah tanggal setiap survey. Tanpa lokasi (seluruh jaringan), periode adalah
+    tahun dan setiap lokasi diwakili survey terakhirnya pada tahun tersebut.
+    """
+    if lokasi is not None:
+        return _kueri("""
+            SELECT v.tanggal AS periode, k.kondisi, k.jumlah_segmen, k.panjang_km
+            FROM survey v JOIN survey_kondisi k ON k.survey_id = v.id
+            WHERE v.lokasi = :lokasi ORDER BY v.tanggal, v.id
+        """, {"lokasi": lokasi}, path)
+    return _kueri("""
+        WITH terpilih AS (
+            SELECT v.id, substr(v.tanggal, 1, 4) AS tahun FROM survey v
+            WHERE v.id = (SELECT w.id FROM survey w WHERE w.lokasi = v.lokasi
+                          AND substr(w.tanggal, 1, 4) = substr(v.tanggal, 1, 4)
+                          ORDER BY w.tanggal DESC, w.id DESC LIMIT 1)
+        )
+        SELECT t.tahun AS periode, k.kondisi, SUM(k.jumlah_segmen) AS jumlah_segmen, SUM(k.panjang_km) AS panjang_km
+        FROM terpilih t JOIN survey_kondisi k ON k.survey_id = t.id
+        GROUP BY t.tahun, k.kondisi ORDER BY t.tahun
+    """, {}, path)
+
+def tabel_distribusi(df_distribusi, nilai="panjang_km"):
+    """Pivot distribusi_kondisi menjadi periode x kondisi (urutan kolom mengikuti WARNA_KONDISI)"""
+    if df_distribusi.empty:
+        return pd.DataFrame(columns=list(WARNA_KONDISI))
+    return df_distribusi.pivot_table(index="periode", columns="kondisi", values=nilai, aggfunc="sum", fill_value=0) \
+        .reindex(columns=list(WARNA_KONDISI), fill_value=0)
+
+def survey_terakhir(lokasi=None, path=None):
+    """survey_id terakhir setiap lokasi (atau satu lokasi)"""
+    df = _kueri("""
+        SELECT v.id AS survey_id FROM survey v
+        WHERE (:lokasi IS NULL OR v.lokasi = :lokasi)
+          AND v.id = (SELECT w.id FROM survey w WHERE w.lokasi = v.lokasi ORDER BY w.tanggal DESC, w.id DESC LIMIT 1)
+    """, {"lokasi": lokasi}, path)
+    return df["survey_id"].tolist() if not df.empty else []
+
+def segmen_memburuk(ambang=50, lokasi=None, survey_id=None, path=None):
+    """Segmen yang SDI4-nya naik lebih dari ambang dibanding pengamatan sebelumnya pada lokasi, rute, dan STA yang sama.
+
+    Dihitung untuk survey_id, atau survey terakhir setiap lokasi (opsional dibatasi satu lokasi). Segmen acuan
+    diambil lewat indeks survey_id dan pengamatan sebelumnya dicari per segmen lewat indeks
+    (lokasi, rute, sta_awal, tanggal), sehingga waktu kueri tidak bergantung pada jumlah survey yang tersimpan.
+    """
+    acuan = [survey_id] if survey_id is not None else survey_terakhir(lokasi, path)
+    if not acuan:
+        return pd.DataFrame()
+    return _kueri(f"""
+        SELECT q.lokasi, q.rute, q.segmen, q.sta, p.tanggal AS tanggal_sebelum, p.sdi4 AS sdi4_sebelum,
+               p.kondisi AS kondisi_sebelum, q.tanggal, q.sdi4, q.kondisi, q.sdi4 - p.sdi4 AS kenaikan_sdi4
+        FROM (
+            SELECT s.*,
+                   (SELECT p.fid FROM segmen_sdi p
+                    WHERE p.lokasi = s.lokasi AND p.rute = s.rute AND p.sta_awal = s.sta_awal
+                      AND (p.tanggal < s.tanggal OR (p.tanggal = s.tanggal AND p.survey_id < s.survey_id))
+                    ORDER BY p.tanggal DESC, p.survey_id DESC LIMIT 1) AS fid_sebelum
+            FROM segmen_sdi s WHERE s.survey_id IN ({", ".join("?" * len(acuan))})
+        ) q JOIN segmen_sdi p ON p.fid = q.fid_sebelum
+        WHERE q.sdi4 - p.sdi4 > ?
+        ORDER BY kenaikan_sdi4 DESC
+    """, [*map(int, acuan), ambang], path)
+
+def riwayat_segmen(lokasi, rute, sta_awal, path=None):
+    """Nilai SDI satu segmen (lokasi, rute, STA awal) pada setiap survey, urut tanggal"""
+    return _kueri("""
+        SELECT tanggal, survey_id, sdi4, kondisi, persen_retak, jumlah_lubang, rutting_cm
+        FROM segmen_sdi WHERE lokasi = :lokasi AND rute = :rute AND sta_awal = :sta_awal
+        ORDER BY tanggal, survey_id
+    """, {"lokasi": lokasi, "rute": str(rute), "sta_awal": float(sta_awal)}, path)
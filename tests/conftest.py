@@ -0,0 +1,40 @@
+"""Fixture bersama: koridor & layer kerusakan sintetis (generator yang sama dengan benchmarks/data_sintetis)."""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import geopandas as gpd
+import shapely
+
+from benchmarks.data_sintetis import EPSG_SINTETIS, buat_as_jalan, buat_layer_kerusakan, siapkan_data_sintetis
+from sdi_pipeline import buat_segmen
+
+def buang_tumpang_tindih(gdf):
+    """Membuang retak yang bertampalan dengan retak lain (tidak terpengaruh pelarutan tumpang tindih)"""
+    kiri, kanan = gdf.sindex.query(gdf.geometry.values, predicate="intersects")
+    bertampalan = np.unique(np.r_[kiri[kiri != kanan], kanan[kiri != kanan]])
+    return gdf.drop(index=gdf.index[bertampalan]).reset_index(drop=True)
+
+@pytest.fixture(scope="session")
+def koridor_sintetis():
+    """Koridor 1 km bersegmen 10 m (100 segmen) dengan retak (tanpa tumpang tindih), lubang, dan rutting berkedalaman"""
+    as_jalan = buat_as_jalan(1.0)
+    seg_gdf = buat_segmen(gpd.GeoDataFrame(geometry=[as_jalan], crs=EPSG_SINTETIS), 10, 3.0, EPSG_SINTETIS)
+    retak, pothole, rutting = buat_layer_kerusakan(as_jalan, 800, 150, 300, seed=1)
+    rutting["kedalaman_calc"] = np.random.default_rng(1).uniform(0, 5, len(rutting))
+    return seg_gdf, buang_tumpang_tindih(retak), pothole, rutting
+
+@pytest.fixture(scope="session")
+def data_survey(tmp_path_factory):
+    """Input survey sintetis di disk (zip shapefile jalan 2 km, 1.500 fitur per layer, DSM 2 MB)"""
+    paths, _ = siapkan_data_sintetis(tmp_path_factory.mktemp("survey"), 2.0, 1500, 2)
+    return paths
+
+def kosong(crs=EPSG_SINTETIS):
+    return gpd.GeoDataFrame(geometry=shapely.points(np.empty((0, 2))), crs=crs)
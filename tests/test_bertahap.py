@@ -0,0 +1,84 @@
+"""Mode streaming (hitung_kerusakan_bertahap / AkumulatorKerusakan) dibandingkan dengan jalur di memori."""
+import numpy as np
+import pytest
+import shapely
+from pandas.testing import assert_frame_equal
+
+import geopandas as gpd
+import sdi_pipeline
+from benchmarks.data_sintetis import buat_as_jalan, buat_layer_detektor
+from conftest import buang_tumpang_tindih
+from sdi_pipeline import (baca_layer_bertahap, baca_layer_kerusakan, baca_layer_vektor, bersihkan_geometri, buat_segmen,
+                          hitung_depth_cm, hitung_kerusakan_bertahap, hitung_kerusakan_segmen, hitung_survey)
+
+@pytest.fixture(scope="module")
+def segmen(data_survey):
+    return buat_segmen(baca_layer_vektor(data_survey["jalan"]), 5, 3.0, 32749)
+
+def _di_memori(seg_gdf, retak, pothole, rutting, dsm_path):
+    layer = [bersihkan_geometri(baca_layer_kerusakan(sumber, seg_gdf.crs))[0] for sumber in (retak, pothole, rutting)]
+    layer[2] = hitung_depth_cm(layer[2], dsm_path, max_workers=1)
+    return hitung_kerusakan_segmen(seg_gdf, *layer)
+
+@pytest.mark.parametrize("ukuran_batch", [40, 250])
+def test_bertahap_setara_tanpa_tumpang_tindih(data_survey, segmen, tmp_path, ukuran_batch):
+    """Tanpa retak bertampalan, hasil streaming sama dengan di memori walau retak yang melintasi batas segmen
+    dan rutting di segmen yang sama tersebar di banyak batch (hanya urutan penjumlahan yang berbeda)"""
+    retak = tmp_path / "retak.gpkg"
+    buang_tumpang_tindih(baca_layer_kerusakan(data_survey["retak"], segmen.crs)).to_file(retak)
+    argumen = (segmen, str(retak), data_survey["pothole"], data_survey["rutting"], data_survey["dsm"])
+
+    catatan = {}
+    bertahap = hitung_kerusakan_bertahap(*argumen, ukuran_batch=ukuran_batch, max_workers_dsm=1, catatan=catatan)
+    assert catatan["batch"] > 3
+    assert_frame_equal(bertahap, _di_memori(*argumen), check_dtype=False, rtol=1e-9, atol=1e-12)
+
+def test_bertahap_tumpang_tindih_antar_batch(data_survey, segmen, tmp_path):
+    """Deteksi ganda ada di akhir layer (batch lain dari retak aslinya), sehingga luasnya tidak dilarutkan:
+    %Retak streaming tidak pernah lebih kecil, dan kelebihannya paling besar luas irisan retak per segmen"""
+    as_jalan = buat_as_jalan(2.0)
+    retak, _ = buat_layer_detektor(as_jalan, 1500, 0, seed=0)
+    path = tmp_path / "retak_detektor.gpkg"
+    retak.to_file(path)
+    argumen = (segmen, str(path), data_survey["pothole"], data_survey["rutting"], data_survey["dsm"])
+
+    di_memori = _di_memori(*argumen)
+    bertahap = hitung_kerusakan_bertahap(*argumen, ukuran_batch=500, max_workers_dsm=1)
+    satu_batch = hitung_kerusakan_bertahap(*argumen, ukuran_batch=len(retak), max_workers_dsm=1)
+    assert_frame_equal(satu_batch, di_memori, check_dtype=False, rtol=1e-9, atol=1e-12)
+    assert_frame_equal(bertahap[["Segmen", "jumlah_lubang", "kedalaman_rutting"]],
+                       di_memori[["Segmen", "jumlah_lubang", "kedalaman_rutting"]], check_dtype=False, rtol=1e-9)
+
+    # Batas atas kelebihan luas: jumlah luas irisan antar potongan retak di segmen yang sama
+    potongan = gpd.overlay(bersihkan_geometri(retak)[0][["geometry"]], segmen[["Segmen", "geometry"]],
+                           how="intersection")
+    kiri, kanan = potongan.sindex.query(potongan.geometry.values, predicate="intersects")
+    pilih = (kiri < kanan) & (potongan["Segmen"].to_numpy()[kiri] == potongan["Segmen"].to_numpy()[kanan])
+    irisan = shapely.area(shapely.intersection(potongan.geometry.values[kiri[pilih]], potongan.geometry.values[kanan[pilih]]))
+    batas = np.bincount(segmen["Segmen"].searchsorted(potongan["Segmen"].to_numpy()[kiri[pilih]]), weights=irisan,
+                        minlength=len(segmen))
+
+    luas_seg = segmen["Luas_Segmen"].to_numpy()
+    luas_retak = di_memori["persen_retak"].to_numpy() / 100 * luas_seg
+    lebih = bertahap["persen_retak"].to_numpy() / 100 * luas_seg - luas_retak
+    # Union GEOS pada segitiga sliver sisa perbaikan bowtie dapat menggeser luas hingga ~1% (snap-rounding)
+    galat_union = 0.01 * luas_retak + 1e-9
+    assert (lebih > galat_union).any()
+    assert (lebih >= -galat_union).all()
+    assert (lebih <= batas + galat_union).all()
+
+def test_hitung_survey_streaming_sama_dengan_di_memori(data_survey):
+    argumen = dict(jalan=data_survey["jalan"], dsm_path=data_survey["dsm"], pothole=data_survey["pothole"],
+                   rutting=data_survey["rutting"], interval_segmen=5)
+    di_memori, _ = hitung_survey(**argumen)
+    streaming, _ = hitung_survey(**argumen, batch_kerusakan=100)
+    assert_frame_equal(streaming, di_memori, check_dtype=False, atol=0.01)
+
+@pytest.mark.parametrize("opsi", [{"engine": "pyogrio"}, {"engine": "pyogrio", "use_arrow": True}])
+def test_baca_layer_bertahap_tanpa_arrow(data_survey, monkeypatch, opsi):
+    """Tanpa pyarrow, batch dibaca lewat rows= dengan urutan dan isi yang sama dengan baca_layer_vektor"""
+    monkeypatch.setattr(sdi_pipeline, "opsi_engine_vektor", lambda: opsi)
+    batch = list(baca_layer_bertahap(data_survey["retak"], 32749, ukuran_batch=400))
+    assert [len(b) for b in batch] == [400, 400, 400, 300]
+    utuh = baca_layer_kerusakan(data_survey["retak"], 32749)
+    assert shapely.equals_exact(np.concatenate([b.geometry.values for b in batch]), utuh.geometry.values, 0).all()
@@ -0,0 +1,62 @@
+"""Tahap kebersihan geometri: retak bertampalan dihitung sekali, bowtie diperbaiki, multipart dipecah."""
+import geopandas as gpd
+import pytest
+import shapely
+
+from sdi_pipeline import bersihkan_geometri, buat_segmen, hitung_kerusakan_segmen, hitung_survey
+
+EPSG = 32749
+
+def _layer_retak():
+    """Satu segmen 100 m x 3 m dengan dua retak bertampalan, satu bowtie, satu multipart, dan satu geometri kosong"""
+    geoms = [
+        shapely.box(10, 0, 12, 0.01),                                             # A
+        shapely.box(11, 0, 13, 0.01),                                             # B, bertampalan 1 m dengan A
+        shapely.Polygon([(20, 0), (22, 0.02), (22, 0), (20, 0.02), (20, 0)]),     # bowtie -> dua segitiga
+        shapely.MultiPolygon([shapely.box(30, 0, 31, 0.005), shapely.box(40, 0, 41, 0.005)]),
+        None,
+    ]
+    return gpd.GeoDataFrame({"id": range(len(geoms))}, geometry=geoms, crs=EPSG)
+
+def _jalan():
+    return gpd.GeoDataFrame(geometry=[shapely.LineString([(0, 0), (100, 0)])], crs=EPSG)
+
+# Setelah dibersihkan & dilarutkan: A u B = 3 m x 1 cm, dua segitiga (alas 2 cm, tinggi 1 m), dua persegi 1 m x 5 mm
+LUAS_RETAK = 0.03 + 2 * 0.01 + 2 * 0.005
+RASIO = [0.03 / 6.02] + [0.01 / (0.02 + 2 * (1 + 0.01 ** 2) ** 0.5)] * 2 + [0.005 / 2.01] * 2
+PERSEN_RETAK = LUAS_RETAK / 300 * 100
+LEBAR_RETAK_MM = sum(RASIO) / len(RASIO) * 1000
+
+def test_bersihkan_geometri_hitungan():
+    bersih, jumlah = bersihkan_geometri(_layer_retak())
+    assert jumlah["fitur_awal"] == 5
+    assert jumlah["kosong"] == 1
+    assert jumlah["diperbaiki"] == 1
+    assert jumlah["multipart"] == 2          # bowtie hasil perbaikan + MultiPolygon
+    assert jumlah["fitur_akhir"] == len(bersih) == 6
+    assert shapely.is_valid(bersih.geometry.values).all()
+    assert (bersih.geometry.geom_type == "Polygon").all()
+    assert sorted(bersih["id"]) == [0, 1, 2, 2, 3, 3]
+
+def test_retak_bertampalan_dihitung_sekali():
+    seg_gdf = buat_segmen(_jalan(), 100, 3.0, EPSG)
+    assert seg_gdf["Luas_Segmen"].tolist() == pytest.approx([300.0])
+    bersih, _ = bersihkan_geometri(_layer_retak())
+    kosong = gpd.GeoDataFrame(geometry=[], crs=EPSG)
+    catatan = {}
+    kerusakan = hitung_kerusakan_segmen(seg_gdf, bersih, kosong, kosong.assign(kedalaman_calc=[]), catatan=catatan)
+    assert catatan["retak_dilarutkan"] == 2
+    assert kerusakan["persen_retak"].tolist() == pytest.approx([PERSEN_RETAK], rel=1e-9)
+    assert kerusakan["lebar_retak"].tolist() == pytest.approx([LEBAR_RETAK_MM], rel=1e-9)
+
+def test_hitung_survey_membersihkan_layer(tmp_path):
+    """Jalur lengkap dari file: layer mentah (bowtie, multipart, tumpang tindih) dibersihkan sebelum overlay"""
+    jalan, retak = tmp_path / "jalan.gpkg", tmp_path / "retak.gpkg"
+    _jalan().to_file(jalan)
+    _layer_retak().to_file(retak)
+    df_sdi, _ = hitung_survey(str(jalan), str(tmp_path / "dsm.tif"), retak=str(retak), interval_segmen=100,
+                              epsg_code=EPSG)
+    assert df_sdi["%Retak"].tolist() == [round(PERSEN_RETAK, 2)]
+    assert df_sdi["Lebar Retak (mm)"].tolist() == [round(LEBAR_RETAK_MM, 2)]
+    assert df_sdi["SDI1"].tolist() == [5]        # 0 < %Retak < 10
+    assert df_sdi["SDI2"].tolist() == [10]       # lebar retak > 3 mm: SDI1 x 2
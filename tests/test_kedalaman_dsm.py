@@ -0,0 +1,67 @@
+"""hitung_depth_cm (jendela piksel per rutting) setara dengan zonal_stats rasterstats yang digantikannya."""
+import numpy as np
+import pytest
+import rasterio
+import shapely
+from rasterio.transform import from_origin
+
+import geopandas as gpd
+from sdi_pipeline import hitung_depth_cm
+
+NODATA = -9999.0
+
+def kedalaman_zonal(gdf, dsm_path, buffer_distance=0.3):
+    """Acuan: dua panggilan zonal_stats (persentil 10 lubang, median ring) seperti jalur lama app.py"""
+    zonal_stats = pytest.importorskip("rasterstats").zonal_stats
+    with rasterio.open(dsm_path) as DSM:
+        nodata_val = DSM.nodata
+    ring_geom = gdf.geometry.buffer(buffer_distance).difference(gdf.geometry)
+    stats_hole = zonal_stats(gdf.geometry, dsm_path, stats=["percentile_10"], nodata=nodata_val)
+    stats_ring = zonal_stats(ring_geom, dsm_path, stats=["median"], nodata=nodata_val)
+    depth = []
+    for hole, ring in zip(stats_hole, stats_ring):
+        z_min, z_ref = hole["percentile_10"], ring["median"]
+        depth.append(max(0, min((z_ref - z_min) * 100 if z_min is not None and z_ref is not None else 0, 15)))
+    return np.array(depth)
+
+def tulis_dsm(path, transform, data):
+    with rasterio.open(path, "w", driver="GTiff", width=data.shape[1], height=data.shape[0], count=1,
+                       dtype="float32", crs="EPSG:32749", transform=transform, nodata=NODATA) as dst:
+        dst.write(data, 1)
+
+@pytest.fixture(scope="module")
+def dsm_rutting(tmp_path_factory):
+    """DSM 20 x 10 m (5 cm/piksel) bergelombang dengan cekungan dan piksel nodata, serta 60 rutting acak
+    (sebagian terpotong tepi raster, satu di luar raster)"""
+    rng = np.random.default_rng(3)
+    x0, y0, res = 500_000.0, 9_200_010.0, 0.05
+    tinggi, lebar = 200, 400
+    yy, xx = np.mgrid[0:tinggi, 0:lebar]
+    data = (100 + 0.02 * np.sin(xx / 17) + 0.01 * np.cos(yy / 11) + rng.normal(0, 0.003, (tinggi, lebar))).astype("float32")
+    pusat = rng.uniform([x0, y0 - 10], [x0 + 20, y0], (60, 2))
+    for cx, cy in pusat[:40]:
+        d2 = (x0 + (xx + 0.5) * res - cx) ** 2 + (y0 - (yy + 0.5) * res - cy) ** 2
+        data -= (rng.uniform(0.005, 0.2) * np.exp(-d2 / 0.05)).astype("float32")
+    data[rng.random((tinggi, lebar)) < 0.02] = NODATA
+    data[:20, :30] = NODATA
+    path = tmp_path_factory.mktemp("dsm") / "dsm.tif"
+    tulis_dsm(path, from_origin(x0, y0, res, res), data)
+
+    geoms = list(shapely.buffer(shapely.points(pusat), rng.uniform(0.1, 0.6, len(pusat))))
+    geoms.append(shapely.box(x0 - 5, y0 - 5, x0 - 4, y0 - 4))
+    return gpd.GeoDataFrame(geometry=geoms, crs=32749), str(path), data
+
+@pytest.mark.parametrize("max_workers", [1, 3])
+def test_setara_zonal_stats(dsm_rutting, max_workers):
+    gdf, path, _ = dsm_rutting
+    hasil = hitung_depth_cm(gdf, path, max_workers=max_workers)["kedalaman_calc"].to_numpy()
+    acuan = kedalaman_zonal(gdf, path)
+    assert (acuan > 0).sum() > 20 and (acuan == 15).any()
+    np.testing.assert_allclose(hasil, acuan, rtol=0, atol=1e-9)
+
+def test_dsm_tidak_north_up_ditolak(dsm_rutting, tmp_path):
+    gdf, _, data = dsm_rutting
+    path = tmp_path / "dsm_selatan.tif"
+    tulis_dsm(path, rasterio.Affine(0.05, 0, 500_000.0, 0, 0.05, 9_200_000.0), data[::-1])
+    with pytest.raises(ValueError, match="north-up"):
+        hitung_depth_cm(gdf, str(path), max_workers=1)
@@ -0,0 +1,71 @@
+"""hitung_kerusakan_segmen (satu overlay per layer) setara dengan loop overlay per segmen yang digantikannya."""
+import geopandas as gpd
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from conftest import kosong
+from sdi_pipeline import hitung_kerusakan_segmen
+
+def kerusakan_loop(seg_gdf, gdf_retak, gdf_pothole, gdf_rutting):
+    """Acuan: loop iterrows dengan satu overlay/sjoin per segmen (jalur lama app.py)"""
+    hasil = []
+    for _, seg in seg_gdf.iterrows():
+        seg_poly = gpd.GeoDataFrame(geometry=[seg.geometry], crs=seg_gdf.crs)
+        luas_seg = seg["Luas_Segmen"]
+
+        persen_retak = 0.0
+        lebar_retak = 0.0
+        if not gdf_retak.empty:
+            retak_seg = gpd.overlay(gdf_retak, seg_poly, how="intersection")
+            if not retak_seg.empty:
+                luas_retak = retak_seg.geometry.area.sum()
+                persen_retak = (luas_retak / luas_seg) * 100 if luas_seg > 0 else 0
+                lengths = retak_seg.geometry.length
+                valid_lengths = lengths[lengths > 0]
+                if len(valid_lengths) > 0:
+                    retak_seg.loc[lengths > 0, "lebar_calc"] = retak_seg.geometry.area / valid_lengths
+                    lebar_retak = retak_seg["lebar_calc"].mean() * 1000
+
+        jumlah_lubang = 0
+        if not gdf_pothole.empty:
+            jumlah_lubang = len(gpd.sjoin(gdf_pothole, seg_poly, predicate="within"))
+
+        kedalaman_rutting = 0.0
+        if not gdf_rutting.empty:
+            rutting_seg = gpd.overlay(gdf_rutting, seg_poly, how="intersection")
+            if not rutting_seg.empty:
+                kedalaman_rutting = rutting_seg["kedalaman_calc"].mean()
+        kedalaman_rutting = 0 if pd.isna(kedalaman_rutting) else kedalaman_rutting
+
+        hasil.append({"Segmen": seg["Segmen"], "persen_retak": float(persen_retak), "lebar_retak": float(lebar_retak),
+                      "jumlah_lubang": int(jumlah_lubang), "kedalaman_rutting": float(kedalaman_rutting)})
+    return pd.DataFrame(hasil)
+
+def _banding(seg_gdf, *layer):
+    vektor = hitung_kerusakan_segmen(seg_gdf, *layer)
+    acuan = kerusakan_loop(seg_gdf, *layer)
+    assert_frame_equal(vektor, acuan, check_dtype=False, check_names=False, rtol=1e-9, atol=1e-12)
+
+def test_setara_loop_per_segmen(koridor_sintetis):
+    seg_gdf, retak, pothole, rutting = koridor_sintetis
+    _banding(seg_gdf, retak, pothole, rutting)
+
+def test_setara_loop_layer_kosong(koridor_sintetis):
+    seg_gdf, retak, _, rutting = koridor_sintetis
+    _banding(seg_gdf, kosong(), kosong(), kosong().assign(kedalaman_calc=[]))
+    _banding(seg_gdf, retak, kosong(), rutting)
+
+@pytest.mark.parametrize("langkah", [7, 50])
+def test_setara_loop_layer_jarang(koridor_sintetis, langkah):
+    """Sebagian besar segmen tanpa kerusakan (reindex & fill_value per layer)"""
+    seg_gdf, retak, pothole, rutting = koridor_sintetis
+    _banding(seg_gdf, retak.iloc[::langkah], pothole.iloc[::langkah], rutting.iloc[::langkah])
+
+def test_atribut_segmen_pada_layer_diabaikan(koridor_sintetis):
+    """Kolom pengguna bernama Segmen pada layer kerusakan tidak bentrok dengan kolom Segmen hasil overlay"""
+    seg_gdf, retak, pothole, rutting = koridor_sintetis
+    biasa = hitung_kerusakan_segmen(seg_gdf, retak, pothole, rutting)
+    bentrok = hitung_kerusakan_segmen(seg_gdf, retak.assign(Segmen=-1), pothole.assign(Segmen=-1),
+                                      rutting.assign(Segmen=-1))
+    assert_frame_equal(biasa, bentrok)
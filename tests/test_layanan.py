@@ -0,0 +1,62 @@
+"""Layanan skor lokal: skor inkremental setelah tambah/hapus fitur sama dengan hitung_survey dari fitur yang sama."""
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+
+import sdi_layanan
+from sdi_layanan import LAYER_KERUSAKAN, GalatLayanan, KlienLokal, tangani
+from sdi_pipeline import hitung_survey
+
+INTERVAL = 20
+
+@pytest.fixture
+def klien(data_survey):
+    klien = KlienLokal()
+    klien.muat_koridor("uji", data_survey["jalan"], data_survey["dsm"], retak=data_survey["retak"],
+                       pothole=data_survey["pothole"], rutting=data_survey["rutting"], interval_segmen=INTERVAL)
+    yield klien
+    klien.layanan.tutup()
+
+def test_tambah_hapus_sama_dengan_hitung_survey(klien, data_survey, tmp_path):
+    koridor = klien.layanan.koridor("uji")
+    rng = np.random.default_rng(0)
+    for layer in LAYER_KERUSAKAN:
+        sumber = koridor.layer_gdf(layer)
+        fitur = sumber.iloc[rng.choice(len(sumber), 20, replace=False)][[sumber.geometry.name]]
+        fitur = fitur.set_geometry(fitur.geometry.translate(rng.uniform(-30, 30), rng.uniform(-0.5, 0.5)))
+        hasil = klien.tambah_fitur("uji", layer, fitur)
+        assert len(hasil["id"]) == 20 and hasil["segmen"]
+        # Sebagian fitur lama dan sebagian fitur yang baru ditambahkan dihapus lagi
+        hapus = rng.choice(len(sumber), 15, replace=False).tolist() + hasil["id"][:5]
+        klien.hapus_fitur("uji", layer, hapus)
+        assert len(koridor.fitur[layer]) == len(sumber)  # 20 ditambah, 20 dihapus
+
+    path = {}
+    for layer in LAYER_KERUSAKAN:
+        path[layer] = str(tmp_path / f"{layer}.gpkg")
+        gdf = koridor.layer_gdf(layer)
+        gdf[[gdf.geometry.name]].to_file(path[layer])
+    penuh, _ = hitung_survey(data_survey["jalan"], data_survey["dsm"], interval_segmen=INTERVAL, **path)
+    assert_frame_equal(klien.layanan.skor("uji"), penuh, check_dtype=False)
+
+def test_koridor_tidak_dimuat_404(klien):
+    with pytest.raises(GalatLayanan) as galat:
+        klien.skor("tidak_ada")
+    assert galat.value.status == 404
+    assert "belum dimuat" in galat.value.pesan
+    assert tangani(klien.layanan, "DELETE", "/koridor/tidak_ada")[0] == 404
+    assert tangani(klien.layanan, "GET", "/rute/lain")[0] == 404
+
+def test_payload_tidak_valid_400(klien):
+    assert tangani(klien.layanan, "POST", "/koridor/uji/hapus", {"layer": "jembatan", "id": [0]})[0] == 400
+    assert tangani(klien.layanan, "POST", "/koridor/uji/hapus", {"layer": "retak", "id": [10 ** 9]})[0] == 400
+
+def test_keyerror_perhitungan_bukan_404(klien, monkeypatch):
+    """KeyError dari dalam perhitungan adalah galat server, bukan koridor yang tidak ditemukan"""
+    def rusak(self, posisi):
+        raise KeyError("kedalaman_calc")
+
+    monkeypatch.setattr(sdi_layanan.Koridor, "hitung_ulang", rusak)
+    status, isi = tangani(klien.layanan, "POST", "/koridor/uji/hapus", {"layer": "retak", "id": [0]})
+    assert status == 500
+    assert isi["error"].startswith("KeyError")
@@ -0,0 +1,40 @@
+"""Pratinjau perkiraan: rentang SDI4_Perkiraan_Min - SDI4_Perkiraan_Maks memuat SDI4 run presisi."""
+import geopandas as gpd
+import numpy as np
+import pytest
+import shapely
+from pandas.testing import assert_frame_equal
+
+from benchmarks.data_sintetis import EPSG_SINTETIS, buat_as_jalan, buat_layer_kerusakan, tulis_dsm, tulis_zip_shapefile
+from sdi_pipeline import hitung_survey, hitung_survey_perkiraan
+
+@pytest.fixture(scope="module")
+def survey_kecil(tmp_path_factory):
+    """Koridor 0,5 km dengan 80 rutting (tidak lebih dari sampel kalibrasi, sehingga galat sampel mencakup setiap
+    rutting) dan retak bersudut bulat bervertex rapat"""
+    folder = tmp_path_factory.mktemp("pratinjau")
+    as_jalan = buat_as_jalan(0.5)
+    retak, pothole, rutting = buat_layer_kerusakan(as_jalan, 400, 200, 80, seed=4)
+    retak = retak.set_geometry(shapely.segmentize(shapely.buffer(retak.geometry.values, 0.001, quad_segs=8), 0.005))
+    paths = {"dsm": str(folder / "dsm.tif")}
+    for nama, gdf in (("jalan", gpd.GeoDataFrame(geometry=[as_jalan], crs=EPSG_SINTETIS)), ("retak", retak),
+                      ("pothole", pothole), ("rutting", rutting)):
+        paths[nama] = tulis_zip_shapefile(gdf, str(folder / f"{nama}.zip"))
+    tulis_dsm(paths["dsm"], as_jalan, 1)
+    return paths
+
+def test_rentang_memuat_sdi_presisi(survey_kecil):
+    argumen = dict(jalan=survey_kecil["jalan"], dsm_path=survey_kecil["dsm"], retak=survey_kecil["retak"],
+                   pothole=survey_kecil["pothole"], rutting=survey_kecil["rutting"], interval_segmen=20)
+    kira, _, ringkasan = hitung_survey_perkiraan(**argumen)
+    persis, _ = hitung_survey(**argumen)
+
+    assert len(kira) == len(persis) > 20 and ringkasan["galat_sampel_rutting_cm"] > 0
+    assert (kira["SDI4_Perkiraan_Min"] < kira["SDI4_Perkiraan_Maks"]).any()
+    assert (kira["SDI4_Perkiraan_Min"] <= persis["SDI4"]).all()
+    assert (persis["SDI4"] <= kira["SDI4_Perkiraan_Maks"]).all()
+    stabil = kira["Kondisi_Stabil"].to_numpy()
+    assert (kira["Kondisi"][stabil] == persis["Kondisi"][stabil]).all()
+    # Retak dan lubang memakai layer bersih yang sama dengan run presisi: hanya komponen rutting yang diperkirakan
+    kolom = ["Segmen", "%Retak", "Lebar Retak (mm)", "Jumlah Lubang", "SDI1", "SDI2", "SDI3"]
+    assert_frame_equal(kira[kolom], persis[kolom], check_dtype=False, atol=0.01)
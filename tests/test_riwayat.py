@@ -0,0 +1,36 @@
+"""Riwayat multi-survey: survey_id dialokasikan SQLite dan penulisan segmen yang gagal tidak meninggalkan survey."""
+import geopandas as gpd
+import pytest
+
+import sdi_riwayat
+from sdi_pipeline import hitung_tabel_sdi
+
+@pytest.fixture(scope="module")
+def seg_sdi(koridor_sintetis):
+    seg_gdf, retak, pothole, rutting = koridor_sintetis
+    return hitung_tabel_sdi(seg_gdf, retak, pothole, rutting)[1]
+
+def test_simpan_berurutan(seg_sdi, tmp_path):
+    path = str(tmp_path / "riwayat.gpkg")
+    pertama = sdi_riwayat.simpan_riwayat(seg_sdi, info={"lokasi": "A", "tanggal": "2025-01-10"}, path=path)
+    kedua = sdi_riwayat.simpan_riwayat(seg_sdi, info={"lokasi": "A", "tanggal": "10 Januari 2026"}, path=path)
+    assert (pertama, kedua) == (1, 2)
+    survey = sdi_riwayat.daftar_survey("A", path=path)
+    assert survey["survey_id"].tolist() == [2, 1] and (survey["jumlah_segmen"] == len(seg_sdi)).all()
+    assert len(sdi_riwayat.riwayat_segmen("A", seg_sdi["Rute"].iloc[0], 0.0, path=path)) == 2
+    assert len(gpd.read_file(path, layer=sdi_riwayat.LAYER_SEGMEN)) == 2 * len(seg_sdi)
+
+def test_segmen_gagal_tidak_meninggalkan_survey(seg_sdi, tmp_path, monkeypatch):
+    path = str(tmp_path / "riwayat.gpkg")
+    sdi_riwayat.simpan_riwayat(seg_sdi, info={"lokasi": "A", "tanggal": "2025-01-10"}, path=path)
+
+    def gagal(self, *args, **kwargs):
+        raise OSError("disk penuh")
+    monkeypatch.setattr(gpd.GeoDataFrame, "to_file", gagal)
+    with pytest.raises(OSError):
+        sdi_riwayat.simpan_riwayat(seg_sdi, info={"lokasi": "A", "tanggal": "2026-01-10"}, path=path)
+    monkeypatch.undo()
+
+    assert sdi_riwayat.daftar_survey(path=path)["survey_id"].tolist() == [1]
+    assert sdi_riwayat.distribusi_kondisi("A", path=path)["periode"].unique().tolist() == ["2025-01-10"]
+    assert sdi_riwayat.simpan_riwayat(seg_sdi, info={"lokasi": "A", "tanggal": "2026-01-10"}, path=path) == 2
@@ -0,0 +1,48 @@
+"""Mode shard (process pool per rantai segmen) identik dengan jalur serial."""
+import threading
+from concurrent.futures import CancelledError
+
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+
+from sdi_pipeline import (bagi_shard, baca_layer_kerusakan, baca_layer_vektor, bersihkan_geometri, buat_segmen,
+                          hitung_depth_cm, hitung_kerusakan_segmen, hitung_kerusakan_shard, hitung_survey)
+
+def _argumen(data_survey):
+    return dict(jalan=data_survey["jalan"], dsm_path=data_survey["dsm"], retak=data_survey["retak"],
+                pothole=data_survey["pothole"], rutting=data_survey["rutting"], interval_segmen=5)
+
+def test_hitung_survey_shard_sama_dengan_serial(data_survey):
+    serial, seg_serial = hitung_survey(**_argumen(data_survey))
+    shard, seg_shard = hitung_survey(**_argumen(data_survey), max_workers_shard=2)
+    assert len(serial) >= 400
+    assert serial.equals(shard)
+    assert seg_serial.equals(seg_shard)
+
+@pytest.mark.parametrize("jumlah", [2, 7, 16])
+def test_kerusakan_shard_sama_dengan_serial(data_survey, jumlah):
+    seg_gdf = buat_segmen(baca_layer_vektor(data_survey["jalan"]), 5, 3.0, 32749)
+    retak, pothole, rutting = (bersihkan_geometri(baca_layer_kerusakan(data_survey[nama], seg_gdf.crs))[0]
+                               for nama in ("retak", "pothole", "rutting"))
+
+    # Rutting yang menyentuh segmen dari dua shard berbeda harus ada agar perbatasan shard benar-benar teruji
+    shard_segmen = np.zeros(len(seg_gdf), dtype=int)
+    for i, (awal, akhir) in enumerate(bagi_shard(len(seg_gdf), jumlah)):
+        shard_segmen[awal:akhir] = i
+    idx_seg, idx_rut = rutting.sindex.query(seg_gdf.geometry.values, predicate="intersects")
+    shard_per_rut = np.unique(np.c_[idx_rut, shard_segmen[idx_seg]], axis=0)[:, 0]
+    assert (np.bincount(shard_per_rut) > 1).any()
+
+    serial = hitung_kerusakan_segmen(seg_gdf, retak, pothole, hitung_depth_cm(rutting, data_survey["dsm"], max_workers=1))
+    shard = hitung_kerusakan_shard(seg_gdf, retak, pothole, rutting, data_survey["dsm"], max_workers=2, jumlah=jumlah)
+    assert_frame_equal(shard, serial)
+
+def test_kerusakan_shard_batal(data_survey):
+    """Batal yang sudah di-set melempar CancelledError tanpa menunggu shard selesai"""
+    seg_gdf = buat_segmen(baca_layer_vektor(data_survey["jalan"]), 5, 3.0, 32749)
+    layer = [baca_layer_kerusakan(data_survey[nama], seg_gdf.crs) for nama in ("retak", "pothole", "rutting")]
+    batal = threading.Event()
+    batal.set()
+    with pytest.raises(CancelledError):
+        hitung_kerusakan_shard(seg_gdf, *layer, data_survey["dsm"], max_workers=2, jumlah=16, batal=batal)
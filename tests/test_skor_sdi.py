@@ -0,0 +1,53 @@
+"""hitung_sdi_batch (tabel aturan + np.select) setara dengan rantai if/elif Bina Marga pada setiap nilai batas."""
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sdi_pipeline import hitung_sdi, hitung_sdi_batch
+
+def sdi_if_elif(persen_retak, lebar_retak, jumlah_lubang, kedalaman_rutting):
+    """Acuan: rantai if/elif skalar yang digantikan tabel aturan"""
+    if persen_retak == 0: sdi1 = 0
+    elif persen_retak < 10: sdi1 = 5
+    elif persen_retak <= 30: sdi1 = 20
+    else: sdi1 = 40
+    sdi2 = sdi1 * 2 if lebar_retak > 3 else sdi1
+    if jumlah_lubang == 0: sdi3 = sdi2
+    elif jumlah_lubang < 10: sdi3 = sdi2 + 15
+    elif jumlah_lubang <= 50: sdi3 = sdi2 + 75
+    else: sdi3 = sdi2 + 225
+    if kedalaman_rutting == 0: sdi4 = sdi3
+    elif kedalaman_rutting < 1: sdi4 = sdi3 + (5 * 0.5)
+    elif kedalaman_rutting <= 3: sdi4 = sdi3 + (5 * 2)
+    else: sdi4 = sdi3 + (5 * 4)
+    if sdi4 < 50: kondisi = "Baik"
+    elif sdi4 <= 100: kondisi = "Sedang"
+    elif sdi4 <= 150: kondisi = "Rusak Ringan"
+    else: kondisi = "Rusak Berat"
+    return sdi1, sdi2, sdi3, sdi4, kondisi
+
+EPS = 1e-9
+JUMLAH_LUBANG = [0, 1, 9, 10, 11, 49, 50, 51, 200]
+KEDALAMAN_RUTTING = [0, EPS, 1 - EPS, 1, 1 + EPS, 3 - EPS, 3, 3 + EPS, 15]
+
+@pytest.mark.parametrize("persen_retak", [0, EPS, 10 - EPS, 10, 10 + EPS, 30 - EPS, 30, 30 + EPS, 100])
+@pytest.mark.parametrize("lebar_retak", [0, 1 - EPS, 1, 1 + EPS, 3 - EPS, 3, 3 + EPS, 12])
+def test_batch_setara_if_elif_di_batas(persen_retak, lebar_retak):
+    grid = pd.DataFrame(list(itertools.product([persen_retak], [lebar_retak], JUMLAH_LUBANG, KEDALAMAN_RUTTING)),
+                        columns=["persen_retak", "lebar_retak", "jumlah_lubang", "kedalaman_rutting"])
+    acuan = pd.DataFrame([sdi_if_elif(*baris) for baris in grid.itertuples(index=False)],
+                         columns=["SDI1", "SDI2", "SDI3", "SDI4", "Kondisi"])
+    batch = hitung_sdi_batch(grid["persen_retak"], grid["lebar_retak"], grid["jumlah_lubang"], grid["kedalaman_rutting"])
+    pd.testing.assert_frame_equal(batch, acuan, check_dtype=False)
+    assert [hitung_sdi(*baris) for baris in grid.itertuples(index=False)] == \
+        list(acuan.itertuples(index=False, name=None))
+
+def test_batch_aturan_kustom():
+    """Tabel aturan lain (mis. batas lama) dipakai tanpa mengubah kode skor"""
+    aturan = {"persen_retak": [("==", 0, 0), ("lainnya", None, 10)], "lebar_retak": [("lainnya", None, 1)],
+              "jumlah_lubang": [("lainnya", None, 0)], "kedalaman_rutting": [("lainnya", None, 0)],
+              "kondisi": [("<", 10, "Baik"), ("lainnya", None, "Sedang")]}
+    skor = hitung_sdi_batch(np.array([0, 5.0]), np.array([9, 9]), np.array([60, 60]), np.array([8, 8]), aturan=aturan)
+    assert skor["SDI4"].tolist() == [0, 10] and skor["Kondisi"].tolist() == ["Baik", "Sedang"]